@@ -1,12 +1,15 @@
 # backend/app/api/admin_analytics.py
 
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from backend.app.core.security import get_current_admin
-from backend.app.db.mongo import txns_col
+from backend.app.core.stats import bucket_percentile, log_bucket_expr
+from backend.app.db.mongo import logs_col, txns_col
+from backend.app.services.llm_client import llm
+from backend.app.services.llm_telemetry import telemetry
 
 router = APIRouter()
 
@@ -165,3 +168,206 @@ def geo_hotspots(days: int = 30, admin: dict = Depends(get_current_admin)):
         "success": True,
         "points": hotspots,
     }
+
+
+@router.get("/risk-distribution")
+def risk_distribution(
+    days: int = 30,
+    bins: int = Query(10, ge=1, le=100),
+    start: Optional[str] = Query(None, description="ISO start (overrides days)"),
+    end: Optional[str] = Query(None, description="ISO end (exclusive)"),
+    admin: dict = Depends(get_current_admin),
+) -> Dict[str, Any]:
+    """
+    Admin-only: every distribution panel for the dashboard in ONE round trip.
+
+    Returns:
+    - risk_levels: txn count per ml_scores.risk_level
+    - histogram: final_risk_score histogram with `bins` equal-width buckets over 0–100
+    - rules: txn count per triggered rule id
+    - total_txns
+    """
+
+    start_iso = start or (datetime.utcnow() - timedelta(days=days)).isoformat()
+    ts_filter: Dict[str, Any] = {"$gte": start_iso}
+    if end:
+        ts_filter["$lt"] = end
+
+    width = 100.0 / bins
+    boundaries = [round(i * width, 4) for i in range(bins)]
+    # upper bound is exclusive in $bucket, so nudge past 100 to keep perfect scores
+    boundaries.append(100.0001)
+
+    pipeline = [
+        {"$match": {"timestamp": ts_filter}},
+        {
+            "$project": {
+                "_id": 0,
+                "level": "$ml_scores.risk_level",
+                "score": "$ml_scores.final_risk_score",
+                "rules": "$rules.matched_rules",
+            }
+        },
+        {
+            "$facet": {
+                "risk_levels": [
+                    {"$group": {"_id": "$level", "count": {"$sum": 1}}},
+                ],
+                "histogram": [
+                    {
+                        "$bucket": {
+                            "groupBy": "$score",
+                            "boundaries": boundaries,
+                            "default": "other",
+                            "output": {"count": {"$sum": 1}},
+                        }
+                    },
+                ],
+                "rules": [
+                    {"$unwind": "$rules"},
+                    {"$group": {"_id": "$rules", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                ],
+                "total": [
+                    {"$count": "count"},
+                ],
+            }
+        },
+    ]
+
+    facets = next(txns_col.aggregate(pipeline), {}) or {}
+
+    risk_levels = {"low": 0, "medium": 0, "high": 0, "critical": 0}
+    for row in facets.get("risk_levels", []):
+        level = row.get("_id") or "low"
+        risk_levels[level] = risk_levels.get(level, 0) + row["count"]
+
+    counts_by_lower = {
+        row["_id"]: row["count"]
+        for row in facets.get("histogram", [])
+        if row.get("_id") != "other"
+    }
+    histogram = []
+    for i in range(bins):
+        lower = boundaries[i]
+        histogram.append({
+            "min": round(lower, 2),
+            "max": round(min(lower + width, 100.0), 2),
+            "count": counts_by_lower.get(lower, 0),
+        })
+
+    rules = [
+        {"rule": row["_id"], "count": row["count"]}
+        for row in facets.get("rules", [])
+    ]
+
+    total_rows = facets.get("total", [])
+    total_txns = total_rows[0]["count"] if total_rows else 0
+
+    return {
+        "success": True,
+        "start": start_iso,
+        "end": end,
+        "total_txns": total_txns,
+        "risk_levels": risk_levels,
+        "histogram": histogram,
+        "rules": rules,
+    }
+
+
+@router.get("/llm-usage")
+def llm_usage(
+    days: int = Query(7, ge=1, le=90),
+    admin: dict = Depends(get_current_admin),
+) -> Dict[str, Any]:
+    """
+    Admin-only: LLM cost and latency per agent per day, from model_logs.
+
+    Each row: calls, cache hit rate, errors, prompt/completion tokens,
+    cost_usd, and p50/p95 latency of calls that reached the provider
+    (cache hits excluded). Also returns totals per agent and the live
+    client state (circuit, limiter headroom, telemetry queue).
+
+    Latency percentiles come from log-bucket counts (core/stats.py), so the
+    pipeline holds at most a few dozen buckets per agent/day instead of
+    every latency, at the cost of ~9% resolution.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$ts"}}
+    pipeline = [
+        {"$match": {"kind": "llm_call", "ts": {"$gte": cutoff}}},
+        # 1. per (agent, day, latency bucket); cache hits get bucket null
+        {
+            "$group": {
+                "_id": {
+                    "agent": "$agent",
+                    "day": day,
+                    "bucket": {"$cond": ["$cache_hit", None, log_bucket_expr("$latency_ms")]},
+                },
+                "calls": {"$sum": 1},
+                "cache_hits": {"$sum": {"$cond": ["$cache_hit", 1, 0]}},
+                "errors": {"$sum": {"$cond": [{"$ifNull": ["$error", False]}, 1, 0]}},
+                "prompt_tokens": {"$sum": "$prompt_tokens"},
+                "completion_tokens": {"$sum": "$completion_tokens"},
+                "cost_usd": {"$sum": "$cost_usd"},
+            }
+        },
+        # 2. per (agent, day), with the bucket counts as a short array
+        {
+            "$group": {
+                "_id": {"agent": "$_id.agent", "day": "$_id.day"},
+                "calls": {"$sum": "$calls"},
+                "cache_hits": {"$sum": "$cache_hits"},
+                "errors": {"$sum": "$errors"},
+                "prompt_tokens": {"$sum": "$prompt_tokens"},
+                "completion_tokens": {"$sum": "$completion_tokens"},
+                "cost_usd": {"$sum": "$cost_usd"},
+                "latency_buckets": {
+                    "$push": {
+                        "$cond": [
+                            {"$eq": ["$_id.bucket", None]},
+                            "$$REMOVE",
+                            {"b": "$_id.bucket", "n": "$calls"},
+                        ]
+                    }
+                },
+            }
+        },
+        {"$sort": {"_id.day": 1, "_id.agent": 1}},
+    ]
+
+    rows = []
+    totals: Dict[str, Dict[str, Any]] = {}
+    for r in logs_col.aggregate(pipeline, allowDiskUse=True):
+        agent = r["_id"]["agent"]
+        buckets = [(b["b"], b["n"]) for b in r["latency_buckets"]]
+        rows.append({
+            "date": r["_id"]["day"],
+            "agent": agent,
+            "calls": r["calls"],
+            "cache_hit_rate": round(r["cache_hits"] / r["calls"], 3),
+            "errors": r["errors"],
+            "prompt_tokens": r["prompt_tokens"],
+            "completion_tokens": r["completion_tokens"],
+            "cost_usd": round(r["cost_usd"], 4),
+            "p50_latency_ms": round(bucket_percentile(buckets, 50), 1),
+            "p95_latency_ms": round(bucket_percentile(buckets, 95), 1),
+        })
+
+        t = totals.setdefault(agent, {"calls": 0, "errors": 0, "cost_usd": 0.0, "tokens": 0})
+        t["calls"] += r["calls"]
+        t["errors"] += r["errors"]
+        t["cost_usd"] += r["cost_usd"]
+        t["tokens"] += r["prompt_tokens"] + r["completion_tokens"]
+
+    for t in totals.values():
+        t["cost_usd"] = round(t["cost_usd"], 4)
+
+    return {
+        "success": True,
+        "days": rows,
+        "totals": totals,
+        "client": llm.metrics(),
+        "telemetry": telemetry.stats(),
+    }
@@ -0,0 +1,60 @@
+# backend/app/api/admin_models.py
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from backend.app.core.security import get_current_admin
+from backend.app.ml import registry
+from backend.app.ml.engine import model_manager
+
+router = APIRouter()
+
+
+class ModelReloadRequest(BaseModel):
+    version: Optional[str] = None
+
+
+@router.get("/models")
+def list_models(admin: dict = Depends(get_current_admin)) -> Dict[str, Any]:
+    """
+    Admin-only: the bundle serving in this worker, the registry's active
+    pointer and every published bundle with its training metrics.
+    """
+    return {
+        "serving": model_manager.status(),
+        "registry": registry.read_active(),
+        "versions": registry.list_versions(),
+    }
+
+
+@router.post("/models/reload", status_code=202)
+def reload_model(payload: ModelReloadRequest, admin: dict = Depends(get_current_admin)) -> Dict[str, Any]:
+    """
+    Admin-only: activate `version` (or re-load the active one) without a
+    restart. Loading happens in the background; poll GET /models.
+    """
+    try:
+        if payload.version:
+            started = model_manager.activate(payload.version)
+        else:
+            started = model_manager.reload()
+    except registry.RegistryError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if not started:
+        raise HTTPException(status_code=409, detail="A model reload is already running")
+    return {"status": "reloading", "version": payload.version or registry.read_active()["active"]}
+
+
+@router.post("/models/rollback", status_code=202)
+def rollback_model(admin: dict = Depends(get_current_admin)) -> Dict[str, Any]:
+    """Admin-only: switch back to the previously active bundle."""
+    try:
+        version = model_manager.rollback()
+    except registry.RegistryError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if version is None:
+        raise HTTPException(status_code=409, detail="A model reload is already running")
+    return {"status": "reloading", "version": version}
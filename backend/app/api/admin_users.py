@@ -1,37 +1,55 @@
+import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 
-from backend.app.core.security import get_current_admin
+from backend.app.core.password_pool import PasswordPoolOverloaded, password_pool
+from backend.app.core.security import get_current_admin, invalidate_principal
 from backend.app.db.mongo import users_col
+from backend.app.db.pagination import fetch_page
+from backend.app.services.user_search_service import search_users
+from backend.app.services.user_import_service import count_plaintext, parse_rows, import_users
 from bson import ObjectId
+from pydantic import BaseModel
 
 router = APIRouter()
 
+USER_ROLES = ("user", "admin")
+USER_STATUSES = ("active", "inactive", "suspended")
+# bcrypt per plaintext row runs on the shared password pool; beyond this an
+# upload would hold it (and the request) too long - use the CLI instead
+IMPORT_MAX_PLAINTEXT_ROWS = int(os.getenv("IMPORT_MAX_PLAINTEXT_ROWS", "200"))
+
+
+class UserUpdateRequest(BaseModel):
+    role: Optional[str] = None
+    status: Optional[str] = None
+
 @router.get("/users")
 def list_users(
-    q: Optional[str] = Query(None, description="Email or user_code substring"),
+    response: Response,
+    q: Optional[str] = Query(None, description="Email, user_code or name (prefix or substring)"),
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
     admin: dict = Depends(get_current_admin),
 ) -> List[dict]:
     """
     Admin-only: list users with basic info.
-    Supports simple email / user_code substring search.
+    - with q: ranked typeahead search (exact > user_code prefix > email prefix
+      > name prefix > substring), served from the search indexes
+    - without q: newest first, keyset-paginated; next page cursor is in the
+      X-Next-Cursor header
     """
 
-    query = {}
-    if q:
-        query = {
-            "$or": [
-                {"email": {"$regex": q, "$options": "i"}},
-                {"user_code": {"$regex": q, "$options": "i"}},
-            ]
-        }
-
-    cursor = users_col.find(query).sort("created_at", -1).limit(limit)
+    if q and q.strip():
+        docs = search_users(q, limit)
+    else:
+        docs, next_cursor = fetch_page(users_col, {}, "created_at", limit, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
     users = []
-    for u in cursor:
+    for u in docs:
         users.append(
             {
                 "user_id": str(u["_id"]),              # internal id
@@ -45,3 +63,93 @@ def list_users(
         )
     return users
 
+
+@router.get("/users/count")
+def count_users(admin: dict = Depends(get_current_admin)) -> dict:
+    """
+    Admin-only: total number of users for the overview card. Read from the
+    collection's metadata, so it doesn't depend on the page-size cap of
+    GET /users.
+    """
+    return {"total": users_col.estimated_document_count()}
+
+
+@router.patch("/users/{user_id}")
+def update_user(
+    user_id: str,
+    payload: UserUpdateRequest,
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Admin-only: change a user's role and/or status.
+    Drops the user's cached principal so the change applies on their next request.
+    """
+    update_doc = {}
+    if payload.role is not None:
+        if payload.role not in USER_ROLES:
+            raise HTTPException(status_code=400, detail=f"Invalid role: {payload.role}")
+        update_doc["role"] = payload.role
+    if payload.status is not None:
+        if payload.status not in USER_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {payload.status}")
+        update_doc["status"] = payload.status
+    if not update_doc:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    try:
+        oid = ObjectId(user_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    result = users_col.update_one({"_id": oid}, {"$set": update_doc})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    invalidate_principal(user_id)
+
+    return {"success": True, "user_id": user_id, **update_doc}
+
+
+@router.post("/users/import")
+def import_users_file(
+    file: UploadFile = File(..., description="CSV or JSON: name,email,password|password_hash,role"),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Admin-only: bulk-create users from a CSV / JSON upload.
+    Plaintext passwords are hashed on the shared, bounded password pool
+    (at most IMPORT_MAX_PLAINTEXT_ROWS per upload; 503 when it is busy), user
+    codes come from one atomic counter reservation, inserts are batched.
+    Returns per-row errors. Files with more plaintext passwords than that
+    go through the CLI, which hashes on every core:
+        python -m backend.app.services.user_import_service users.csv
+    """
+    try:
+        rows = parse_rows(file.file.read(), file.filename or "")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse file: {e}")
+
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a list of user rows")
+
+    plaintext = count_plaintext(rows)
+    if plaintext > IMPORT_MAX_PLAINTEXT_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"{plaintext} rows need password hashing; the API accepts at most "
+                f"{IMPORT_MAX_PLAINTEXT_ROWS}. Upload password_hash values or use "
+                "python -m backend.app.services.user_import_service"
+            ),
+        )
+
+    try:
+        report = import_users(rows, hash_many=password_pool.hash_many)
+    except PasswordPoolOverloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Password hashing is busy, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    return {"success": True, **report}
+
@@ -2,7 +2,8 @@
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from backend.app.services.behavior_summary_service import generate_behavior_summary
+from backend.app.api.streaming import agent_event_stream
+from backend.app.services.behavior_summary_service import generate_behavior_summary, stream_behavior_summary
 from backend.app.core.security import get_current_admin
 
 router = APIRouter()
@@ -18,3 +19,12 @@ def behavior_summary(req: BehaviorRequest, admin: dict = Depends(get_current_adm
     Admin-only: summarize last 30 days of user behavior.
     """
     return generate_behavior_summary(req.user_id)
+
+
+@router.post("/behavior-summary/stream")
+def behavior_summary_stream(req: BehaviorRequest, admin: dict = Depends(get_current_admin)):
+    """
+    Admin-only: same summary, streamed as Server-Sent Events while the LLM
+    generates it (token events, then one done event).
+    """
+    return agent_event_stream(stream_behavior_summary(req.user_id))
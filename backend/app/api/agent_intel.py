@@ -1,24 +1,39 @@
 # backend/app/api/agent_intel.py
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 from backend.app.core.security import get_current_admin
-from backend.app.db.mongo import profiles_col, txns_col, alerts_col
-from backend.app.services.agent_service import speculate_user
-from backend.app.services.behavior_summary_service import generate_behavior_summary
-from backend.app.services.investigation_service import generate_case_file
-from backend.app.services.risk_trend_service import get_risk_trend
+from backend.app.services.agent_service import speculate_from_snapshot
+from backend.app.services.behavior_summary_service import behavior_summary_from_snapshot
+from backend.app.services.combined_agent_service import combined_analysis
+from backend.app.services.intel_precompute_service import load_precomputed
+from backend.app.services.investigation_service import case_file_from_snapshot
+from backend.app.services.risk_trend_service import risk_trend_from_snapshot
+from backend.app.services.user_snapshot_service import load_user_snapshot
 
 
 router = APIRouter()
 
+# The three LLM sections run side by side; /intel latency ~= slowest call.
+INTEL_SECTION_TIMEOUT = float(os.getenv("INTEL_SECTION_TIMEOUT", "30"))
+INTEL_MAX_WORKERS = int(os.getenv("INTEL_MAX_WORKERS", "12"))
+_intel_pool = ThreadPoolExecutor(max_workers=INTEL_MAX_WORKERS, thread_name_prefix="intel")
+
+# "sections": one LLM call per section; "combined": one call for all three
+INTEL_MODES = ("sections", "combined")
+INTEL_AGENT_MODE = os.getenv("INTEL_AGENT_MODE", "sections")
+LLM_SECTIONS = ("speculation", "behaviour", "investigation")
+
 
 class IntelRequest(BaseModel):
     user_id: str
+    mode: Optional[str] = None  # defaults to INTEL_AGENT_MODE
 
 
 def _parse_json_maybe(value: Any) -> Any:
@@ -102,33 +117,74 @@ def user_intelligence(req: IntelRequest, admin: dict = Depends(get_current_admin
     - speculation summary (LLM)
     - behaviour summary (LLM)
     - investigation case file (LLM)
+
+    The LLM sections are served from intel_precomputed when the background
+    scheduler has already computed them for the user's current data_version.
     """
 
     user_id = req.user_id
 
-    # --- Core data from Mongo ---
-    profile = profiles_col.find_one({"user_id": user_id})
-    clean_profile = _clean_profile(profile)
-
-    raw_txns = list(
-        txns_col.find({"user_id": user_id})
-        .sort("timestamp", -1)
-        .limit(20)
-    )
-    clean_txns = _clean_transactions(raw_txns)
-
-    raw_alerts = list(
-        alerts_col.find({"user_id": user_id})
-        .sort("created_at", -1)
-        .limit(20)
-    )
-    clean_alerts = _clean_alerts(raw_alerts)
-
-    # --- Agent services (reuse existing logic) ---
-    speculation = speculate_user(user_id)
-    behaviour = generate_behavior_summary(user_id)
-    investigation = generate_case_file(user_id)
-    trend = get_risk_trend(user_id)
+    # --- Core data from Mongo: loaded once, shared by every section ---
+    snapshot = load_user_snapshot(user_id)
+
+    clean_profile = _clean_profile(snapshot["profile"])
+    clean_txns = _clean_transactions(snapshot["txns"][:20])
+    clean_alerts = _clean_alerts(snapshot["alerts"])
+
+    mode = req.mode if req.mode in INTEL_MODES else INTEL_AGENT_MODE
+
+    # --- Precomputed by the background scheduler for this data_version? ---
+    precomputed = None
+    if snapshot["profile"]:
+        precomputed = load_precomputed(user_id, snapshot["profile"].get("data_version", 0))
+
+    # --- Agent services, concurrently (each blocks on its own LLM call) ---
+    if precomputed is not None:
+        futures = {}
+        mode = "precomputed"
+    elif mode == "combined":
+        futures = {"combined": _intel_pool.submit(combined_analysis, snapshot)}
+    else:
+        futures = {
+            "speculation": _intel_pool.submit(speculate_from_snapshot, snapshot),
+            "behaviour": _intel_pool.submit(behavior_summary_from_snapshot, snapshot),
+            "investigation": _intel_pool.submit(case_file_from_snapshot, snapshot),
+        }
+    trend = risk_trend_from_snapshot(snapshot)
+
+    wait(futures.values(), timeout=INTEL_SECTION_TIMEOUT)
+
+    results: Dict[str, Any] = {}
+    timed_out: List[str] = []
+    for name, fut in futures.items():
+        if not fut.done():
+            # leave it running; its result is simply not part of this response
+            timed_out.append(name)
+            results[name] = {"success": False, "message": f"{name} timed out"}
+            continue
+        try:
+            results[name] = fut.result()
+        except Exception as e:
+            results[name] = {"success": False, "error": str(e)}
+
+    if precomputed is not None:
+        sections = precomputed["sections"]
+    elif mode == "combined":
+        combined = results["combined"]
+        if "mode" in combined:
+            mode = combined["mode"]  # "sections" if it had to fall back
+            sections = {name: combined[name] for name in LLM_SECTIONS}
+        else:
+            # timed out / failed: every section shares the single call's fate
+            if timed_out:
+                timed_out = list(LLM_SECTIONS)
+            sections = {name: combined for name in LLM_SECTIONS}
+    else:
+        sections = results
+
+    speculation = sections["speculation"]
+    behaviour = sections["behaviour"]
+    investigation = sections["investigation"]
 
     # Parse LLM JSON fields where possible
     spec_parsed = _parse_json_maybe(speculation.get("agent_result")) if isinstance(speculation, dict) else speculation
@@ -148,6 +204,9 @@ def user_intelligence(req: IntelRequest, admin: dict = Depends(get_current_admin
     return {
         "success": True,
         "user_id": user_id,
+        "mode": mode,
+        "partial": bool(timed_out),
+        "timed_out_sections": timed_out,
         "profile": clean_profile,
         "metrics": metrics,
         "summary": {
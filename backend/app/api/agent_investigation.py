@@ -3,7 +3,8 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
-from backend.app.services.investigation_service import generate_case_file
+from backend.app.api.streaming import agent_event_stream
+from backend.app.services.investigation_service import generate_case_file, stream_case_file
 from backend.app.core.security import get_current_admin
 
 router = APIRouter()
@@ -19,3 +20,12 @@ def investigation(req: InvestigationRequest, admin: dict = Depends(get_current_a
     Admin-only: generate a detailed fraud investigation case file.
     """
     return generate_case_file(req.user_id)
+
+
+@router.post("/investigation/stream")
+def investigation_stream(req: InvestigationRequest, admin: dict = Depends(get_current_admin)):
+    """
+    Admin-only: same case file, streamed as Server-Sent Events while the
+    LLM generates it (token events, then one done event).
+    """
+    return agent_event_stream(stream_case_file(req.user_id))
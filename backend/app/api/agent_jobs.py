@@ -0,0 +1,73 @@
+# backend/app/api/agent_jobs.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.core.security import get_current_admin
+from backend.app.services.agent_job_service import (
+    JOB_KINDS,
+    MAX_WAIT_SECONDS,
+    JobQueueFull,
+    agent_job_runner,
+)
+
+router = APIRouter()
+
+
+class AgentJobRequest(BaseModel):
+    kind: str  # "investigation" | "behaviour" | "speculation"
+    user_id: str
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_agent_job(req: AgentJobRequest, admin: dict = Depends(get_current_admin)):
+    """
+    Admin-only: queue an agent job and return its id immediately.
+    A job already queued/running for the same kind + user is returned
+    instead of starting a second one (coalesced=true).
+    """
+    if req.kind not in JOB_KINDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid kind. Use one of: {', '.join(JOB_KINDS)}",
+        )
+
+    try:
+        job, coalesced = await run_in_threadpool(
+            agent_job_runner.submit, req.kind, req.user_id, admin.get("email")
+        )
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Agent job queue is full, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+
+    return {**job, "coalesced": coalesced}
+
+
+@router.get("/jobs/metrics")
+def agent_job_metrics(admin: dict = Depends(get_current_admin)):
+    return agent_job_runner.metrics()
+
+
+@router.get("/jobs/{job_id}")
+async def get_agent_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Admin-only: job status, and the result once status is "done".
+    With wait=N the request is held for up to N seconds until the job
+    finishes (long-poll), so clients don't need to poll in a tight loop.
+    """
+    if wait > 0:
+        job = await agent_job_runner.wait(job_id, wait)
+    else:
+        job = await run_in_threadpool(agent_job_runner.get, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,11 +1,17 @@
+import asyncio
+import json
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from pymongo import ReturnDocument
 
 from backend.app.core.security import get_current_admin
 from backend.app.db.mongo import alerts_col
+from backend.app.db.pagination import fetch_page
+from backend.app.services.alert_stream_service import alert_broadcaster
 
 router = APIRouter()
 
@@ -15,47 +21,397 @@ class AlertResolutionRequest(BaseModel):
     note: Optional[str] = None
 
 
+class AlertFilter(BaseModel):
+    # same semantics as the GET /alerts query parameters
+    status: Optional[str] = None
+    risk_level: Optional[str] = None
+    user_code: Optional[str] = None
+    rule: Optional[str] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+
+class BulkAlertResolutionRequest(BaseModel):
+    status: str
+    note: Optional[str] = None
+    alert_ids: Optional[List[str]] = None
+    filter: Optional[AlertFilter] = None
+
+
+MAX_BULK_IDS = 10_000
+
+
+HEARTBEAT_SECONDS = 15
+
+ALERT_STATUSES = ("open", "closed", "false_positive", "confirmed_fraud")
+RISK_LEVELS = ("low", "medium", "high", "critical")
+
+# sort option -> (keyset field, direction)
+ALERT_SORTS = {
+    "newest": ("created_at", -1),
+    "oldest": ("created_at", 1),
+    "score_desc": ("final_risk_score", -1),
+    "score_asc": ("final_risk_score", 1),
+}
+
+# only what the triage table renders
+ALERT_LIST_PROJECTION = {
+    "alert_id": 1,
+    "user_id": 1,
+    "user_code": 1,
+    "txn_id": 1,
+    "risk_level": 1,
+    "final_risk_score": 1,
+    "reason": 1,
+    "status": 1,
+    "created_at": 1,
+    "resolved_at": 1,
+    "resolved_by": 1,
+    "txn_count": 1,
+    "last_seen_at": 1,
+}
+
+
+def _alert_summary(a: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "alert_id": a.get("alert_id"),
+        "user_id": a.get("user_id"),             # internal
+        "user_code": a.get("user_code"),
+        "txn_id": a.get("txn_id"),
+        "risk_level": a.get("risk_level"),
+        "final_risk_score": a.get("final_risk_score"),
+        "reason": a.get("reason"),
+        "status": a.get("status"),
+        "created_at": a.get("created_at"),
+        "resolved_at": a.get("resolved_at"),
+        "resolved_by": a.get("resolved_by"),
+        "txn_count": a.get("txn_count", 1),
+        "last_seen_at": a.get("last_seen_at"),
+    }
+
+
+def _parse_choices(raw: Optional[str], allowed, field: str) -> List[str]:
+    """Comma-separated query value -> validated list."""
+    if not raw:
+        return []
+    values = [v.strip().lower() for v in raw.split(",") if v.strip()]
+    bad = [v for v in values if v not in allowed]
+    if bad:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {field}: {', '.join(bad)}. Allowed: {', '.join(allowed)}",
+        )
+    return values
+
+
+def _resolution_status(raw: str) -> str:
+    """Single status for a write: normalised, then checked exactly."""
+    status = (raw or "").strip().lower()
+    if status not in ALERT_STATUSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status: {raw!r}. Allowed: {', '.join(ALERT_STATUSES)}",
+        )
+    return status
+
+
+def _resolution_update(status: str, admin: dict, note: Optional[str]) -> Dict[str, Any]:
+    """
+    Update document for a status change. Closing stamps the resolver and
+    detaches the alert from its incident (a resolved incident stops
+    absorbing new alerts); reopening clears the resolver instead.
+    """
+    set_doc: Dict[str, Any] = {"status": status}
+    if note:
+        set_doc["resolution_note"] = note
+    if status == "open":
+        return {"$set": set_doc, "$unset": {"resolved_at": "", "resolved_by": ""}}
+    set_doc["resolved_at"] = datetime.utcnow().isoformat()
+    set_doc["resolved_by"] = admin["email"]
+    return {"$set": set_doc, "$unset": {"open_incident_key": ""}}
+
+
+def _date_range(start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
+    rng: Dict[str, Any] = {}
+    if start:
+        rng["$gte"] = start
+    if end:
+        rng["$lt"] = end
+    return rng
+
+
+def build_alert_query(
+    status: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    user_code: Optional[str] = None,
+    rule: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Translate triage filters into a Mongo query. Every field used here is a
+    prefix of one of the alert indexes in db/indexes.py.
+    """
+    query: Dict[str, Any] = {}
+
+    statuses = _parse_choices(status, ALERT_STATUSES, "status")
+    if statuses:
+        query["status"] = statuses[0] if len(statuses) == 1 else {"$in": statuses}
+
+    levels = _parse_choices(risk_level, RISK_LEVELS, "risk_level")
+    if levels:
+        query["risk_level"] = levels[0] if len(levels) == 1 else {"$in": levels}
+
+    if user_code:
+        query["user_code"] = user_code.strip()
+
+    if rule:
+        query["rules_triggered"] = rule.strip()
+
+    score: Dict[str, Any] = {}
+    if min_score is not None:
+        score["$gte"] = min_score
+    if max_score is not None:
+        score["$lte"] = max_score
+    if score:
+        query["final_risk_score"] = score
+
+    created = _date_range(start, end)
+    if created:
+        query["created_at"] = created
+
+    return query
+
+
 @router.get("/alerts")
-def list_alerts(admin: dict = Depends(get_current_admin)):
-    cursor = alerts_col.find({}).sort("created_at", -1).limit(100)
-    alerts = []
-    for a in cursor:
-        alerts.append(
-            {
-                "alert_id": a.get("alert_id"),
-                "user_id": a.get("user_id"),             # internal
-                "user_code": a.get("user_code"),
-                "txn_id": a.get("txn_id"),
-                "risk_level": a.get("risk_level"),
-                "final_risk_score": a.get("final_risk_score"),
-                "reason": a.get("reason"),
-                "status": a.get("status"),
-                "created_at": a.get("created_at"),
-                "resolved_at": a.get("resolved_at"),
-                "resolved_by": a.get("resolved_by"),
-            }
+def list_alerts(
+    response: Response,
+    status: Optional[str] = Query(None, description="Comma-separated statuses"),
+    risk_level: Optional[str] = Query(None, description="Comma-separated risk levels"),
+    user_code: Optional[str] = None,
+    rule: Optional[str] = Query(None, description="Triggered rule id, e.g. R1_VERY_HIGH_AMOUNT"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    max_score: Optional[float] = Query(None, ge=0, le=100),
+    start: Optional[str] = Query(None, description="ISO created_at lower bound"),
+    end: Optional[str] = Query(None, description="ISO created_at upper bound (exclusive)"),
+    sort: str = Query("newest", description="newest | oldest | score_desc | score_asc"),
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Admin-only: filtered, sorted, keyset-paginated triage queue.
+    The cursor for the next page is returned in the X-Next-Cursor header
+    (absent on the last page). Keep the same filters/sort when paging.
+    """
+    if sort not in ALERT_SORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort. Allowed: {', '.join(ALERT_SORTS)}",
         )
+    sort_field, direction = ALERT_SORTS[sort]
+
+    query = build_alert_query(
+        status, risk_level, user_code, rule, min_score, max_score, start, end
+    )
+    docs, next_cursor = fetch_page(
+        alerts_col,
+        query,
+        sort_field,
+        limit,
+        cursor,
+        direction=direction,
+        projection=ALERT_LIST_PROJECTION,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    alerts = []
+    for a in docs:
+        alerts.append(_alert_summary(a))
     return alerts
 
 
+@router.get("/alerts/counts")
+def alert_counts(
+    start: Optional[str] = Query(None, description="ISO created_at lower bound"),
+    end: Optional[str] = Query(None, description="ISO created_at upper bound (exclusive)"),
+    admin: dict = Depends(get_current_admin),
+) -> Dict[str, Any]:
+    """
+    Admin-only: live per-status and per-risk-level counts for the triage tabs.
+    Only status / risk_level / created_at are touched, so the pipeline is a
+    covered index scan: created_status_level for a date range (bounded by
+    created_at), status_level_created for all time.
+    """
+    match: Dict[str, Any] = {}
+    created = _date_range(start, end)
+    if created:
+        match["created_at"] = created
+    index = "created_status_level" if created else "status_level_created"
+
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "status": 1, "risk_level": 1}},
+        {
+            "$group": {
+                "_id": {"status": "$status", "risk_level": "$risk_level"},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    rows = alerts_col.aggregate(pipeline, hint=index)
+
+    by_status = {s: 0 for s in ALERT_STATUSES}
+    by_level = {lvl: 0 for lvl in RISK_LEVELS}
+    open_by_level = {lvl: 0 for lvl in RISK_LEVELS}
+    total = 0
+
+    for row in rows:
+        st = row["_id"].get("status") or "open"
+        lvl = row["_id"].get("risk_level") or "low"
+        n = row["count"]
+        total += n
+        by_status[st] = by_status.get(st, 0) + n
+        by_level[lvl] = by_level.get(lvl, 0) + n
+        if st == "open":
+            open_by_level[lvl] = open_by_level.get(lvl, 0) + n
+
+    return {
+        "success": True,
+        "total": total,
+        "by_status": by_status,
+        "by_risk_level": by_level,
+        "open_by_risk_level": open_by_level,
+    }
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    if event["op"] == "resync":
+        return f"id: {event['id']}\nevent: resync\ndata: {{}}\n\n"
+    data = json.dumps(_alert_summary(event["alert"]), default=str)
+    return f"id: {event['id']}\nevent: {event['op']}\ndata: {data}\n\n"
+
+
+@router.get("/alerts/stream")
+async def stream_alerts(
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Admin-only: Server-Sent Events feed of created / updated alerts.
+
+    - event: insert | update | replace, data: same shape as GET /alerts items
+    - send Last-Event-ID on reconnect to replay missed events
+    - event "resync" means the id is too old: refetch GET /alerts
+    """
+    queue, replay, resync = alert_broadcaster.subscribe(last_event_id)
+
+    async def event_source():
+        try:
+            yield f"retry: {HEARTBEAT_SECONDS * 1000}\n\n"
+            if resync:
+                yield "event: resync\ndata: {}\n\n"
+            for event in replay:
+                yield _sse(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # dropped as a slow consumer; client reconnects and replays
+                    break
+                yield _sse(event)
+        finally:
+            alert_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.patch("/alerts/{alert_id}")
 def resolve_alert(
     alert_id: str,
     payload: AlertResolutionRequest,
     admin: dict = Depends(get_current_admin),
 ):
-    alert = alerts_col.find_one({"alert_id": alert_id})
+    status = _resolution_status(payload.status)
+
+    # single round trip: match + update + return the new document
+    alert = alerts_col.find_one_and_update(
+        {"alert_id": alert_id},
+        _resolution_update(status, admin, payload.note),
+        return_document=ReturnDocument.AFTER,
+    )
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
 
-    update_doc = {
-        "status": payload.status,
-        "resolved_at": datetime.utcnow().isoformat(),
-        "resolved_by": admin["email"],
-    }
-    if payload.note:
-        update_doc["resolution_note"] = payload.note
+    alert_broadcaster.publish_alert(alert, op="update")
+
+    return {"success": True, "alert_id": alert_id, "new_status": status}
+
+
+@router.post("/alerts/bulk-resolve")
+def bulk_resolve_alerts(
+    payload: BulkAlertResolutionRequest,
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Admin-only: apply one status / note / resolver to many alerts at once.
 
-    alerts_col.update_one({"alert_id": alert_id}, {"$set": update_doc})
+    Target either:
+    - alert_ids: explicit list (up to MAX_BULK_IDS), or
+    - filter: same fields as GET /alerts, e.g.
+      {"status": "open", "user_code": "PRAT-0001", "max_score": 60}
 
-    return {"success": True, "alert_id": alert_id, "new_status": payload.status}
+    Runs as a single update_many and reports matched / modified counts.
+    """
+    status = _resolution_status(payload.status)
+
+    if bool(payload.alert_ids) == bool(payload.filter):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide exactly one of alert_ids or filter",
+        )
+
+    if payload.alert_ids:
+        if len(payload.alert_ids) > MAX_BULK_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many alert_ids (max {MAX_BULK_IDS}); use a filter instead",
+            )
+        query: Dict[str, Any] = {"alert_id": {"$in": payload.alert_ids}}
+    else:
+        f = payload.filter
+        query = build_alert_query(
+            f.status, f.risk_level, f.user_code, f.rule,
+            f.min_score, f.max_score, f.start, f.end,
+        )
+        if not query:
+            # never let an empty filter close the whole collection
+            raise HTTPException(status_code=400, detail="Filter must not be empty")
+
+    # don't rewrite resolver/time on alerts already in the target status
+    query = {"$and": [query, {"status": {"$ne": status}}]}
+
+    result = alerts_col.update_many(query, _resolution_update(status, admin, payload.note))
+
+    if result.modified_count:
+        alert_broadcaster.publish_resync()
+
+    return {
+        "success": True,
+        "new_status": status,
+        "matched": result.matched_count,
+        "modified": result.modified_count,
+    }
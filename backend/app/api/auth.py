@@ -3,28 +3,40 @@
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from pymongo.errors import DuplicateKeyError
 
+from backend.app.core.password_pool import PasswordPoolOverloaded, password_pool
 from backend.app.core.security import (
-    get_password_hash,
-    verify_password,
+    aget_password_hash,
+    averify_password,
     create_access_token,
     get_current_admin,
     get_current_user,
+    principal_cache,
 )
 from backend.app.db.mongo import users_col
 from backend.app.db.models.user import UserCreate, UserPublic
+from backend.app.services.user_search_service import normalize, search_fields
+from backend.app.services.user_code_service import next_user_codes
 
 router = APIRouter()
 
 def _generate_user_code(name: str) -> str:
     """
     Generate a human-readable user code like 'PRAT-0001'.
-    Very simple and not collision-proof, but fine for this project.
+    The number comes from an atomic counter, so codes never collide.
     """
-    prefix = "".join(c for c in name.upper() if c.isalnum())[:4] or "USER"
-    count = users_col.count_documents({}) + 1
-    return f"{prefix}-{count:04d}"
+    return next_user_codes([name])[0]
+
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 @router.get("/me")
 def read_me(current_user: dict = Depends(get_current_user)):
@@ -44,20 +56,28 @@ def read_me(current_user: dict = Depends(get_current_user)):
 # ---------- ADMIN-ONLY REGISTER ----------
 
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, admin: dict = Depends(get_current_admin)):
+async def register(payload: UserCreate, admin: dict = Depends(get_current_admin)):
     """
     Admin-only: create a new user account.
     The caller must have role="admin".
     """
-    # check if email already exists
-    if users_col.find_one({"email": payload.email}):
+    # check if email already exists; email_lc makes it case-insensitive,
+    # the exact match covers users the search backfill hasn't reached yet
+    taken = {"$or": [{"email": payload.email}, {"email_lc": normalize(payload.email)}]}
+    if await run_in_threadpool(users_col.find_one, taken):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    password_hash = get_password_hash(payload.password)
-    user_code = _generate_user_code(payload.name)
+    try:
+        password_hash = await aget_password_hash(payload.password)
+    except PasswordPoolOverloaded:
+        raise _overloaded()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    user_code = await run_in_threadpool(_generate_user_code, payload.name)
 
     user_doc = {
         "name": payload.name,
@@ -67,9 +87,23 @@ def register(payload: UserCreate, admin: dict = Depends(get_current_admin)):
         "user_code": user_code,
         "created_at": datetime.utcnow(),
         "status": "active",
+        **search_fields(payload.name, payload.email, user_code),
     }
 
-    result = users_col.insert_one(user_doc)
+    try:
+        result = await run_in_threadpool(users_col.insert_one, user_doc)
+    except DuplicateKeyError as e:
+        key = (e.details or {}).get("keyPattern") or {}
+        if "email" in key:
+            # lost a race with a concurrent create of the same email
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Could not create user: duplicate {', '.join(key) or 'key'}",
+        )
     user_id = str(result.inserted_id)
 
     return UserPublic(
@@ -82,28 +116,58 @@ def register(payload: UserCreate, admin: dict = Depends(get_current_admin)):
 
 
 
+# ---------- ADMIN-ONLY METRICS ----------
+
+@router.get("/metrics")
+def auth_metrics(admin: dict = Depends(get_current_admin)):
+    """
+    Admin-only: password pool health (bcrypt latency, queue wait, rejections).
+    """
+    return {
+        "success": True,
+        "password_pool": password_pool.metrics(),
+        "principal_cache": principal_cache.stats(),
+    }
+
+
 # ---------- PUBLIC LOGIN (OAuth2 password flow) ----------
 
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     OAuth2 password-flow login for Swagger UI and other clients.
     - Swagger will send `username` and `password` as form fields.
     - We treat `username` as the email.
+    bcrypt runs on the password pool and is awaited, so a login storm does
+    not hold API threadpool slots; a saturated pool answers 503 at once.
     """
     email = form_data.username
     password = form_data.password
 
-    user = users_col.find_one({"email": email})
+    user = await run_in_threadpool(users_col.find_one, {"email": email})
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(password, user["password_hash"]):
+    try:
+        valid = await averify_password(password, user["password_hash"])
+    except PasswordPoolOverloaded:
+        raise _overloaded()
+
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    if user.get("status", "active") != "active":
+        raise HTTPException(status_code=403, detail="User account is not active")
+
     token = create_access_token(
         user_id=str(user["_id"]),
         role=user["role"],
+        claims={
+            "status": user.get("status", "active"),
+            "email": user["email"],
+            "name": user.get("name"),
+            "user_code": user.get("user_code"),
+        },
     )
 
     return {
@@ -0,0 +1,38 @@
+# backend/app/api/streaming.py
+
+import json
+from typing import Any, Iterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def agent_event_stream(events: Iterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Server-Sent Events for a streaming agent service:
+
+    - event: token, data: {"text": "<chunk>"} as the LLM writes
+    - event: done,  data: the same body the non-streaming endpoint returns
+    - event: error, data: {"success": false, "message": ...}
+
+    The sync generator is iterated in the threadpool by Starlette, one chunk
+    at a time, so tokens are flushed as soon as the provider sends them.
+    """
+
+    def event_source():
+        # open the response immediately, before the first LLM token
+        yield ": stream-open\n\n"
+        for event, payload in events:
+            if event == "token":
+                yield _sse("token", {"text": payload})
+            else:
+                yield _sse(event, payload)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
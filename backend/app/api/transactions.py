@@ -1,25 +1,27 @@
 # backend/app/api/transactions.py
 
 from datetime import datetime
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException
 from bson import ObjectId
 
-from backend.app.core.security import get_current_user
+from backend.app.core.security import get_current_user, get_current_user_fast
 from backend.app.db.mongo import txns_col, alerts_col
+from backend.app.db.pagination import fetch_page
 from backend.app.db.models.transaction import TransactionCreate
-from backend.app.ml.engine import TransactionEngine
+from backend.app.ml.engine import model_manager
 from backend.app.services.feature_builder import build_features_from_transaction
 from backend.app.services.profile_service import (
     get_or_create_profile,
     update_profile_with_transaction,
 )
-from backend.app.services.rules_service import evaluate_rules_for_transaction
+from backend.app.services.rules_service import evaluate_rules_for_transaction, should_alert
 from backend.app.services.risk_trend_service import get_risk_trend
+from backend.app.services.alert_stream_service import alert_broadcaster
+from backend.app.services.incident_service import record_alert
 
 router = APIRouter()
-engine = TransactionEngine()
 
 
 def _strip_object_ids(obj: Any) -> Any:
@@ -48,7 +50,7 @@ def _strip_object_ids(obj: Any) -> Any:
 
 @router.post("/transaction/new", response_model=Dict[str, Any])
 def create_transaction(
-    txn: TransactionCreate, current_user: dict = Depends(get_current_user)
+    txn: TransactionCreate, current_user: dict = Depends(get_current_user_fast)
 ):
     """
     User-facing endpoint: submit a transaction for risk analysis.
@@ -78,6 +80,8 @@ def create_transaction(
     feature_dict["isFlaggedFraud"] = is_flagged
 
     # ---- ML prediction ----
+    # one read of the live engine per request; a hot reload swaps it atomically
+    engine = model_manager.engine
     ml_scores = engine.predict_transaction(feature_dict, profile)
     ml_scores["is_flagged_by_rules"] = bool(is_flagged)
 
@@ -103,6 +107,7 @@ def create_transaction(
         "device": txn.device.dict() if txn.device else None,
         "timestamp": timestamp,
         "ml_scores": ml_scores,
+        "score_version": engine.score_version,
         "rules": rules_result,
         "txn_type": raw_type,
         "created_at": datetime.utcnow().isoformat(),
@@ -115,16 +120,9 @@ def create_transaction(
     final_score = ml_scores["final_risk_score"]
     fraud_prob = ml_scores["fraud_probability"]
 
-    should_alert = False
-    if risk_level in ("high", "critical"):
-        should_alert = True
-    elif risk_level == "medium" and (final_score >= 65 or fraud_prob >= 70):
-        should_alert = True
-    elif is_flagged and final_score >= 55:
-        should_alert = True
-
     alert_doc: Union[Dict[str, Any], None] = None
-    if should_alert:
+    incident_merged = False
+    if should_alert(ml_scores, is_flagged):
         alert_id = f"ALERT-{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
         alert_doc = {
             "alert_id": alert_id,
@@ -141,7 +139,10 @@ def create_transaction(
             "updated_at": datetime.utcnow().isoformat(),
             "reason": _build_alert_reason(txn_doc, ml_scores, rules_result),
         }
-        alerts_col.insert_one(alert_doc)
+        # Fold into the user's open incident instead of inserting one alert per txn
+        alert_doc, created_new = record_alert(alert_doc)
+        incident_merged = not created_new
+        alert_broadcaster.publish_alert(alert_doc, op="insert" if created_new else "update")
 
     # ---- Clean profile for frontend (just the key stats) ----
     clean_profile = {
@@ -160,6 +161,7 @@ def create_transaction(
         "rules": rules_result,
         "profile": clean_profile,
         "alert_created": bool(alert_doc),
+        "incident_merged": incident_merged,
         "alert": alert_doc,
     }
 
@@ -257,16 +259,19 @@ def my_risk_trend(current_user: dict = Depends(get_current_user)) -> Dict[str, A
 
 @router.get("/transactions/me/history")
 def my_history(
-    limit: int = 10, current_user: dict = Depends(get_current_user)
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """
     Recent N transactions for the logged-in user.
+    Pass back `next_cursor` as `cursor` to get the following page.
     """
     user_id = current_user["user_id"]
     limit = max(1, min(limit, 50))
 
-    txns = list(
-        txns_col.find({"user_id": user_id}).sort("timestamp", -1).limit(limit)
+    txns, next_cursor = fetch_page(
+        txns_col, {"user_id": user_id}, "timestamp", limit, cursor
     )
 
     items = []
@@ -287,21 +292,24 @@ def my_history(
             }
         )
 
-    return {"success": True, "transactions": items}
+    return {"success": True, "transactions": items, "next_cursor": next_cursor}
 
 
 @router.get("/transactions/me/alerts")
 def my_alerts(
-    limit: int = 10, current_user: dict = Depends(get_current_user)
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """
     Alerts *about this user*, visible to the user themselves.
+    Pass back `next_cursor` as `cursor` to get the following page.
     """
     user_id = current_user["user_id"]
     limit = max(1, min(limit, 50))
 
-    raw_alerts = list(
-        alerts_col.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
+    raw_alerts, next_cursor = fetch_page(
+        alerts_col, {"user_id": user_id}, "created_at", limit, cursor
     )
 
     alerts = []
@@ -318,4 +326,4 @@ def my_alerts(
             }
         )
 
-    return {"success": True, "alerts": alerts}
+    return {"success": True, "alerts": alerts, "next_cursor": next_cursor}
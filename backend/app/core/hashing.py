@@ -0,0 +1,39 @@
+# backend/app/core/hashing.py
+
+import time
+
+from passlib.context import CryptContext
+
+"""
+Pure password hashing helpers.
+
+Kept free of DB / app imports so they are cheap to import (and pickle) in
+worker processes — bulk import hashes on a process pool.
+"""
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Bcrypt cannot handle >72 bytes
+MAX_PASSWORD_BYTES = 72
+
+
+def hash_password(password: str) -> str:
+    if len(password.encode("utf-8")) > MAX_PASSWORD_BYTES:
+        raise ValueError("Password too long: must be <=72 bytes.")
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def timed_op(op: str, *args):
+    """
+    Worker-side entry point for the password pool.
+    Returns (result, started_at, duration) so the caller can split queue wait
+    from bcrypt time.
+    """
+    started_at = time.time()
+    fn = hash_password if op == "hash" else check_password
+    result = fn(*args)
+    return result, started_at, time.time() - started_at
@@ -0,0 +1,167 @@
+# backend/app/core/password_pool.py
+
+"""
+Dedicated, bounded process pool for bcrypt.
+
+Password hashing / verification used to run inline in sync handlers and held
+one of the same threadpool slots /transaction/new needs. Now:
+
+- bcrypt runs in PASSWORD_POOL_WORKERS separate processes (own CPU, no GIL)
+- at most PASSWORD_POOL_MAX_PENDING operations may be queued or running;
+  beyond that callers are rejected immediately (PasswordPoolOverloaded ->
+  HTTP 503) instead of piling up
+- async callers await the result without occupying a threadpool slot
+- queue wait and bcrypt latency are recorded for /auth/metrics
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.app.core.hashing import timed_op
+from backend.app.core.stats import percentile
+
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", "2"))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", "64"))
+PASSWORD_POOL_TIMEOUT = float(os.getenv("PASSWORD_POOL_TIMEOUT", "10"))
+METRICS_WINDOW = 1000
+
+
+class PasswordPoolOverloaded(Exception):
+    """Too many password operations in flight; caller should back off."""
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # metrics
+        self._hash_seconds: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._wait_seconds: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._counts = {"completed": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    # ---------- SUBMISSION ----------
+
+    def _submit(self, op: str, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counts["rejected"] += 1
+                raise PasswordPoolOverloaded(
+                    f"{self._pending} password operations pending"
+                )
+            self._pending += 1
+            executor = self._get_executor()
+
+        submitted_at = time.time()
+        future = executor.submit(timed_op, op, *args)
+        future.add_done_callback(lambda f: self._on_done(f, submitted_at))
+        return future
+
+    def _on_done(self, future: Future, submitted_at: float) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._counts["errors"] += 1
+                return
+            _, started_at, duration = future.result()
+            self._counts["completed"] += 1
+            self._wait_seconds.append(max(0.0, started_at - submitted_at))
+            self._hash_seconds.append(duration)
+
+    def _result(self, future: Future) -> Any:
+        try:
+            result, _, _ = future.result(timeout=PASSWORD_POOL_TIMEOUT)
+        except FutureTimeoutError:
+            with self._lock:
+                self._counts["timeouts"] += 1
+            raise PasswordPoolOverloaded("password operation timed out")
+        return result
+
+    async def _aresult(self, future: Future) -> Any:
+        try:
+            result, _, _ = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=PASSWORD_POOL_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._counts["timeouts"] += 1
+            raise PasswordPoolOverloaded("password operation timed out")
+        return result
+
+    # ---------- PUBLIC API ----------
+
+    def hash(self, password: str) -> str:
+        return self._result(self._submit("hash", password))
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._result(self._submit("verify", plain_password, hashed_password))
+
+    def hash_many(self, passwords: List[str], window: Optional[int] = None) -> List[str]:
+        """
+        Hash a batch (e.g. an admin user upload) in order, keeping at most
+        `window` (default: one per worker) in flight, so logins still find
+        free slots. Raises PasswordPoolOverloaded like hash().
+        """
+        window = max(1, window or self.workers)
+        hashes: List[str] = []
+        in_flight: Deque[Future] = deque()
+        for password in passwords:
+            if len(in_flight) >= window:
+                hashes.append(self._result(in_flight.popleft()))
+            in_flight.append(self._submit("hash", password))
+        while in_flight:
+            hashes.append(self._result(in_flight.popleft()))
+        return hashes
+
+    async def ahash(self, password: str) -> str:
+        return await self._aresult(self._submit("hash", password))
+
+    async def averify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._aresult(self._submit("verify", plain_password, hashed_password))
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            hash_s = list(self._hash_seconds)
+            wait_s = list(self._wait_seconds)
+            counts = dict(self._counts)
+            pending = self._pending
+
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            **counts,
+            "hash_ms": {
+                "p50": round(percentile(hash_s, 50) * 1000, 2),
+                "p95": round(percentile(hash_s, 95) * 1000, 2),
+                "max": round(max(hash_s, default=0.0) * 1000, 2),
+            },
+            "queue_wait_ms": {
+                "p50": round(percentile(wait_s, 50) * 1000, 2),
+                "p95": round(percentile(wait_s, 95) * 1000, 2),
+                "max": round(max(wait_s, default=0.0) * 1000, 2),
+            },
+        }
+
+
+password_pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_PENDING)
@@ -0,0 +1,120 @@
+# backend/app/core/resilience.py
+
+import random
+import threading
+import time
+from typing import Optional
+
+"""
+Small thread-safe building blocks for calling flaky upstream services:
+a token bucket for rate limits, a circuit breaker, and jittered backoff.
+"""
+
+
+class TokenBucket:
+    """
+    `rate_per_minute` tokens refill continuously up to `capacity`.
+    acquire() waits for tokens, but never longer than `max_wait` seconds:
+    if the wait would be longer it returns False straight away, so callers
+    fail fast instead of parking a thread behind the limiter.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, max_wait: float = 0.0) -> bool:
+        # a single request larger than the bucket can still go once it is full
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            deficit = amount - self._tokens
+            wait = deficit / self.rate if deficit > 0 and self.rate > 0 else 0.0
+            if deficit > 0 and (self.rate <= 0 or wait > max_wait):
+                return False
+            # reserve now; concurrent callers queue up behind this reservation
+            self._tokens -= amount
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def adjust(self, delta: float) -> None:
+        """Correct an estimate after the fact (positive = give tokens back)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; while open
+    allow() is False for `reset_seconds`; then one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """The half-open trial ended without a verdict (e.g. a 4xx)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -1,38 +1,60 @@
 # backend/app/core/security.py
 
 import os
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from bson import ObjectId
 
+from backend.app.core.cache import TTLCache
+from backend.app.core.password_pool import password_pool
 from backend.app.db.mongo import users_col
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-key-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # tokenUrl must match your /auth/login path
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Authenticated-principal cache: (user_id, token jti) -> normalized user
+# dict, so an entry never outlives the token it was looked up for.
+# Per-process, so a role/status change made on another worker is seen here
+# within PRINCIPAL_CACHE_TTL seconds at the latest.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# When true, get_current_user_fast trusts the signed role/status claims in
+# the token and skips the DB/cache entirely. Role or status changes then only
+# take effect when the token expires — keep off unless you need it.
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
 
 # ---------- PASSWORD UTILS ----------
 
+# bcrypt runs on the dedicated process pool (core/password_pool.py); these
+# raise PasswordPoolOverloaded when the pool is saturated.
+
 def get_password_hash(password: str) -> str:
-    # Bcrypt cannot handle >72 bytes; enforce a limit
-    if len(password.encode("utf-8")) > 72:
-        raise ValueError("Password too long: must be <=72 bytes.")
-    return pwd_context.hash(password)
+    # Bcrypt cannot handle >72 bytes; enforced in core/hashing.py
+    return password_pool.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.verify(plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    return await password_pool.ahash(password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.averify(plain_password, hashed_password)
 
 
 # ---------- JWT CREATION ----------
@@ -40,20 +62,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def create_access_token(
     user_id: str,
     role: str,
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[dict] = None,
 ) -> str:
     """
     Create a JWT with:
     - sub = user_id
     - role = user's role
+    - jti = unique token id (keys the principal cache)
+    - optional extra claims (status, email, name, user_code) that
+      get_current_user_fast can trust without a DB lookup
     """
     expire = datetime.utcnow() + (
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode = {
+        **(claims or {}),
         "sub": user_id,
         "role": role,
         "exp": expire,
+        "jti": uuid.uuid4().hex,
     }
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -74,35 +102,105 @@ def get_user_by_id(user_id: str):
     return users_col.find_one({"_id": oid})
 
 
-# ---------- AUTH DEPENDENCIES ----------
+# ---------- PRINCIPAL CACHE ----------
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def invalidate_principal(user_id: str) -> None:
+    """
+    Drop a user's cached principals (one per token). Call whenever a user's
+    role or status changes.
+    """
+    principal_cache.pop_where(lambda key: key[0] == user_id)
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: Optional[str] = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+
+def _load_principal(user_id: str, jti: Optional[str] = None) -> Optional[dict]:
+    """
+    The normalized user for a token. Always a fresh copy: callers may mutate
+    it without touching the cached entry.
+    """
+    key = (user_id, jti)
+    principal = principal_cache.get(key)
+    if principal is not None:
+        return dict(principal)
 
     user = get_user_by_id(user_id)
     if user is None:
-        raise credentials_exception
+        return None
 
     # normalize what downstream sees
-    return {
+    principal = {
         "user_id": str(user["_id"]),
         "email": user["email"],
         "role": user["role"],
         "name": user.get("name"),
         "user_code": user.get("user_code"),
+        "status": user.get("status", "active"),
     }
+    principal_cache.set(key, principal)
+    return dict(principal)
+
+
+# ---------- AUTH DEPENDENCIES ----------
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_token(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _require_active(principal: dict) -> dict:
+    if principal.get("status", "active") != "active":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is not active",
+        )
+    return principal
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    payload = _decode_token(token)
+
+    principal = _load_principal(payload["sub"], payload.get("jti"))
+    if principal is None:
+        raise _credentials_exception()
+
+    return _require_active(principal)
+
+
+def get_current_user_fast(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    For hot endpoints (e.g. /transaction/new). With AUTH_TRUST_TOKEN_CLAIMS
+    on and a token that carries the claims, builds the principal from the
+    signed token alone; otherwise identical to get_current_user.
+    """
+    payload = _decode_token(token)
+
+    if AUTH_TRUST_TOKEN_CLAIMS and "status" in payload and "email" in payload:
+        return _require_active({
+            "user_id": payload["sub"],
+            "email": payload["email"],
+            "role": payload["role"],
+            "name": payload.get("name"),
+            "user_code": payload.get("user_code"),
+            "status": payload["status"],
+        })
+
+    principal = _load_principal(payload["sub"], payload.get("jti"))
+    if principal is None:
+        raise _credentials_exception()
+
+    return _require_active(principal)
 
 
 def get_current_admin(current_user: dict = Depends(get_current_user)) -> dict:
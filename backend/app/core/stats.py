@@ -0,0 +1,56 @@
+# backend/app/core/stats.py
+
+"""
+Small summary-statistics helpers shared by the metrics endpoints.
+
+- percentile(): nearest-rank percentile of an in-memory sample (the bounded
+  timing windows kept by the password pool, etc.)
+- log buckets: for percentiles over unbounded data (e.g. a day of LLM call
+  latencies in Mongo), group values into buckets of constant relative width
+  (BUCKETS_PER_OCTAVE per doubling) and estimate from the bucket counts.
+  Memory is bounded by the number of buckets, the error by half a bucket
+  (~9% with 4 per octave).
+"""
+
+import math
+from typing import Dict, Iterable, List
+
+BUCKETS_PER_OCTAVE = 4
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def log_bucket(value: float) -> int:
+    """Bucket of a positive value; values below 1 share bucket 0."""
+    return int(math.floor(math.log2(max(value, 1.0)) * BUCKETS_PER_OCTAVE))
+
+
+def log_bucket_expr(field: str) -> Dict:
+    """log_bucket as a Mongo aggregation expression on `field` (e.g. "$latency_ms")."""
+    return {"$floor": {"$multiply": [{"$log": [{"$max": [field, 1]}, 2]}, BUCKETS_PER_OCTAVE]}}
+
+
+def bucket_midpoint(bucket: int) -> float:
+    """Geometric middle of a bucket: the estimate reported for it."""
+    return 2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE)
+
+
+def bucket_percentile(counts: Iterable, pct: float) -> float:
+    """Nearest-rank percentile from (bucket, count) pairs."""
+    counts = sorted((int(b), n) for b, n in counts if n)
+    total = sum(n for _, n in counts)
+    if not total:
+        return 0.0
+    rank = min(total - 1, int(round(pct / 100.0 * (total - 1))))
+    seen = 0
+    for bucket, n in counts:
+        seen += n
+        if seen > rank:
+            return bucket_midpoint(bucket)
+    return bucket_midpoint(counts[-1][0])
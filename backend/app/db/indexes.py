@@ -0,0 +1,190 @@
+# backend/app/db/indexes.py
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from backend.app.db.mongo import (
+    alerts_col,
+    intel_col,
+    jobs_col,
+    llm_cache_col,
+    logs_col,
+    profiles_col,
+    txns_col,
+    users_col,
+)
+
+
+# IndexOptionsConflict / IndexKeySpecsConflict: same name, different options
+INDEX_CONFLICT_CODES = (85, 86)
+DUPLICATE_KEY = 11000
+
+
+def _replace_index(collection, keys, name: str, **options) -> None:
+    """
+    create_index, rebuilding an older index of the same name whose options
+    changed (e.g. it became unique). Fails, as it should, if existing
+    documents violate a new unique constraint.
+    """
+    try:
+        collection.create_index(keys, name=name, **options)
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        collection.drop_index(name)
+        collection.create_index(keys, name=name, **options)
+
+
+def _unique_index(collection, keys, name: str) -> None:
+    """
+    Unique index, or - while existing documents still violate it - the
+    same index non-unique plus a warning, so the API keeps starting.
+    Re-checked on every startup; becomes unique once the data is clean.
+    """
+    try:
+        _replace_index(collection, keys, name, unique=True)
+    except OperationFailure as e:
+        if e.code != DUPLICATE_KEY:
+            raise
+        print(f"[indexes] {collection.name}.{name} not unique yet, duplicates exist: {e}")
+        _replace_index(collection, keys, name)
+
+
+def ensure_indexes() -> None:
+    """
+    Create the indexes the API relies on.
+    create_index is idempotent, so this is safe to call on every startup.
+    """
+
+    # ---- transactions ----
+    # Date-range scans for the global analytics endpoints. Not covering for
+    # the risk-distribution pipeline: its rules facet needs
+    # rules.matched_rules, so every matched document is still fetched; the
+    # extra keys only serve level/score-only queries.
+    txns_col.create_index(
+        [
+            ("timestamp", ASCENDING),
+            ("ml_scores.risk_level", ASCENDING),
+            ("ml_scores.final_risk_score", ASCENDING),
+        ],
+        name="ts_level_score",
+    )
+
+    # Keyset pagination: (sort field, _id) in the same direction as the listing.
+    txns_col.create_index(
+        [("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+        name="user_ts_id",
+    )
+    # Case-file aggregates ($group) and top-k riskiest txns per user.
+    txns_col.create_index(
+        [
+            ("user_id", ASCENDING),
+            ("ml_scores.final_risk_score", DESCENDING),
+            ("ml_scores.anomaly_score", ASCENDING),
+        ],
+        name="user_risk_anomaly",
+    )
+
+    # ---- alerts ----
+    alerts_col.create_index(
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="created_id",
+    )
+    alerts_col.create_index(
+        [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="user_created_id",
+    )
+    # Triage queue filters (GET /alerts) and covered status/level counts.
+    alerts_col.create_index(
+        [
+            ("status", ASCENDING),
+            ("risk_level", ASCENDING),
+            ("created_at", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="status_level_created",
+    )
+    # Date-bounded status/level counts (GET /alerts/counts?start=&end=):
+    # created_at first so the range bounds the scan, still covered.
+    alerts_col.create_index(
+        [("created_at", DESCENDING), ("status", ASCENDING), ("risk_level", ASCENDING)],
+        name="created_status_level",
+    )
+    alerts_col.create_index(
+        [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="status_created",
+    )
+    alerts_col.create_index(
+        [("status", ASCENDING), ("final_risk_score", DESCENDING), ("_id", DESCENDING)],
+        name="status_score",
+    )
+    alerts_col.create_index(
+        [("user_code", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="user_code_created",
+    )
+    alerts_col.create_index(
+        [("rules_triggered", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="rules_created",
+    )
+    # One open incident per grouping key (services/incident_service.py).
+    alerts_col.create_index(
+        [("open_incident_key", ASCENDING)],
+        name="open_incident_key",
+        unique=True,
+        partialFilterExpression={"open_incident_key": {"$exists": True}},
+    )
+
+    # ---- users ----
+    # Unique: register and the bulk import check for existing emails first,
+    # but only the index closes the race between two concurrent creates.
+    _unique_index(users_col, [("email", ASCENDING)], "email")
+    # Admin search (services/user_search_service.py): anchored prefixes on
+    # the lowercase copies, trigram multikey index for substrings. Not
+    # unique: older data can hold case-only duplicate emails and duplicate
+    # codes (the old count-based numbering); register/import check email_lc
+    # and new codes come from the user_code counter.
+    _replace_index(users_col, [("user_code_lc", ASCENDING)], "user_code_lc")
+    _replace_index(users_col, [("email_lc", ASCENDING)], "email_lc")
+    users_col.create_index([("name_lc", ASCENDING)], name="name_lc")
+    users_col.create_index([("search_grams", ASCENDING)], name="search_grams")
+    users_col.create_index(
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="created_id",
+    )
+
+    # ---- user_profiles ----
+    # Lowest-trust users first (services/intel_precompute_service.py).
+    profiles_col.create_index([("trust_score", ASCENDING)], name="trust_score")
+
+    # ---- llm_cache ----
+    # Mongo removes entries once expires_at has passed.
+    llm_cache_col.create_index(
+        [("expires_at", ASCENDING)],
+        name="expires_at_ttl",
+        expireAfterSeconds=0,
+    )
+
+    # ---- agent_jobs ----
+    # One queued/running job per kind + user (services/agent_job_service.py).
+    jobs_col.create_index(
+        [("active_key", ASCENDING)],
+        name="active_key",
+        unique=True,
+        partialFilterExpression={"active_key": {"$exists": True}},
+    )
+    jobs_col.create_index(
+        [("expires_at", ASCENDING)],
+        name="expires_at_ttl",
+        expireAfterSeconds=0,
+    )
+
+    # ---- model_logs ----
+    # LLM usage report (GET /api/admin/llm-usage) scans by kind + time.
+    logs_col.create_index([("kind", ASCENDING), ("ts", DESCENDING)], name="kind_ts")
+
+    # ---- intel_precomputed ----
+    intel_col.create_index(
+        [("expires_at", ASCENDING)],
+        name="expires_at_ttl",
+        expireAfterSeconds=0,
+    )
@@ -20,3 +20,4 @@ class UserProfile(BaseModel):
     amount_stats: AmountStats
     risk_stats: RiskStats
     trust_score: float = 100.0
+    data_version: int = 0  # bumped on every update; keys the LLM cache
@@ -14,3 +14,9 @@ txns_col = db["transactions"]
 profiles_col = db["user_profiles"]
 alerts_col = db["alerts"]
 logs_col = db["model_logs"]
+counters_col = db["counters"]
+llm_cache_col = db["llm_cache"]
+jobs_col = db["agent_jobs"]
+intel_col = db["intel_precomputed"]
+locks_col = db["locks"]
+rescore_col = db["rescore_checkpoints"]
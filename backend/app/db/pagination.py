@@ -0,0 +1,115 @@
+# backend/app/db/pagination.py
+
+"""
+Keyset (seek) pagination helpers.
+
+Every paged listing sorts on (<sort_field>, _id) in the same direction and is
+backed by a compound index on exactly those keys, so fetching page N is an
+index seek from the last row of page N-1 — never a skip over N pages.
+
+The cursor handed to clients is opaque: urlsafe base64 of the last row's
+sort value and _id.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+MAX_PAGE_SIZE = 500
+
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    return {"t": "raw", "v": value}
+
+
+def _decode_value(packed: Dict[str, Any]) -> Any:
+    if packed.get("t") == "dt":
+        return datetime.fromisoformat(packed["v"])
+    return packed.get("v")
+
+
+def encode_cursor(doc: Dict[str, Any], sort_field: str) -> str:
+    payload = {"k": _encode_value(_get_path(doc, sort_field)), "id": str(doc["_id"])}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return _decode_value(payload["k"]), ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    cur: Any = doc
+    for key in path.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(key)
+    return cur
+
+
+def keyset_filter(
+    base_query: Dict[str, Any],
+    sort_field: str,
+    cursor: Optional[str],
+    direction: int = -1,
+) -> Dict[str, Any]:
+    """
+    AND the seek predicate for `cursor` onto base_query.
+    direction -1 = newest first (the default for every listing here).
+    """
+    if not cursor:
+        return base_query
+
+    last_value, last_id = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    seek = {
+        "$or": [
+            {sort_field: {op: last_value}},
+            {sort_field: last_value, "_id": {op: last_id}},
+        ]
+    }
+
+    if not base_query:
+        return seek
+    return {"$and": [base_query, seek]}
+
+
+def fetch_page(
+    collection,
+    base_query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    direction: int = -1,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return (docs, next_cursor). next_cursor is None on the last page.
+    Reads limit+1 rows to know whether another page exists.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = keyset_filter(base_query, sort_field, cursor, direction)
+
+    docs = list(
+        collection.find(query, projection)
+        .sort([(sort_field, direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+
+    return docs, next_cursor
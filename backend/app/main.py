@@ -1,7 +1,18 @@
 # backend/app/main.py
 
+import threading
+
 from fastapi import FastAPI
 from backend.app.db.mongo import db
+from backend.app.db.indexes import ensure_indexes
+from backend.app.core.password_pool import password_pool
+from backend.app.ml.engine import model_manager
+from backend.app.services.agent_job_service import agent_job_runner
+from backend.app.services.alert_stream_service import alert_broadcaster
+from backend.app.services.intel_precompute_service import INTEL_PRECOMPUTE_ENABLED, intel_scheduler
+from backend.app.services.llm_telemetry import telemetry
+from backend.app.services.user_search_service import backfill_search_fields
+from backend.app.services.user_code_service import ensure_user_code_counter
 from fastapi.middleware.cors import CORSMiddleware
 
 # Auth
@@ -20,8 +31,10 @@ from backend.app.api.agent_investigation import router as investigation_router
 from backend.app.api.agent_risk_trend import router as trend_router
 from backend.app.api.admin_users import router as admin_users_router  # All Users
 from backend.app.api.agent_intel import router as intel_router  # User Intel
+from backend.app.api.agent_jobs import router as jobs_router  # Background agent jobs
 from backend.app.api.admin_analytics import router as admin_analytics_router # Global Visuals
 from backend.app.api.alerts import router as alerts_router
+from backend.app.api.admin_models import router as admin_models_router  # Model registry
 
 
 app = FastAPI(title="Veritas Sentinel API")
@@ -31,8 +44,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+@app.on_event("startup")
+def create_indexes():
+    ensure_indexes()
+    ensure_user_code_counter()
+    # users created before the search fields existed; no-op once done
+    threading.Thread(target=backfill_search_fields, daemon=True).start()
+    if INTEL_PRECOMPUTE_ENABLED:
+        intel_scheduler.start()
+    # follow registry activations/rollbacks made by other workers
+    model_manager.start_watcher()
+    # detect change streams vs local mode now, so alerts written before the
+    # first SSE client connects are still buffered for replay
+    alert_broadcaster.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    alert_broadcaster.stop()
+    agent_job_runner.shutdown()
+    intel_scheduler.stop()
+    telemetry.stop()
+    model_manager.stop()
+    password_pool.shutdown()
+
+
 # ---- Public Auth Routes ----
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 
@@ -49,8 +89,10 @@ app.include_router(speculate_router, prefix="/api/agent", tags=["agent"])
 app.include_router(investigation_router, prefix="/api/agent", tags=["agent"])
 app.include_router(admin_users_router, prefix="/api/admin", tags=["admin"])
 app.include_router(trend_router, prefix="/api/agent", tags=["agent"])
+app.include_router(jobs_router, prefix="/api/agent", tags=["agent-jobs"])
 app.include_router(admin_analytics_router, prefix="/api/admin", tags=["admin-analytics"])
 app.include_router(alerts_router, prefix="/api/admin", tags=["alerts"])
+app.include_router(admin_models_router, prefix="/api/admin", tags=["admin-models"])
 
 
 @app.get("/")
@@ -1,22 +1,23 @@
 # backend/app/ml/engine.py
 
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
 import joblib
 import numpy as np
-from pathlib import Path
-from typing import Dict, Any
 
+from backend.app.ml import registry
 from backend.app.ml.predictor import predict_transaction as heuristic_predict
+from backend.app.ml.predictor import score_version
 
 BASE_PATH = Path(__file__).resolve().parent / "models"
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "30"))
 
-# These are loaded for future use if you want to plug in real models.
-supervised_model = joblib.load(BASE_PATH / "supervised_xgb.pkl")
-anomaly_model = joblib.load(BASE_PATH / "anomaly_iforest.pkl")
-scaler = joblib.load(BASE_PATH / "scaler.pkl")
-
-print("✔ ML models loaded successfully")
-
-# MUST match Colab FEATURE_COLUMNS exactly
+# MUST match Colab FEATURE_COLUMNS exactly (legacy bundle in ml/models/)
 FEATURE_COLUMNS = [
     "step",
     "amount",
@@ -24,22 +25,14 @@ FEATURE_COLUMNS = [
 ]
 
 
-def scale_features(raw_features: dict):
-    """
-    raw_features: dict from API
-    returns: scaled numpy array in correct order
-    """
-    try:
-        row = [raw_features[col] for col in FEATURE_COLUMNS]
-    except KeyError as e:
-        missing = str(e)
-        raise ValueError(
-            f"Missing feature in request: {missing}. "
-            f"Required keys: {FEATURE_COLUMNS}"
-        )
-
-    arr = np.array(row).reshape(1, -1)
-    return scaler.transform(arr)
+def _load_legacy_bundle() -> Dict[str, Any]:
+    """Fixed files in ml/models/, used until a registry bundle is activated."""
+    return {
+        "manifest": {"version": "legacy", "feature_columns": FEATURE_COLUMNS, "metrics": {}},
+        "supervised_model": joblib.load(BASE_PATH / "supervised_xgb.pkl"),
+        "anomaly_model": joblib.load(BASE_PATH / "anomaly_iforest.pkl"),
+        "scaler": joblib.load(BASE_PATH / "scaler.pkl"),
+    }
 
 
 class TransactionEngine:
@@ -49,13 +42,195 @@ class TransactionEngine:
 
     Right now this delegates to the heuristic predictor in predictor.py.
     Later you can swap to supervised_model / anomaly_model + scaler.
+
+    One instance = one immutable model bundle; a new bundle means a new
+    engine (see ModelManager).
     """
 
-    def __init__(self):
-        self.supervised_model = supervised_model
-        self.anomaly_model = anomaly_model
-        self.scaler = scaler
+    def __init__(self, bundle: Optional[Dict[str, Any]] = None):
+        bundle = bundle or _load_legacy_bundle()
+        self.version = bundle["manifest"]["version"]
+        self.feature_columns = bundle["manifest"]["feature_columns"]
+        self.metrics = bundle["manifest"].get("metrics", {})
+        self.supervised_model = bundle["supervised_model"]
+        self.anomaly_model = bundle["anomaly_model"]
+        self.scaler = bundle["scaler"]
+        # Bundle whose models produce the scores. None while predict_transaction
+        # is heuristic-only, so stored scores never claim a model that didn't
+        # produce them; set it to self.version when the models are wired in.
+        self.model_version: Optional[str] = None
+        self.score_version = score_version(self.model_version)
+
+    def scale_features(self, raw_features: dict):
+        """
+        raw_features: dict from API
+        returns: scaled numpy array in correct order
+        """
+        try:
+            row = [raw_features[col] for col in self.feature_columns]
+        except KeyError as e:
+            missing = str(e)
+            raise ValueError(
+                f"Missing feature in request: {missing}. "
+                f"Required keys: {self.feature_columns}"
+            )
+
+        arr = np.array(row).reshape(1, -1)
+        return self.scaler.transform(arr)
+
+    def warm(self) -> None:
+        """Run every model once so lazy initialisation happens off the request path."""
+        row = np.zeros((1, len(self.feature_columns)), dtype=np.float32)
+        scaled = self.scaler.transform(row)
+        self.supervised_model.predict_proba(scaled)
+        self.anomaly_model.decision_function(scaled)
+        heuristic_predict({"step": 1, "amount": 1.0, "isFlaggedFraud": 0}, {})
 
     def predict_transaction(self, features: Dict, profile: Dict) -> Dict[str, Any]:
         # Currently we just use the heuristic predictor
         return heuristic_predict(features, profile)
+
+
+class ModelManager:
+    """
+    Holds the live TransactionEngine and swaps it without blocking requests.
+
+    - request handlers read `manager.engine` once per request; replacing
+      that attribute is a single atomic reference assignment, so in-flight
+      requests finish on the engine they started with
+    - reload() loads + checksum-verifies + warms the new bundle in a
+      background thread and only then swaps
+    - a watcher thread re-reads registry/ACTIVE.json every
+      MODEL_WATCH_SECONDS, so every API worker follows an activate or
+      rollback done by any of them (or by the registry CLI)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_error: Optional[str] = None
+        self.loaded_at = datetime.utcnow()
+        self.engine = self._build(registry.read_active()["active"])
+
+    def _build(self, version: Optional[str]) -> TransactionEngine:
+        if version is None:
+            engine = TransactionEngine()
+        else:
+            engine = TransactionEngine(registry.load_bundle(version))
+        engine.warm()
+        return engine
+
+    def reload(self, version: Optional[str] = None) -> bool:
+        """
+        Load `version` (default: the registry's active one) in the background.
+        Returns False if a reload is already running.
+        """
+        if not self._claim():
+            return False
+        self._start(version)
+        return True
+
+    def _claim(self) -> bool:
+        """Take the single reload slot; False if a reload is already running."""
+        with self._lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._reloading = False
+
+    def _start(self, version: Optional[str]) -> None:
+        """Run a claimed reload in the background; _reload releases the slot."""
+        threading.Thread(target=self._reload, args=(version,), name="model-reload", daemon=True).start()
+
+    def _reload(self, version: Optional[str]) -> None:
+        try:
+            target = version or registry.read_active()["active"]
+            started = time.perf_counter()
+            engine = self._build(target)
+            self.engine = engine  # the swap
+            self.loaded_at = datetime.utcnow()
+            self.last_error = None
+            print(f"✔ Model bundle {engine.version} live ({time.perf_counter() - started:.2f}s load+warm)")
+        except Exception as e:
+            # keep serving the current engine
+            self.last_error = f"{e.__class__.__name__}: {e}"
+        finally:
+            self._release()
+
+    def activate(self, version: str) -> bool:
+        """
+        Point the registry at `version` (all workers follow) and load it here
+        now. The reload slot is claimed first: returns False, with the
+        registry untouched, if a reload is already running.
+        """
+        if not self._claim():
+            return False
+        try:
+            registry.set_active(version)
+        except Exception:
+            self._release()
+            raise
+        self._start(version)
+        return True
+
+    def rollback(self) -> Optional[str]:
+        """
+        Re-activate the previous bundle; returns the version rolled back to,
+        or None (registry untouched) if a reload is already running.
+        """
+        if not self._claim():
+            return None
+        try:
+            state = registry.rollback()
+        except Exception:
+            self._release()
+            raise
+        self._start(state["active"])
+        return state["active"]
+
+    def start_watcher(self) -> None:
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(MODEL_WATCH_SECONDS):
+            try:
+                active = registry.read_active()["active"]
+            except Exception:
+                continue
+            if active and active != self.engine.version:
+                self.reload(active)
+
+    def status(self) -> Dict[str, Any]:
+        engine = self.engine
+        return {
+            "version": engine.version,
+            "score_version": engine.score_version,
+            "feature_columns": engine.feature_columns,
+            "metrics": engine.metrics,
+            "loaded_at": self.loaded_at,
+            "reloading": self._reloading,
+            "last_error": self.last_error,
+        }
+
+
+model_manager = ModelManager()
+
+
+def scale_features(raw_features: dict):
+    """Scale with the live bundle's scaler and feature order."""
+    return model_manager.engine.scale_features(raw_features)
+
+print("✔ ML models loaded successfully")
@@ -1,6 +1,6 @@
 # backend/app/ml/predictor.py
 
-from typing import Dict
+from typing import Dict, Optional
 from math import exp
 
 """
@@ -42,6 +42,16 @@ Output:
 """
 
 
+# Bump whenever the scoring below changes; stored transactions carry
+# score_version so old and new scores can be told apart (and rescored).
+HEURISTIC_VERSION = "heuristic-1"
+
+
+def score_version(model_version: Optional[str] = None) -> str:
+    """model_version: the bundle whose models fed the score, if any did."""
+    return f"{HEURISTIC_VERSION}+{model_version}" if model_version else HEURISTIC_VERSION
+
+
 def _safe_get(d: Dict, path, default=0.0):
     cur = d
     try:
@@ -0,0 +1,217 @@
+# backend/app/ml/registry.py
+
+"""
+Versioned model registry on disk.
+
+    <MODEL_REGISTRY_DIR>/
+        20250101-120000/            one bundle per training run
+            supervised_xgb.pkl
+            anomaly_iforest.pkl
+            scaler.pkl              the scaler the models were trained with
+            manifest.json           version, feature_columns, preprocessing,
+                                    metrics, sha256 per file
+        ACTIVE.json                 {"active": "<version>", "history": [older actives]}
+
+Bundles are written to a temp dir and renamed into place, and ACTIVE.json
+is replaced atomically, so a reader never sees a half-written bundle or
+pointer. Only stdlib + joblib here: training scripts import this module
+without pulling in the API.
+
+CLI:
+    python -m backend.app.ml.registry list
+    python -m backend.app.ml.registry activate <version>
+    python -m backend.app.ml.registry rollback
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+REGISTRY_DIR = Path(
+    os.getenv("MODEL_REGISTRY_DIR", Path(__file__).resolve().parent / "registry")
+)
+ACTIVE_FILE = "ACTIVE.json"
+MANIFEST_FILE = "manifest.json"
+BUNDLE_FILES = {
+    "supervised_model": "supervised_xgb.pkl",
+    "anomaly_model": "anomaly_iforest.pkl",
+    "scaler": "scaler.pkl",
+}
+HISTORY_LIMIT = 20
+
+
+class RegistryError(Exception):
+    """Missing/corrupt bundle or nothing to roll back to."""
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_json_atomic(path: Path, payload: Dict[str, Any]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ---------- WRITE ----------
+
+def publish_bundle(
+    supervised_model: Any,
+    anomaly_model: Any,
+    scaler: Any,
+    feature_columns: List[str],
+    metrics: Optional[Dict[str, Any]] = None,
+    preprocessing: Optional[Dict[str, Any]] = None,
+    version: Optional[str] = None,
+    activate: bool = False,
+    registry_dir: Path = REGISTRY_DIR,
+) -> str:
+    """
+    Write a new bundle and return its version. `preprocessing` is how raw
+    rows became feature_columns (category -> code mappings, dropped
+    columns, ...), so serving can encode exactly as training did.
+    """
+    registry_dir = Path(registry_dir)
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    version = version or datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    final_dir = registry_dir / version
+    if final_dir.exists():
+        raise RegistryError(f"Bundle {version} already exists")
+
+    tmp_dir = Path(tempfile.mkdtemp(dir=registry_dir, prefix=".tmp-"))
+    try:
+        objects = {
+            "supervised_model": supervised_model,
+            "anomaly_model": anomaly_model,
+            "scaler": scaler,
+        }
+        checksums = {}
+        for key, filename in BUNDLE_FILES.items():
+            joblib.dump(objects[key], tmp_dir / filename)
+            checksums[filename] = _sha256(tmp_dir / filename)
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(),
+            "feature_columns": list(feature_columns),
+            "preprocessing": preprocessing or {},
+            "metrics": metrics or {},
+            "files": checksums,
+        }
+        _write_json_atomic(tmp_dir / MANIFEST_FILE, manifest)
+        os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if activate:
+        set_active(version, registry_dir)
+    return version
+
+
+# ---------- READ ----------
+
+def read_manifest(version: str, registry_dir: Path = REGISTRY_DIR) -> Dict[str, Any]:
+    path = Path(registry_dir) / version / MANIFEST_FILE
+    if not path.exists():
+        raise RegistryError(f"Unknown model version: {version}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_bundle(version: str, registry_dir: Path = REGISTRY_DIR) -> Dict[str, Any]:
+    """Load a bundle after verifying every file against its manifest checksum."""
+    manifest = read_manifest(version, registry_dir)
+    bundle_dir = Path(registry_dir) / version
+
+    loaded = {"manifest": manifest}
+    for key, filename in BUNDLE_FILES.items():
+        path = bundle_dir / filename
+        if not path.exists():
+            raise RegistryError(f"{version}: missing {filename}")
+        if _sha256(path) != manifest["files"].get(filename):
+            raise RegistryError(f"{version}: checksum mismatch for {filename}")
+        loaded[key] = joblib.load(path)
+    return loaded
+
+
+def list_versions(registry_dir: Path = REGISTRY_DIR) -> List[Dict[str, Any]]:
+    registry_dir = Path(registry_dir)
+    if not registry_dir.exists():
+        return []
+    versions = []
+    for child in sorted(registry_dir.iterdir()):
+        if child.is_dir() and not child.name.startswith(".") and (child / MANIFEST_FILE).exists():
+            manifest = read_manifest(child.name, registry_dir)
+            versions.append({
+                "version": manifest["version"],
+                "created_at": manifest.get("created_at"),
+                "metrics": manifest.get("metrics", {}),
+            })
+    return versions
+
+
+def read_active(registry_dir: Path = REGISTRY_DIR) -> Dict[str, Any]:
+    path = Path(registry_dir) / ACTIVE_FILE
+    if not path.exists():
+        return {"active": None, "history": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def set_active(version: str, registry_dir: Path = REGISTRY_DIR) -> Dict[str, Any]:
+    read_manifest(version, registry_dir)  # must exist
+    state = read_active(registry_dir)
+    if state["active"] == version:
+        return state
+    history = ([state["active"]] if state["active"] else []) + state["history"]
+    state = {"active": version, "history": history[:HISTORY_LIMIT], "updated_at": datetime.utcnow().isoformat()}
+    _write_json_atomic(Path(registry_dir) / ACTIVE_FILE, state)
+    return state
+
+
+def rollback(registry_dir: Path = REGISTRY_DIR) -> Dict[str, Any]:
+    """Re-activate the previously active bundle."""
+    state = read_active(registry_dir)
+    if not state["history"]:
+        raise RegistryError("No previous model version to roll back to")
+    previous, rest = state["history"][0], state["history"][1:]
+    state = {"active": previous, "history": rest, "updated_at": datetime.utcnow().isoformat()}
+    _write_json_atomic(Path(registry_dir) / ACTIVE_FILE, state)
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model registry")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    activate_cmd = sub.add_parser("activate")
+    activate_cmd.add_argument("version")
+    sub.add_parser("rollback")
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        active = read_active()["active"]
+        for v in list_versions():
+            marker = "*" if v["version"] == active else " "
+            print(f"{marker} {v['version']}  {v['created_at']}  {json.dumps(v['metrics'])}")
+    elif args.cmd == "activate":
+        print(set_active(args.version))
+    else:
+        print(rollback())
@@ -0,0 +1,292 @@
+# backend/app/services/agent_job_service.py
+
+"""
+Background queue for slow agent (LLM) work.
+
+POST /api/agent/jobs stores a job in `agent_jobs` and returns its id right
+away; a bounded thread pool in this process runs it and writes the result
+back. Clients poll GET /api/agent/jobs/{job_id} (optionally long-polling with
+?wait=N), so a 30 s LLM round trip no longer holds an API threadpool slot.
+
+- at most JOB_WORKERS jobs run at once, at most JOB_MAX_PENDING are queued
+  or running; beyond that submit() raises JobQueueFull (HTTP 503)
+- while a job is queued/running it carries active_key = "<kind>:<user_id>"
+  (unique partial index), so a duplicate submission gets the existing job
+- finished jobs expire JOB_RESULT_TTL seconds later (TTL index)
+- the owning process heartbeats updated_at on every job it holds (queued or
+  running) every JOB_HEARTBEAT_SECONDS; a job not heartbeated for
+  JOB_STALE_SECONDS belongs to a dead process and is replaced on the next
+  submission
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.db.mongo import jobs_col
+from backend.app.services.agent_service import speculate_user
+from backend.app.services.behavior_summary_service import generate_behavior_summary
+from backend.app.services.investigation_service import generate_case_file
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", str(60 * 60)))  # seconds
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+JOB_HEARTBEAT_SECONDS = max(1, JOB_STALE_SECONDS // 5)
+JOB_POLL_INTERVAL = 0.5
+MAX_WAIT_SECONDS = 30
+
+JOB_KINDS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "investigation": generate_case_file,
+    "behaviour": generate_behavior_summary,
+    "speculation": speculate_user,
+}
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobQueueFull(Exception):
+    """Too many agent jobs in flight; caller should retry later."""
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job["_id"],
+        "kind": job["kind"],
+        "user_id": job["user_id"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+class AgentJobRunner:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # ids of the jobs this process has queued or is running
+        self._held: set = set()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        # job_id -> [(loop, asyncio.Event)] for long-poll waiters in this process
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="agent-job"
+            )
+        if self._heartbeat is None:
+            self._stop.clear()
+            self._heartbeat = threading.Thread(target=self._beat, name="agent-job-heartbeat", daemon=True)
+            self._heartbeat.start()
+        return self._executor
+
+    def _beat(self) -> None:
+        """Keep updated_at fresh on held jobs, so only a dead owner's jobs go stale."""
+        while not self._stop.wait(JOB_HEARTBEAT_SECONDS):
+            with self._lock:
+                held = list(self._held)
+            if not held:
+                continue
+            now = datetime.utcnow()
+            try:
+                jobs_col.update_many(
+                    {"_id": {"$in": held}, "status": {"$in": list(ACTIVE_STATUSES)}},
+                    {"$set": {
+                        "updated_at": now,
+                        "expires_at": now + timedelta(seconds=JOB_STALE_SECONDS + JOB_RESULT_TTL),
+                    }},
+                )
+            except Exception:
+                # next beat retries; a job only goes stale after several misses
+                pass
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._heartbeat = None
+
+    # ---------- SUBMISSION ----------
+
+    def submit(self, kind: str, user_id: str, requested_by: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a job, or return the one already queued/running for the same
+        (kind, user_id). Returns (job, coalesced).
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        active_key = f"{kind}:{user_id}"
+        now = datetime.utcnow()
+
+        existing = jobs_col.find_one({"active_key": active_key})
+        if existing is not None:
+            with self._lock:
+                held_here = existing["_id"] in self._held
+            if held_here or existing["updated_at"] > now - timedelta(seconds=JOB_STALE_SECONDS):
+                return _public(existing), True
+            # owner process is gone; release the key so a fresh job can take it
+            jobs_col.update_one(
+                {"_id": existing["_id"], "active_key": active_key},
+                {
+                    "$set": {"status": "failed", "error": "stale", "updated_at": now},
+                    "$unset": {"active_key": ""},
+                },
+            )
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} agent jobs pending")
+            self._pending += 1
+
+        job = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "user_id": user_id,
+            "requested_by": requested_by,
+            "status": "queued",
+            "active_key": active_key,
+            "owner": self.owner,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            # abandoned jobs are cleaned up too
+            "expires_at": now + timedelta(seconds=JOB_STALE_SECONDS + JOB_RESULT_TTL),
+        }
+        try:
+            jobs_col.insert_one(job)
+        except DuplicateKeyError:
+            # lost the race to a concurrent submission
+            self._release()
+            winner = jobs_col.find_one({"active_key": active_key})
+            if winner is None:
+                return self.submit(kind, user_id, requested_by)
+            return _public(winner), True
+        except Exception:
+            self._release()
+            raise
+
+        with self._lock:
+            self._held.add(job["_id"])
+        try:
+            self._get_executor().submit(self._run, job["_id"], kind, user_id)
+        except RuntimeError:
+            # executor shut down underneath us
+            self._release(job["_id"])
+            self._finish(job["_id"], "failed", error="job runner unavailable")
+            raise JobQueueFull("job runner is shutting down")
+        return _public(job), False
+
+    def _release(self, job_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._held.discard(job_id)
+
+    # ---------- EXECUTION ----------
+
+    def _run(self, job_id: str, kind: str, user_id: str) -> None:
+        try:
+            jobs_col.update_one(
+                {"_id": job_id},
+                {"$set": {"status": "running", "started_at": datetime.utcnow(), "updated_at": datetime.utcnow()}},
+            )
+            result = JOB_KINDS[kind](user_id)
+        except Exception as e:
+            self._finish(job_id, "failed", error=str(e))
+        else:
+            self._finish(job_id, "done", result=result)
+        finally:
+            self._release(job_id)
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        jobs_col.update_one(
+            {"_id": job_id},
+            {
+                "$set": {
+                    "status": status,
+                    "result": result,
+                    "error": error,
+                    "finished_at": now,
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=JOB_RESULT_TTL),
+                },
+                "$unset": {"active_key": ""},
+            },
+        )
+        self._notify(job_id)
+
+    # ---------- COMPLETION ----------
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = jobs_col.find_one({"_id": job_id})
+        return _public(job) if job is not None else None
+
+    def _notify(self, job_id: str) -> None:
+        with self._lock:
+            waiters = self._waiters.pop(job_id, [])
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll: return the job once it is finished or `timeout` passes.
+        Jobs run by this process wake the waiter directly; jobs owned by
+        another API worker are picked up by re-reading every JOB_POLL_INTERVAL.
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters.setdefault(job_id, []).append((loop, event))
+
+        deadline = loop.time() + min(timeout, MAX_WAIT_SECONDS)
+        try:
+            while True:
+                job = await run_in_threadpool(self.get, job_id)
+                if job is None or job["status"] not in ACTIVE_STATUSES:
+                    return job
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(remaining, JOB_POLL_INTERVAL))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(job_id)
+                if waiters and (loop, event) in waiters:
+                    waiters.remove((loop, event))
+                    if not waiters:
+                        del self._waiters[job_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+            }
+
+
+agent_job_runner = AgentJobRunner(JOB_WORKERS, JOB_MAX_PENDING)
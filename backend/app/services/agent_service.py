@@ -1,18 +1,14 @@
 # backend/app/services/agent_service.py
 
-import os
 from statistics import mean
+from typing import Any, Dict, List, Optional
 
 from backend.app.db.mongo import txns_col, profiles_col
-from backend.app.services.llm_client import LLMClient
-
-llm = LLMClient(provider=os.getenv("LLM_PROVIDER", "openai"))
+from backend.app.services.llm_client import llm
 
 
 def speculate_user(user_id: str):
     profile = profiles_col.find_one({"user_id": user_id})
-    if not profile:
-        return {"success": False, "message": "User profile not found."}
 
     # Fetch last 20 transactions
     txns = list(
@@ -21,6 +17,18 @@ def speculate_user(user_id: str):
         .limit(20)
     )
 
+    return _speculate(user_id, profile, txns)
+
+
+def speculate_from_snapshot(snapshot: Dict[str, Any]):
+    """Same as speculate_user, but on data already loaded by load_user_snapshot."""
+    return _speculate(snapshot["user_id"], snapshot["profile"], snapshot["txns"][:20])
+
+
+def _speculate(user_id: str, profile: Optional[Dict], txns: List[Dict]):
+    if not profile:
+        return {"success": False, "message": "User profile not found."}
+
     if not txns:
         return {
             "success": True,
@@ -78,7 +86,12 @@ Return ONLY valid JSON in the structure:
 """
 
     try:
-        llm_output = llm.generate(prompt)
+        llm_output = llm.generate(
+            prompt,
+            user_id=user_id,
+            data_version=profile.get("data_version", 0),
+            agent="speculation",
+        )
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -0,0 +1,184 @@
+# backend/app/services/alert_stream_service.py
+
+"""
+Live alert feed for the admin dashboard.
+
+One upstream subscription per process fans out to any number of SSE clients:
+
+- "change_stream" mode: a daemon thread tails alerts_col.watch() (replica set /
+  Atlas). Every insert/update on alerts reaches every analyst, no matter which
+  API worker wrote it.
+- "local" mode: standalone mongod has no change streams, so writers call
+  publish_alert() and events are fanned out in-process only.
+
+The upstream subscription starts with the app (main.py), not with the first
+SSE client, so the mode is known and local events are buffered from the
+start. Until the mode is known, published events are buffered as local ones.
+
+Each event gets an id (the change-stream resume token, or a local sequence
+number). A bounded ring buffer of recent events lets a reconnecting client
+send Last-Event-ID and replay what it missed; if the id has already fallen out
+of the buffer the client is told to resync from /api/admin/alerts instead.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend.app.db.mongo import alerts_col
+
+REPLAY_BUFFER_SIZE = 1000
+SUBSCRIBER_QUEUE_SIZE = 256
+RETRY_SECONDS = 5
+
+# standalone mongod: "$changeStream stage is only supported on replica sets"
+_CHANGE_STREAM_UNSUPPORTED = {40573}
+
+
+class AlertBroadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._seq = itertools.count(1)
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.mode: Optional[str] = None  # "change_stream" | "local"
+
+    # ---------- UPSTREAM ----------
+
+    def start(self) -> None:
+        """Start the single upstream subscription (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._watch_loop, name="alert-change-stream", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with alerts_col.watch(
+                    pipeline=[
+                        {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}
+                    ],
+                    full_document="updateLookup",
+                    resume_after=self._resume_token,
+                    max_await_time_ms=1000,
+                ) as stream:
+                    self.mode = "change_stream"
+                    while not self._stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        self._resume_token = change["_id"]
+                        doc = change.get("fullDocument")
+                        if doc is None:
+                            continue
+                        self._dispatch(
+                            event_id=change["_id"]["_data"],
+                            op=change["operationType"],
+                            alert=doc,
+                        )
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAM_UNSUPPORTED:
+                    # Standalone server: writers publish in-process instead.
+                    self.mode = "local"
+                    return
+                # e.g. resume token no longer in the oplog: start fresh
+                self._resume_token = None
+                time.sleep(RETRY_SECONDS)
+            except PyMongoError:
+                time.sleep(RETRY_SECONDS)
+
+    def publish_alert(self, alert: Dict[str, Any], op: str = "insert") -> None:
+        """
+        Called by code that writes alerts. A no-op in "change_stream" mode,
+        where the write comes back through the upstream watch.
+        """
+        if self.mode == "change_stream":
+            return
+        self._dispatch(event_id=str(next(self._seq)), op=op, alert=alert)
+
+    def publish_resync(self) -> None:
+        """
+        Bulk writes are not replayed alert-by-alert in "local" mode; tell
+        clients to refetch instead.
+        """
+        if self.mode == "change_stream":
+            return
+        self._dispatch(event_id=str(next(self._seq)), op="resync", alert={})
+
+    # ---------- FAN-OUT ----------
+
+    def _dispatch(self, event_id: str, op: str, alert: Dict[str, Any]) -> None:
+        event = {"id": event_id, "op": op, "alert": alert}
+        with self._lock:
+            self._buffer.append(event)
+            subscribers = list(self._subscribers.items())
+
+        for queue, loop in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    def _offer(self, queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: cut it loose. It reconnects with Last-Event-ID
+            # and replays from the buffer instead of stalling everyone else.
+            self.unsubscribe(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)  # end-of-stream sentinel
+
+    def subscribe(
+        self, last_event_id: Optional[str] = None
+    ) -> Tuple[asyncio.Queue, List[Dict[str, Any]], bool]:
+        """
+        Register a client on the current event loop.
+
+        Returns (queue, replay_events, resync_needed):
+        - replay_events: buffered events after last_event_id
+        - resync_needed: last_event_id is unknown (too old), client should refetch
+        """
+        self.start()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._subscribers[queue] = loop
+            buffered = list(self._buffer)
+
+        if not last_event_id:
+            return queue, [], False
+
+        for i, event in enumerate(buffered):
+            if event["id"] == last_event_id:
+                return queue, buffered[i + 1:], False
+
+        return queue, [], True
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+alert_broadcaster = AlertBroadcaster()
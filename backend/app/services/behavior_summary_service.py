@@ -2,13 +2,11 @@
 
 from datetime import datetime, timedelta, timezone
 from statistics import mean
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from backend.app.db.mongo import txns_col, profiles_col
-from backend.app.services.llm_client import LLMClient
-
-llm = LLMClient(provider="openai")
-
+from backend.app.services.llm_client import LLMError, llm
+from backend.app.services.llm_schemas import BehaviourSection, parse_llm_json
 
 def _to_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
@@ -16,14 +14,85 @@ def _to_utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def generate_behavior_summary(user_id: str) -> Dict[str, Any]:
+def _load(user_id: str) -> Tuple[Optional[Dict], List[Dict]]:
     profile = profiles_col.find_one({"user_id": user_id})
-    if not profile:
-        return {"success": False, "message": "User profile not found"}
 
     raw_txns = list(
         txns_col.find({"user_id": user_id}).sort("timestamp", -1).limit(100)
     )
+    return profile, raw_txns
+
+
+def generate_behavior_summary(user_id: str) -> Dict[str, Any]:
+    profile, raw_txns = _load(user_id)
+    return _summarize(user_id, profile, raw_txns)
+
+
+def behavior_summary_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Same as generate_behavior_summary, on data from load_user_snapshot."""
+    return _summarize(snapshot["user_id"], snapshot["profile"], snapshot["txns"][:100])
+
+
+def _summarize(user_id: str, profile: Optional[Dict], raw_txns: List[Dict]) -> Dict[str, Any]:
+    prompt, early = _summary_prompt(user_id, profile, raw_txns)
+    if early is not None:
+        return early
+
+    llm_json = llm.generate(
+        prompt,
+        user_id=user_id,
+        data_version=profile.get("data_version", 0),
+        agent="behaviour",
+    )
+
+    return {
+        "success": True,
+        "user_id": user_id,
+        "summary": llm_json,
+    }
+
+
+def stream_behavior_summary(user_id: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Streaming generate_behavior_summary. Yields ("token", text) while the
+    LLM writes, then ("done", result) with the validated summary, or
+    ("error", result) if the provider failed mid-stream.
+    """
+    profile, raw_txns = _load(user_id)
+    prompt, early = _summary_prompt(user_id, profile, raw_txns)
+    if early is not None:
+        yield "done", early
+        return
+
+    parts = []
+    try:
+        for chunk in llm.generate_stream(
+            prompt,
+            user_id=user_id,
+            data_version=profile.get("data_version", 0),
+            validate=lambda text: parse_llm_json(text, BehaviourSection) is not None,
+            agent="behaviour",
+        ):
+            parts.append(chunk)
+            yield "token", chunk
+    except LLMError as e:
+        yield "error", {"success": False, "user_id": user_id, "message": e.fallback_text}
+        return
+
+    text = "".join(parts).strip()
+    parsed = parse_llm_json(text, BehaviourSection)
+    yield "done", {
+        "success": True,
+        "user_id": user_id,
+        "summary": parsed.dict() if parsed else text,
+        "valid": parsed is not None,
+    }
+
+
+def _summary_prompt(user_id: str, profile: Optional[Dict], raw_txns: List[Dict]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """(prompt, None), or (None, response) when there is nothing to ask the LLM."""
+    if not profile:
+        return None, {"success": False, "message": "User profile not found"}
 
     cutoff = _to_utc(datetime.utcnow()) - timedelta(days=30)
     txns = []
@@ -47,7 +116,7 @@ def generate_behavior_summary(user_id: str) -> Dict[str, Any]:
             txns.append(t)
 
     if not txns:
-        return {
+        return None, {
             "success": True,
             "user_id": user_id,
             "summary": "No recent activity in the last 30 days.",
@@ -101,11 +170,4 @@ Return ONLY valid JSON:
   "key_patterns": ["...", "..."]
 }}
 """
-
-    llm_json = llm.generate(prompt)
-
-    return {
-        "success": True,
-        "user_id": user_id,
-        "summary": llm_json,
-    }
+    return prompt, None
@@ -0,0 +1,162 @@
+# backend/app/services/combined_agent_service.py
+
+"""
+Combined agent: one completion for speculation + behaviour + case file.
+
+The three per-section prompts repeat the same profile and transaction
+statistics. This builds one compact prompt with each statistic stated once
+and asks for a single JSON object holding all three sections. The result is
+validated against the same shapes the per-section prompts ask for; if the
+LLM is unavailable or the output does not validate, the caller gets the
+per-section results instead.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from statistics import mean
+from typing import Any, Dict, List
+
+from backend.app.services.agent_service import speculate_from_snapshot
+from backend.app.services.behavior_summary_service import behavior_summary_from_snapshot
+from backend.app.services.investigation_service import (
+    case_file_from_snapshot,
+    compute_case_stats,
+    top_high_risk_txns,
+)
+from backend.app.services.llm_client import llm
+from backend.app.services.llm_schemas import (
+    BehaviourSection,
+    InvestigationSection,
+    SpeculationSection,
+    load_llm_json,
+    validate_section,
+)
+
+# section -> (result key, schema, per-section service used as fallback)
+SECTIONS = {
+    "speculation": ("agent_result", SpeculationSection, speculate_from_snapshot),
+    "behaviour": ("summary", BehaviourSection, behavior_summary_from_snapshot),
+    "investigation": ("case_file", InvestigationSection, case_file_from_snapshot),
+}
+
+# own pool: combined_analysis already runs inside an /intel pool slot, so
+# fallbacks must not queue behind it there
+_fallback_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="combined-fallback")
+
+
+# ---------- PROMPT ----------
+
+def _to_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _last_30_days(txns: List[Dict]) -> List[Dict]:
+    cutoff = _to_utc(datetime.utcnow()) - timedelta(days=30)
+    recent = []
+    for t in txns:
+        ts_raw = t.get("timestamp")
+        try:
+            ts = datetime.fromisoformat(ts_raw) if isinstance(ts_raw, str) else ts_raw
+        except Exception:
+            continue
+        if isinstance(ts, datetime) and _to_utc(ts) >= cutoff:
+            recent.append(t)
+    return recent
+
+
+def _stats_line(txns: List[Dict]) -> str:
+    ml = [t.get("ml_scores", {}) or {} for t in txns]
+    # `or 0`: the key can be present with a None value
+    risks = [float(m.get("final_risk_score") or 0) for m in ml]
+    fraud = [float(m.get("fraud_probability") or 0) for m in ml]
+    anomalies = [float(m.get("anomaly_score") or 0) for m in ml]
+    levels = {lvl: sum(1 for m in ml if m.get("risk_level") == lvl) for lvl in ("low", "medium", "high", "critical")}
+    return (
+        f"n={len(txns)} avg_risk={mean(risks):.1f} max_risk={max(risks):.1f} "
+        f"avg_fraud_prob={mean(fraud):.1f} avg_anomaly={mean(anomalies):.1f} levels={levels}"
+    )
+
+
+def build_combined_prompt(snapshot: Dict[str, Any], case_stats: Dict[str, Any], top_txns: List[Dict]) -> str:
+    # $avg / $max return null when no transaction has the field
+    case_stats = {k: (v if v is not None else 0.0) for k, v in case_stats.items()}
+    profile = snapshot["profile"]
+    rs = profile["risk_stats"]
+    last20 = snapshot["txns"][:20]
+    last30d = _last_30_days(snapshot["txns"][:100])
+
+    top_lines = "; ".join(
+        f"{t.get('timestamp')} amt={t.get('amount')} risk={(t.get('ml_scores') or {}).get('final_risk_score')}"
+        for t in top_txns
+    ) or "none"
+
+    return f"""
+You are Veritas Sentinel AI, a fraud analyst. Analyse user {snapshot["user_id"]}.
+
+PROFILE: trust={profile.get("trust_score")} lifetime_avg_risk={rs["avg_risk_score"]} lifetime_high_risk={rs["high_risk_txn_count"]} lifetime_txns={rs["total_txn_count"]}
+LAST 20 TXNS: {_stats_line(last20)}
+LAST 30 DAYS: {_stats_line(last30d) if last30d else "no activity"}
+ALL TIME: n={case_stats["count"]} avg_risk={case_stats["avg_risk"]:.1f} max_risk={case_stats["max_risk"]:.1f} avg_anomaly={case_stats["avg_anomaly"]:.1f} high_risk(>70)={case_stats["high_risk_count"]}
+TOP RISK TXNS: {top_lines}
+
+Return ONE JSON object with exactly these keys:
+{{
+  "speculation": {{"speculation_score": <0-100>, "risk_level": "<low|medium|high|critical>", "explanation": "<3-6 sentences, based on LAST 20 TXNS>", "indicators": ["..."]}},
+  "behaviour": {{"verdict": "<normal|mildly suspicious|concerning|highly irregular>", "summary": "<30-day behaviour summary>", "key_patterns": ["..."]}},
+  "investigation": {{"executive_summary": "<2-4 sentences>", "risk_rating": "<low|medium|high|critical>", "behaviour_findings": ["..."], "anomaly_timeline": ["..."], "recommended_action": "<Block|Flag for manual review|Place under monitoring|No action needed>"}}
+}}
+"""
+
+
+# ---------- ENTRY POINT ----------
+
+def _per_section(snapshot: Dict[str, Any], names=tuple(SECTIONS)) -> Dict[str, Any]:
+    """Per-section services for `names`, run concurrently."""
+    futures = {name: _fallback_pool.submit(SECTIONS[name][2], snapshot) for name in names}
+    return {name: f.result() for name, f in futures.items()}
+
+
+def combined_analysis(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns {"speculation", "behaviour", "investigation", "mode"} where each
+    section has the same shape as its per-section service result.
+    mode is "combined" when every section of the single call validated,
+    else "sections"; `fallback` lists the sections that were recomputed
+    with their own (concurrent) calls.
+    """
+    user_id = snapshot["user_id"]
+    profile = snapshot["profile"]
+
+    # nothing to analyse / LLM off: the per-section services already handle it
+    if not profile or not snapshot["txns"] or not llm.enabled:
+        return {**_per_section(snapshot), "mode": "sections", "fallback": list(SECTIONS)}
+
+    case_stats = compute_case_stats(user_id)
+    prompt = build_combined_prompt(snapshot, case_stats, top_high_risk_txns(user_id))
+
+    raw = llm.generate(
+        prompt,
+        user_id=user_id,
+        data_version=profile.get("data_version", 0),
+        json_mode=True,
+        agent="combined",
+    )
+    parsed = load_llm_json(raw) or {}
+
+    result: Dict[str, Any] = {}
+    failed = []
+    for name, (key, schema, _) in SECTIONS.items():
+        section = validate_section(parsed.get(name), schema)
+        if section is None:
+            failed.append(name)
+        else:
+            result[name] = {"success": True, "user_id": user_id, key: section.dict()}
+
+    # only the sections that didn't validate get their own calls
+    if failed:
+        result.update(_per_section(snapshot, failed))
+    result["mode"] = "sections" if failed else "combined"
+    result["fallback"] = failed
+    return result
@@ -0,0 +1,116 @@
+# backend/app/services/incident_service.py
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.app.db.mongo import alerts_col
+
+"""
+Alert deduplication / incident grouping.
+
+Instead of one alert per qualifying transaction, alerts for the same user
+(and optionally the same rule set) inside a time window are folded into a
+single open *incident* — which is still an ordinary document in alerts_col,
+so the triage queue, counts and resolution endpoints work unchanged.
+
+While an incident accepts merges it carries `open_incident_key`, covered by a
+partial unique index. Each alert is one atomic pipeline upsert on that key:
+the first one inserts, the rest bump txn_count, keep the max score / level and
+append the txn id. Resolving the alert (or the window expiring) releases the
+key so the next alert starts a fresh incident.
+"""
+
+INCIDENT_WINDOW_MINUTES = int(os.getenv("INCIDENT_WINDOW_MINUTES", "60"))
+INCIDENT_GROUP_BY_RULES = os.getenv("INCIDENT_GROUP_BY_RULES", "false").lower() == "true"
+MAX_INCIDENT_TXN_REFS = 500
+
+
+def _incident_key(alert: Dict[str, Any]) -> str:
+    key = alert["user_id"]
+    if INCIDENT_GROUP_BY_RULES:
+        rules = sorted(alert.get("rules_triggered") or [])
+        key += "|" + ",".join(rules)
+    return key
+
+
+def _merge_pipeline(alert: Dict[str, Any], window_end: str) -> list:
+    """
+    Aggregation-pipeline update: on insert every "$field" is missing, so the
+    $ifNull / $max expressions seed the incident from this alert.
+    """
+    def lit(value):
+        # user-derived strings must never be read as "$field" paths
+        return {"$literal": value}
+
+    score = alert["final_risk_score"]
+    higher = {"$gt": [score, {"$ifNull": ["$final_risk_score", -1]}]}
+
+    return [
+        {
+            "$set": {
+                "alert_id": {"$ifNull": ["$alert_id", lit(alert["alert_id"])]},
+                "user_id": lit(alert["user_id"]),
+                "user_code": lit(alert.get("user_code")),
+                "txn_id": {"$ifNull": ["$txn_id", lit(alert["txn_id"])]},
+                "txn_ids": {
+                    "$slice": [
+                        {"$concatArrays": [{"$ifNull": ["$txn_ids", []]}, [lit(alert["txn_id"])]]},
+                        -MAX_INCIDENT_TXN_REFS,
+                    ]
+                },
+                "txn_count": {"$add": [{"$ifNull": ["$txn_count", 0]}, 1]},
+                # level / reason follow the highest-scoring txn in the incident
+                "risk_level": {"$cond": [higher, lit(alert["risk_level"]), "$risk_level"]},
+                "reason": {"$cond": [higher, lit(alert["reason"]), "$reason"]},
+                "final_risk_score": {"$max": ["$final_risk_score", score]},
+                "fraud_probability": {"$max": ["$fraud_probability", alert["fraud_probability"]]},
+                "rules_triggered": {
+                    "$setUnion": [
+                        {"$ifNull": ["$rules_triggered", []]},
+                        lit(alert.get("rules_triggered") or []),
+                    ]
+                },
+                "status": {"$ifNull": ["$status", "open"]},
+                "note": {"$ifNull": ["$note", None]},
+                "created_at": {"$ifNull": ["$created_at", lit(alert["created_at"])]},
+                "window_end": {"$ifNull": ["$window_end", lit(window_end)]},
+                "updated_at": lit(alert["updated_at"]),
+                "last_seen_at": lit(alert["created_at"]),
+            }
+        }
+    ]
+
+
+def record_alert(alert: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Fold `alert` into the user's open incident, or open a new one.
+    Returns (incident_doc, created_new).
+    """
+    key = _incident_key(alert)
+    now_iso = datetime.utcnow().isoformat()
+    window_end = (datetime.utcnow() + timedelta(minutes=INCIDENT_WINDOW_MINUTES)).isoformat()
+
+    for _ in range(3):
+        try:
+            incident = alerts_col.find_one_and_update(
+                {"open_incident_key": key, "window_end": {"$gt": now_iso}},
+                _merge_pipeline(alert, window_end),
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return incident, incident.get("txn_count", 1) == 1
+        except DuplicateKeyError:
+            # An expired incident still holds the key (or a concurrent insert
+            # won the race): release expired holders and retry the upsert.
+            alerts_col.update_many(
+                {"open_incident_key": key, "window_end": {"$lte": now_iso}},
+                {"$unset": {"open_incident_key": ""}},
+            )
+
+    # Extremely contended key: fall back to a standalone alert.
+    alerts_col.insert_one(alert)
+    return alert, True
@@ -0,0 +1,231 @@
+# backend/app/services/intel_precompute_service.py
+
+"""
+Background precomputation of /intel LLM sections for the riskiest users.
+
+Analysts mostly open users with a low trust_score or recent critical alerts.
+Every INTEL_PRECOMPUTE_INTERVAL seconds one API worker (Mongo lease in
+`locks`) picks the top INTEL_PRECOMPUTE_TOP_N of them, and for each user
+whose profile data_version changed since the stored result, computes
+speculation + behaviour + case file and stores them in `intel_precomputed`.
+A run stops once it has spent INTEL_PRECOMPUTE_MAX_CALLS LLM calls, or as
+soon as the LLM circuit is not closed.
+
+/intel serves a stored result when its data_version matches the profile's.
+"""
+
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from backend.app.db.mongo import alerts_col, intel_col, locks_col, profiles_col
+from backend.app.services.combined_agent_service import combined_analysis
+from backend.app.services.llm_client import llm
+from backend.app.services.llm_schemas import (
+    BehaviourSection,
+    InvestigationSection,
+    SpeculationSection,
+    parse_llm_json,
+)
+from backend.app.services.user_snapshot_service import load_user_snapshot
+
+# off by default: every run spends LLM budget
+INTEL_PRECOMPUTE_ENABLED = os.getenv("INTEL_PRECOMPUTE_ENABLED", "false").lower() == "true"
+INTEL_PRECOMPUTE_INTERVAL = int(os.getenv("INTEL_PRECOMPUTE_INTERVAL", "900"))  # seconds
+INTEL_PRECOMPUTE_TOP_N = int(os.getenv("INTEL_PRECOMPUTE_TOP_N", "50"))
+INTEL_PRECOMPUTE_MAX_CALLS = int(os.getenv("INTEL_PRECOMPUTE_MAX_CALLS", "60"))
+INTEL_PRECOMPUTE_ALERT_DAYS = int(os.getenv("INTEL_PRECOMPUTE_ALERT_DAYS", "7"))
+INTEL_PRECOMPUTE_TTL = int(os.getenv("INTEL_PRECOMPUTE_TTL", str(24 * 60 * 60)))  # seconds
+
+LEASE_ID = "intel_precompute"
+
+# worst case per user: one combined call that fails validation + 3 sections
+CALLS_PER_USER = {"combined": 1, "sections": 4}
+
+SECTION_SCHEMAS = {
+    "speculation": ("agent_result", SpeculationSection),
+    "behaviour": ("summary", BehaviourSection),
+    "investigation": ("case_file", InvestigationSection),
+}
+
+
+# ---------- CANDIDATES ----------
+
+def pick_candidates(top_n: int = INTEL_PRECOMPUTE_TOP_N) -> List[str]:
+    """
+    Users ranked by open critical alerts, then open alerts (last
+    INTEL_PRECOMPUTE_ALERT_DAYS), then lowest trust_score.
+    """
+    cutoff = (datetime.utcnow() - timedelta(days=INTEL_PRECOMPUTE_ALERT_DAYS)).isoformat()
+    alert_rows = alerts_col.aggregate([
+        {"$match": {"status": "open", "created_at": {"$gte": cutoff}}},
+        {
+            "$group": {
+                "_id": "$user_id",
+                "open_alerts": {"$sum": 1},
+                "critical": {"$sum": {"$cond": [{"$eq": ["$risk_level", "critical"]}, 1, 0]}},
+            }
+        },
+        {"$sort": {"critical": -1, "open_alerts": -1}},
+        {"$limit": top_n},
+    ])
+    alerts_by_user = {r["_id"]: r for r in alert_rows if r["_id"]}
+
+    low_trust = profiles_col.find({}, {"_id": 0, "user_id": 1, "trust_score": 1}) \
+        .sort("trust_score", 1).limit(top_n)
+    trust = {p["user_id"]: p.get("trust_score", 100.0) for p in low_trust}
+
+    missing = [u for u in alerts_by_user if u not in trust]
+    if missing:
+        for p in profiles_col.find({"user_id": {"$in": missing}}, {"_id": 0, "user_id": 1, "trust_score": 1}):
+            trust[p["user_id"]] = p.get("trust_score", 100.0)
+
+    def rank(user_id: str):
+        a = alerts_by_user.get(user_id, {})
+        return (-a.get("critical", 0), -a.get("open_alerts", 0), trust.get(user_id, 100.0))
+
+    return sorted(set(alerts_by_user) | set(trust), key=rank)[:top_n]
+
+
+# ---------- STORAGE ----------
+
+def _valid(sections: Dict[str, Any]) -> bool:
+    """Only real, schema-valid LLM answers are stored (never fallback text)."""
+    for name, (field, schema) in SECTION_SCHEMAS.items():
+        section = sections.get(name) or {}
+        value = section.get(field)
+        if isinstance(value, dict):
+            try:
+                schema(**value)
+            except Exception:
+                return False
+        elif not isinstance(value, str) or parse_llm_json(value, schema) is None:
+            return False
+    return True
+
+
+def load_precomputed(user_id: str, data_version: Any) -> Optional[Dict[str, Any]]:
+    """Stored sections for this exact data_version, or None."""
+    try:
+        doc = intel_col.find_one({"_id": user_id, "data_version": data_version})
+    except PyMongoError:
+        return None
+    return doc
+
+
+def precompute_user(user_id: str) -> Optional[str]:
+    """
+    Refresh one user's stored intel if their data changed.
+    Returns the analysis mode used, or None when nothing was called.
+    """
+    profile = profiles_col.find_one({"user_id": user_id}, {"data_version": 1})
+    if not profile:
+        return None
+    data_version = profile.get("data_version", 0)
+    if intel_col.count_documents({"_id": user_id, "data_version": data_version}, limit=1):
+        return None
+
+    snapshot = load_user_snapshot(user_id)
+    if not snapshot["profile"] or not snapshot["txns"]:
+        return None
+
+    result = combined_analysis(snapshot)
+    sections = {name: result[name] for name in SECTION_SCHEMAS}
+    if _valid(sections):
+        now = datetime.utcnow()
+        intel_col.replace_one(
+            {"_id": user_id},
+            {
+                "user_id": user_id,
+                # the version the sections were computed from, not the latest
+                "data_version": snapshot["profile"].get("data_version", 0),
+                "sections": sections,
+                "mode": result["mode"],
+                "computed_at": now,
+                "expires_at": now + timedelta(seconds=INTEL_PRECOMPUTE_TTL),
+            },
+            upsert=True,
+        )
+    return result["mode"]
+
+
+def run_once(max_calls: int = INTEL_PRECOMPUTE_MAX_CALLS) -> Dict[str, Any]:
+    summary = {"candidates": 0, "refreshed": 0, "unchanged": 0, "calls_budgeted": 0, "stopped": None}
+    if not llm.enabled:
+        summary["stopped"] = "llm_disabled"
+        return summary
+
+    candidates = pick_candidates()
+    summary["candidates"] = len(candidates)
+
+    for user_id in candidates:
+        if summary["calls_budgeted"] + CALLS_PER_USER["sections"] > max_calls:
+            summary["stopped"] = "budget"
+            break
+        if llm.breaker.state != "closed":
+            summary["stopped"] = "llm_unavailable"
+            break
+
+        mode = precompute_user(user_id)
+        if mode is None:
+            summary["unchanged"] += 1
+            continue
+        summary["refreshed"] += 1
+        summary["calls_budgeted"] += CALLS_PER_USER[mode]
+
+    return summary
+
+
+# ---------- SCHEDULER ----------
+
+class IntelPrecomputeScheduler:
+    def __init__(self, interval: int):
+        self.interval = interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="intel-precompute", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _acquire_lease(self) -> bool:
+        """One worker per interval across all API processes."""
+        now = datetime.utcnow()
+        try:
+            locks_col.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"until": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "until": now + timedelta(seconds=self.interval)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # lease exists and is held by another worker
+            return False
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if self._acquire_lease():
+                    self.last_run = {"at": datetime.utcnow(), **run_once()}
+            except Exception as e:
+                # never let one bad run (Mongo, LLM SDK, validation) kill the
+                # thread for the life of the process; try again next interval
+                error = f"{e.__class__.__name__}: {e}"
+                print(f"[intel] precompute run failed: {error}")
+                self.last_run = {"at": datetime.utcnow(), "error": error}
+
+
+intel_scheduler = IntelPrecomputeScheduler(INTEL_PRECOMPUTE_INTERVAL)
@@ -1,41 +1,168 @@
 # backend/app/services/investigation_service.py
 
 from datetime import datetime
-from statistics import mean
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from backend.app.db.mongo import txns_col, profiles_col
-from backend.app.services.llm_client import LLMClient
+from backend.app.services.llm_client import LLMError, llm
+from backend.app.services.llm_schemas import InvestigationSection, parse_llm_json
+
+HIGH_RISK_THRESHOLD = 70
+TOP_HIGH_RISK_K = 5
+
+
+def compute_case_stats(user_id: str) -> Dict[str, Any]:
+    """
+    All-time risk aggregates for a user, computed server-side in one $group.
+    Touches only user_id + two ml_scores fields, all in the user_risk_anomaly
+    index, so memory stays constant however long the account's history is.
+    """
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {
+            "$project": {
+                "_id": 0,
+                "risk": "$ml_scores.final_risk_score",
+                "anomaly": "$ml_scores.anomaly_score",
+            }
+        },
+        {
+            "$group": {
+                "_id": None,
+                "count": {"$sum": 1},
+                "avg_risk": {"$avg": "$risk"},
+                "max_risk": {"$max": "$risk"},
+                "avg_anomaly": {"$avg": "$anomaly"},
+                "high_risk_count": {
+                    "$sum": {"$cond": [{"$gt": ["$risk", HIGH_RISK_THRESHOLD]}, 1, 0]}
+                },
+            }
+        },
+    ]
+    row = next(txns_col.aggregate(pipeline, hint="user_risk_anomaly"), None)
+    if not row:
+        return {"count": 0, "avg_risk": 0.0, "max_risk": 0.0, "avg_anomaly": 0.0, "high_risk_count": 0}
+    row.pop("_id", None)
+    return row
+
+
+def top_high_risk_txns(user_id: str, k: int = TOP_HIGH_RISK_K) -> List[Dict[str, Any]]:
+    """Bounded top-k of the user's riskiest transactions above the threshold."""
+    cursor = (
+        txns_col.find(
+            {"user_id": user_id, "ml_scores.final_risk_score": {"$gt": HIGH_RISK_THRESHOLD}},
+            {
+                "_id": 0,
+                "txn_id": 1,
+                "timestamp": 1,
+                "amount": 1,
+                "ml_scores.final_risk_score": 1,
+                "ml_scores.risk_level": 1,
+            },
+        )
+        .sort("ml_scores.final_risk_score", -1)
+        .limit(k)
+    )
+    return list(cursor)
 
-llm = LLMClient(provider="openai")
+
+def _format_top_txns(txns: List[Dict[str, Any]]) -> str:
+    if not txns:
+        return "- none"
+    lines = []
+    for t in txns:
+        ml = t.get("ml_scores", {}) or {}
+        lines.append(
+            f"- {t.get('timestamp')}: amount {t.get('amount')}, "
+            f"risk {ml.get('final_risk_score')} ({ml.get('risk_level')})"
+        )
+    return "\n".join(lines)
 
 
 def generate_case_file(user_id: str) -> Dict[str, Any]:
     profile = profiles_col.find_one({"user_id": user_id})
-    if not profile:
-        return {"success": False, "message": "User profile not found"}
+    return _case_file(user_id, profile)
 
-    txns = list(
-        txns_col.find({"user_id": user_id}).sort("timestamp", -1)
+
+def case_file_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Same as generate_case_file, reusing the profile from load_user_snapshot."""
+    return _case_file(snapshot["user_id"], snapshot["profile"])
+
+
+def _case_file(user_id: str, profile: Optional[Dict]) -> Dict[str, Any]:
+    prompt, early = _case_file_prompt(user_id, profile)
+    if early is not None:
+        return early
+
+    llm_json = llm.generate(
+        prompt,
+        user_id=user_id,
+        data_version=profile.get("data_version", 0),
+        agent="investigation",
     )
 
-    if not txns:
-        return {
+    return {
+        "success": True,
+        "user_id": user_id,
+        "case_file": llm_json,
+    }
+
+
+def stream_case_file(user_id: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Streaming generate_case_file. Yields ("token", text) while the LLM
+    writes, then ("done", result) with the validated case file, or
+    ("error", result) if the provider failed mid-stream.
+    """
+    profile = profiles_col.find_one({"user_id": user_id})
+    prompt, early = _case_file_prompt(user_id, profile)
+    if early is not None:
+        yield "done", early
+        return
+
+    parts = []
+    try:
+        for chunk in llm.generate_stream(
+            prompt,
+            user_id=user_id,
+            data_version=profile.get("data_version", 0),
+            validate=lambda text: parse_llm_json(text, InvestigationSection) is not None,
+            agent="investigation",
+        ):
+            parts.append(chunk)
+            yield "token", chunk
+    except LLMError as e:
+        yield "error", {"success": False, "user_id": user_id, "message": e.fallback_text}
+        return
+
+    text = "".join(parts).strip()
+    parsed = parse_llm_json(text, InvestigationSection)
+    yield "done", {
+        "success": True,
+        "user_id": user_id,
+        "case_file": parsed.dict() if parsed else text,
+        "valid": parsed is not None,
+    }
+
+
+def _case_file_prompt(user_id: str, profile: Optional[Dict]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """(prompt, None), or (None, response) when there is nothing to ask the LLM."""
+    if not profile:
+        return None, {"success": False, "message": "User profile not found"}
+
+    stats = compute_case_stats(user_id)
+
+    if not stats["count"]:
+        return None, {
             "success": True,
             "user_id": user_id,
             "case_file": "No transaction history available.",
         }
 
-    risks = [t["ml_scores"]["final_risk_score"] for t in txns]
-    anomalies = [t["ml_scores"]["anomaly_score"] for t in txns]
-
-    avg_risk = mean(risks)
-    max_risk = max(risks)
-    avg_anomaly = mean(anomalies)
-
-    recent_high_risk = [
-        t for t in txns if t["ml_scores"]["final_risk_score"] > 70
-    ]
+    avg_risk = stats["avg_risk"]
+    max_risk = stats["max_risk"]
+    avg_anomaly = stats["avg_anomaly"]
+    top_txns = top_high_risk_txns(user_id)
 
     prompt = f"""
 You are Veritas Sentinel AI. Generate a full fraud investigation case file.
@@ -51,7 +178,10 @@ AGGREGATED ANALYSIS (all time):
 - Average Final Risk: {avg_risk}
 - Maximum Final Risk: {max_risk}
 - Average Anomaly Score: {avg_anomaly}
-- Recent High-Risk Transaction Count: {len(recent_high_risk)}
+- Recent High-Risk Transaction Count: {stats["high_risk_count"]}
+
+HIGHEST-RISK TRANSACTIONS (top {len(top_txns)}):
+{_format_top_txns(top_txns)}
 
 TASK:
 Produce a detailed case file including:
@@ -75,11 +205,4 @@ Return ONLY JSON:
   "recommended_action": "<string>"
 }}
 """
-
-    llm_json = llm.generate(prompt)
-
-    return {
-        "success": True,
-        "user_id": user_id,
-        "case_file": llm_json,
-    }
+    return prompt, None
@@ -0,0 +1,91 @@
+# backend/app/services/llm_cache.py
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from pymongo.errors import PyMongoError
+
+from backend.app.core.cache import TTLCache
+from backend.app.db.mongo import llm_cache_col
+
+"""
+Two-tier cache for LLM completions.
+
+Key = model + sha256(prompt) + user_id + the user's profile data_version
+(bumped on every profile update), so an analyst re-opening an unchanged user
+gets the stored answer and any new transaction naturally misses.
+
+- tier 1: in-process LRU with TTL (per worker, instant)
+- tier 2: Mongo `llm_cache` collection with a TTL index on expires_at
+  (shared by workers, survives restarts)
+
+Only real completions are stored — LLMClient never passes fallback or error
+text in here.
+"""
+
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(6 * 60 * 60)))  # seconds
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2000"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+_memory = TTLCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+
+
+def make_key(model: str, prompt: str, user_id: Optional[str], data_version: Optional[Any]) -> str:
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}:{digest}:{user_id or '-'}:{data_version if data_version is not None else '-'}"
+
+
+def get(key: str) -> Optional[str]:
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    value = _memory.get(key)
+    if value is not None:
+        return value
+
+    try:
+        doc = llm_cache_col.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"response": 1},
+        )
+    except PyMongoError:
+        return None
+
+    if doc is None:
+        return None
+
+    _memory.set(key, doc["response"])
+    return doc["response"]
+
+
+def put(key: str, response: str, model: str, user_id: Optional[str], data_version: Optional[Any]) -> None:
+    if not LLM_CACHE_ENABLED:
+        return
+
+    _memory.set(key, response)
+
+    now = datetime.utcnow()
+    try:
+        llm_cache_col.update_one(
+            {"_id": key},
+            {
+                "$set": {
+                    "response": response,
+                    "model": model,
+                    "user_id": user_id,
+                    "data_version": data_version,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=LLM_CACHE_TTL),
+                }
+            },
+            upsert=True,
+        )
+    except PyMongoError:
+        # the in-process tier still has it; persistence is best effort
+        pass
+
+
+def stats() -> dict:
+    return {"enabled": LLM_CACHE_ENABLED, "ttl_seconds": LLM_CACHE_TTL, "memory": _memory.stats()}
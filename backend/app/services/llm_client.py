@@ -1,8 +1,103 @@
 # backend/app/services/llm_client.py
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
-from openai import OpenAI
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI, RateLimitError
+
+from backend.app.core.resilience import CircuitBreaker, TokenBucket, backoff_delay
+from backend.app.services import llm_cache
+from backend.app.services.llm_telemetry import telemetry
+
+"""
+The one LLM client every agent service shares (`llm` at the bottom).
+
+- one pooled httpx connection (keep-alive) with explicit connect/read timeouts
+- token buckets for requests/min and tokens/min, checked before each attempt
+- at most LLM_MAX_CONCURRENCY calls in flight
+- jittered exponential backoff on 429 / 5xx / network errors, honouring
+  Retry-After, within an overall LLM_RETRY_DEADLINE
+- circuit breaker: after LLM_BREAKER_FAILURES consecutive provider failures,
+  calls fail immediately for LLM_BREAKER_RESET seconds
+
+Every wait is bounded (LLM_QUEUE_TIMEOUT), so when the provider throttles
+us callers get LLMThrottled / LLMUnavailable quickly instead of piling up
+threads behind the limiter.
+"""
+
+SYSTEM_PROMPT = "You are a fraud risk and behavior analysis assistant."
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+LLM_REQUESTS_PER_MIN = float(os.getenv("LLM_REQUESTS_PER_MIN", "300"))
+LLM_TOKENS_PER_MIN = float(os.getenv("LLM_TOKENS_PER_MIN", "150000"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "400"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_RETRY_DEADLINE = float(os.getenv("LLM_RETRY_DEADLINE", "20"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+
+class LLMError(Exception):
+    """An LLM call failed; fallback_text is safe to show the analyst."""
+
+    reason = "a transient API error"
+
+    @property
+    def fallback_text(self) -> str:
+        return (
+            f"LLM analysis temporarily unavailable ({self.__class__.__name__}: {self}). "
+            f"This usually means {self.reason}. "
+            "You can retry later; core fraud scores are still valid."
+        )
+
+
+class LLMThrottled(LLMError):
+    """Our own rate / concurrency limits are exhausted."""
+
+    reason = "rate limiting"
+
+
+class LLMUnavailable(LLMError):
+    """Provider down or circuit open."""
+
+    reason = "the LLM provider is unavailable"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _error_name(error: LLMError) -> str:
+    # the provider exception behind our wrapper, when there is one
+    return (error.__cause__ or error).__class__.__name__
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
 
 
 class LLMClient:
@@ -17,18 +112,166 @@ class LLMClient:
             self.model = None
             self.enabled = False
         else:
-            self.client = OpenAI(api_key=api_key)
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONCURRENCY,
+                    max_keepalive_connections=LLM_MAX_CONCURRENCY,
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            )
+            self.client = OpenAI(
+                api_key=api_key,
+                # OPENAI_BASE_URL lets dev/test runs point at a local fake server
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                http_client=http_client,
+                max_retries=0,  # retries are ours, below
+                timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            )
             self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
             self.enabled = True
 
-    def generate(self, prompt: str) -> str:
+        self._slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+        self._requests = TokenBucket(LLM_REQUESTS_PER_MIN) if LLM_REQUESTS_PER_MIN > 0 else None
+        self._tokens = TokenBucket(LLM_TOKENS_PER_MIN) if LLM_TOKENS_PER_MIN > 0 else None
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET)
+
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "retries": 0, "failures": 0, "throttled": 0, "short_circuited": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    # ---------- ADMISSION ----------
+
+    def _admit(self, token_estimate: int) -> None:
+        if self._requests is not None and not self._requests.acquire(1, max_wait=LLM_QUEUE_TIMEOUT):
+            self._count("throttled")
+            raise LLMThrottled("request rate limit reached")
+        if self._tokens is not None and not self._tokens.acquire(token_estimate, max_wait=LLM_QUEUE_TIMEOUT):
+            self._count("throttled")
+            raise LLMThrottled("token rate limit reached")
+        if not self._slots.acquire(timeout=LLM_QUEUE_TIMEOUT):
+            if self._tokens is not None:
+                self._tokens.adjust(token_estimate)
+            self._count("throttled")
+            raise LLMThrottled("too many LLM calls in flight")
+
+    def _call(self, request: Callable[[], Any], prompt: str) -> Any:
+        """
+        Run `request` (one provider round trip) under the limiter, breaker and
+        retry policy. Returns (result, token_estimate). On success the
+        concurrency slot is still held: the caller releases it once it has
+        consumed the response (a stream holds it until the last chunk).
+        """
+        self._count("calls")
+        deadline = time.monotonic() + LLM_RETRY_DEADLINE
+        token_estimate = estimate_tokens(SYSTEM_PROMPT + prompt) + LLM_EXPECTED_COMPLETION_TOKENS
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise LLMUnavailable("circuit open")
+
+            try:
+                self._admit(token_estimate)
+            except LLMThrottled:
+                self.breaker.release_trial()
+                raise
+            try:
+                result = request()
+            except Exception as e:
+                self._slots.release()
+                if not _is_retryable(e):
+                    self.breaker.release_trial()
+                    self._count("failures")
+                    raise LLMError(str(e)) from e
+
+                if isinstance(e, RateLimitError):
+                    # throttling is not an outage; make our other callers back off too
+                    self.breaker.release_trial()
+                    if self._requests is not None:
+                        self._requests.adjust(-self._requests.available)
+                else:
+                    self.breaker.record_failure()
+
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = backoff_delay(attempt, LLM_RETRY_BASE, LLM_RETRY_MAX_DELAY)
+                if attempt == LLM_MAX_RETRIES or time.monotonic() + delay > deadline:
+                    self._count("failures")
+                    raise LLMUnavailable(e.__class__.__name__) from e
+
+                self._count("retries")
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result, token_estimate
+
+        raise LLMUnavailable("retries exhausted")  # not reached
+
+    # ---------- PUBLIC API ----------
+
+    def _complete(self, prompt: str, json_mode: bool = False) -> Tuple[str, int, int]:
+        """Uncached completion -> (content, prompt_tokens, completion_tokens)."""
+        if not self.enabled or not self.client or not self.model:
+            raise LLMUnavailable("no OPENAI_API_KEY configured")
+
+        response, token_estimate = self._call(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+                **({"response_format": {"type": "json_object"}} if json_mode else {}),
+            ),
+            prompt,
+        )
+        try:
+            content = response.choices[0].message.content.strip()
+            usage = getattr(response, "usage", None)
+            if usage is None:
+                prompt_tokens = estimate_tokens(SYSTEM_PROMPT + prompt)
+                completion_tokens = estimate_tokens(content)
+            else:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            if self._tokens is not None:
+                self._tokens.adjust(token_estimate - prompt_tokens - completion_tokens)
+            return content, prompt_tokens, completion_tokens
+        finally:
+            self._slots.release()
+
+    def complete(self, prompt: str, json_mode: bool = False) -> str:
+        """One uncached completion. Raises LLMError subclasses on failure."""
+        content, _, _ = self._complete(prompt, json_mode=json_mode)
+        return content
+
+    def generate(
+        self,
+        prompt: str,
+        user_id: Optional[str] = None,
+        data_version: Optional[Any] = None,
+        json_mode: bool = False,
+        agent: Optional[str] = None,
+    ) -> str:
         """
         Generate LLM output.
 
         Behaviour:
         - If no API key: return a static explanatory string.
-        - If OpenAI throws (rate limit, network error, etc.): return a
-          human-readable fallback instead of raising, so the API never 500s.
+        - If the call fails (throttled, provider down, circuit open): return
+          a human-readable fallback instead of raising, so the API never 500s.
+          Use complete() to get the exception instead.
+        - Successful completions are cached by (model, prompt, user_id,
+          data_version); pass the profile's data_version so cached answers
+          die as soon as the user's data changes. Fallbacks are never cached.
+        - json_mode asks the provider for a single JSON object response.
+        - Every call (hit, miss or failure) is recorded in model_logs under
+          `agent`.
         """
         if not self.enabled or not self.client or not self.model:
             return (
@@ -36,27 +279,148 @@ class LLMClient:
                 "Core risk scoring and dashboards still work."
             )
 
+        started = time.perf_counter()
+        cache_model = f"{self.model}+json" if json_mode else self.model
+        key = llm_cache.make_key(cache_model, prompt, user_id, data_version)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            telemetry.record(agent, self.model, user_id, _elapsed_ms(started), cache_hit=True)
+            return cached
+
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a fraud risk and behavior analysis assistant.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2,
+            content, prompt_tokens, completion_tokens = self._complete(prompt, json_mode=json_mode)
+        except LLMError as e:
+            telemetry.record(
+                agent, self.model, user_id, _elapsed_ms(started), cache_hit=False, error=_error_name(e)
             )
-            return response.choices[0].message.content.strip()
+            return e.fallback_text
 
+        telemetry.record(
+            agent,
+            self.model,
+            user_id,
+            _elapsed_ms(started),
+            cache_hit=False,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        llm_cache.put(key, content, cache_model, user_id, data_version)
+        return content
+
+    def generate_stream(
+        self,
+        prompt: str,
+        user_id: Optional[str] = None,
+        data_version: Optional[Any] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        agent: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming variant of generate(): yields text chunks as the provider
+        sends them.
+
+        - No API key: yields the same static explanation as generate().
+        - Cache hit: yields the stored completion as a single chunk.
+        - The assembled text is cached at the end of the stream, only if
+          `validate(text)` accepts it (e.g. it parses as the expected JSON).
+        - Failures raise LLMError (fallback_text for the analyst), since part
+          of the answer may already be on the wire. Retries only happen
+          before the first chunk.
+        """
+        if not self.enabled or not self.client or not self.model:
+            yield (
+                "LLM analysis is disabled (no OPENAI_API_KEY configured on server). "
+                "Core risk scoring and dashboards still work."
+            )
+            return
+
+        started = time.perf_counter()
+        key = llm_cache.make_key(self.model, prompt, user_id, data_version)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            telemetry.record(
+                agent, self.model, user_id, _elapsed_ms(started), cache_hit=True, streamed=True
+            )
+            yield cached
+            return
+
+        try:
+            stream, token_estimate = self._call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.2,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ),
+                prompt,
+            )
+        except LLMError as e:
+            telemetry.record(
+                agent, self.model, user_id, _elapsed_ms(started),
+                cache_hit=False, error=_error_name(e), streamed=True,
+            )
+            raise
+
+        parts = []
+        usage = None
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
         except Exception as e:
-            # Fallback for rate limits, network errors, etc.
-            # We DON'T raise, we just return a text explanation that the caller
-            # can display to the analyst instead of blowing up the endpoint.
-            err_type = e.__class__.__name__
-            return (
-                f"LLM analysis temporarily unavailable ({err_type}). "
-                "This usually means rate limiting or a transient API error. "
-                "You can retry later; core fraud scores are still valid."
+            self.breaker.record_failure()
+            self._count("failures")
+            telemetry.record(
+                agent, self.model, user_id, _elapsed_ms(started),
+                cache_hit=False, error=e.__class__.__name__, streamed=True,
             )
+            raise LLMUnavailable(e.__class__.__name__) from e
+        finally:
+            stream.close()
+            self._slots.release()
+
+        content = "".join(parts).strip()
+        if usage is None:
+            prompt_tokens = estimate_tokens(SYSTEM_PROMPT + prompt)
+            completion_tokens = estimate_tokens(content)
+        else:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        if self._tokens is not None:
+            self._tokens.adjust(token_estimate - prompt_tokens - completion_tokens)
+        telemetry.record(
+            agent,
+            self.model,
+            user_id,
+            _elapsed_ms(started),
+            cache_hit=False,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            streamed=True,
+        )
+        if content and (validate is None or validate(content)):
+            llm_cache.put(key, content, self.model, user_id, data_version)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "circuit": self.breaker.state,
+            "requests_available": round(self._requests.available, 1) if self._requests else None,
+            "tokens_available": round(self._tokens.available, 1) if self._tokens else None,
+            **counts,
+        }
+
+
+llm = LLMClient(provider=os.getenv("LLM_PROVIDER", "openai"))
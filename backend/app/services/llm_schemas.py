@@ -0,0 +1,70 @@
+# backend/app/services/llm_schemas.py
+
+"""
+Shapes the agent prompts ask the LLM to return, and a tolerant parser for
+raw completions (models like to wrap JSON in ``` fences).
+"""
+
+import json
+from typing import Any, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+
+class SpeculationSection(BaseModel):
+    speculation_score: float
+    risk_level: str
+    explanation: str
+    indicators: List[str] = []
+
+
+class BehaviourSection(BaseModel):
+    verdict: str
+    summary: str
+    key_patterns: List[str] = []
+
+
+class InvestigationSection(BaseModel):
+    executive_summary: str
+    risk_rating: str
+    behaviour_findings: List[str] = []
+    anomaly_timeline: List[str] = []
+    recommended_action: str
+
+
+class CombinedAnalysis(BaseModel):
+    speculation: SpeculationSection
+    behaviour: BehaviourSection
+    investigation: InvestigationSection
+
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+
+def load_llm_json(raw: str) -> Optional[dict]:
+    """The JSON object in an LLM completion, or None."""
+    text = (raw or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def validate_section(value: Any, schema: Type[Schema]) -> Optional[Schema]:
+    """Validate an already-decoded object; None if it doesn't fit the schema."""
+    if not isinstance(value, dict):
+        return None
+    try:
+        return schema(**value)
+    except (TypeError, ValidationError):
+        return None
+
+
+def parse_llm_json(raw: str, schema: Type[Schema]) -> Optional[Schema]:
+    """Parse + validate an LLM completion; None if it doesn't fit the schema."""
+    return validate_section(load_llm_json(raw), schema)
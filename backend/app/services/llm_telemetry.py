@@ -0,0 +1,156 @@
+# backend/app/services/llm_telemetry.py
+
+"""
+Per-call LLM telemetry, stored in `model_logs` (kind="llm_call").
+
+LLMClient calls record() once per agent invocation - cache hits and
+failures included. record() only enqueues; a daemon thread writes batches
+with insert_many every TELEMETRY_FLUSH_SECONDS or TELEMETRY_BATCH_SIZE
+records, so request paths never wait on Mongo. If the queue is full
+(Mongo down for a while) records are dropped and counted, not blocked on.
+
+Cost is computed at record time from MODEL_PRICES (USD per 1M tokens),
+so the admin endpoint only has to $sum it.
+"""
+
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import PyMongoError
+
+from backend.app.db.mongo import logs_col
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "200"))
+TELEMETRY_FLUSH_SECONDS = float(os.getenv("TELEMETRY_FLUSH_SECONDS", "2"))
+TELEMETRY_QUEUE_SIZE = int(os.getenv("TELEMETRY_QUEUE_SIZE", "10000"))
+
+# model -> (input, output) USD per 1M tokens
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+if os.getenv("LLM_PRICE_INPUT_PER_1M") and os.getenv("LLM_PRICE_OUTPUT_PER_1M"):
+    MODEL_PRICES[os.getenv("OPENAI_MODEL", "gpt-4o-mini")] = (
+        float(os.getenv("LLM_PRICE_INPUT_PER_1M")),
+        float(os.getenv("LLM_PRICE_OUTPUT_PER_1M")),
+    )
+
+
+def cost_usd(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class TelemetryWriter:
+    def __init__(self, batch_size: int, flush_seconds: float, queue_size: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.dropped = 0
+        self.written = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="llm-telemetry", daemon=True)
+                self._thread.start()
+
+    def record(
+        self,
+        agent: Optional[str],
+        model: Optional[str],
+        user_id: Optional[str],
+        latency_ms: float,
+        cache_hit: bool,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        error: Optional[str] = None,
+        streamed: bool = False,
+    ) -> None:
+        if not TELEMETRY_ENABLED:
+            return
+        self._ensure_started()
+        doc = {
+            "kind": "llm_call",
+            "agent": agent or "unknown",
+            "model": model,
+            "user_id": user_id,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": round(latency_ms, 1),
+            "cache_hit": cache_hit,
+            "error": error,
+            "streamed": streamed,
+            "cost_usd": cost_usd(model, prompt_tokens, completion_tokens),
+            "ts": datetime.utcnow(),
+        }
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_seconds))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            logs_col.insert_many(batch, ordered=False)
+            with self._lock:
+                self.written += len(batch)
+        except PyMongoError:
+            with self._lock:
+                self.dropped += len(batch)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._write(self._drain())
+
+    def flush(self) -> None:
+        """Write whatever is queued now (used on shutdown)."""
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": TELEMETRY_ENABLED,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+            }
+
+
+telemetry = TelemetryWriter(TELEMETRY_BATCH_SIZE, TELEMETRY_FLUSH_SECONDS, TELEMETRY_QUEUE_SIZE)
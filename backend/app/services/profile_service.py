@@ -1,18 +1,15 @@
 # backend/app/services/profile_service.py
 from typing import Dict
-from statistics import mean, pstdev
+from math import fsum, sqrt
+from statistics import fmean
 from datetime import datetime
 
 from backend.app.db.mongo import profiles_col
 from backend.app.db.models.profile import UserProfile, AmountStats, RiskStats
 
 
-def get_or_create_profile(user_id: str) -> Dict:
-    profile = profiles_col.find_one({"user_id": user_id})
-    if profile:
-        return profile
-
-    # create default profile
+def new_profile(user_id: str) -> Dict:
+    """Default profile for a user with no history."""
     amount_stats = AmountStats(
         avg=0.0, std=0.0, min=0.0, max=0.0, last_n=[]
     )
@@ -28,8 +25,16 @@ def get_or_create_profile(user_id: str) -> Dict:
         risk_stats=risk_stats,
         trust_score=100.0
     )
+    return user_profile.dict()
 
-    profiles_col.insert_one(user_profile.dict())
+
+def get_or_create_profile(user_id: str) -> Dict:
+    profile = profiles_col.find_one({"user_id": user_id})
+    if profile:
+        return profile
+
+    # create default profile
+    profiles_col.insert_one(new_profile(user_id))
     return profiles_col.find_one({"user_id": user_id})
 
 
@@ -39,8 +44,9 @@ def _recompute_amount_stats(amount_stats: Dict, new_amount: float) -> Dict:
     # keep only last 50 amounts
     last_n = last_n[-50:]
 
-    avg_val = mean(last_n)
-    std_val = pstdev(last_n) if len(last_n) > 1 else 0.0
+    # float math: statistics.mean/pstdev go through Fractions, ~20x slower
+    avg_val = fmean(last_n)
+    std_val = sqrt(fsum((x - avg_val) ** 2 for x in last_n) / len(last_n)) if len(last_n) > 1 else 0.0
     min_val = min(last_n)
     max_val = max(last_n)
 
@@ -89,22 +95,34 @@ def _compute_trust_score(risk_stats: Dict) -> float:
     return score
 
 
+def apply_transaction(profile: Dict, amount: float, final_risk_score: float) -> Dict:
+    """
+    New amount_stats / risk_stats / trust_score after one transaction.
+    Pure (no DB), so the offline replay can keep profiles in memory.
+    """
+    amount_stats = _recompute_amount_stats(profile["amount_stats"], amount)
+    risk_stats = _recompute_risk_stats(profile["risk_stats"], final_risk_score)
+    return {
+        "amount_stats": amount_stats,
+        "risk_stats": risk_stats,
+        "trust_score": _compute_trust_score(risk_stats),
+    }
+
+
 def update_profile_with_transaction(user_id: str, amount: float, final_risk_score: float):
     profile = get_or_create_profile(user_id)
 
-    amount_stats = _recompute_amount_stats(profile["amount_stats"], amount)
-    risk_stats = _recompute_risk_stats(profile["risk_stats"], final_risk_score)
-    trust_score = _compute_trust_score(risk_stats)
+    stats = apply_transaction(profile, amount, final_risk_score)
 
     profiles_col.update_one(
         {"user_id": user_id},
         {
             "$set": {
-                "amount_stats": amount_stats,
-                "risk_stats": risk_stats,
-                "trust_score": trust_score,
+                **stats,
                 "updated_at": datetime.utcnow().isoformat()
-            }
+            },
+            # any cached LLM analysis of this user is now stale
+            "$inc": {"data_version": 1},
         }
     )
 
@@ -0,0 +1,258 @@
+# backend/app/services/replay_service.py
+
+"""
+Offline replay / backtest of rules + scoring + the alert decision.
+
+    python -m backend.app.services.replay_service \\
+        --txns dump/Veritas_Sentinel/transactions.bson \\
+        --alerts dump/Veritas_Sentinel/alerts.bson \\
+        --start 2025-01-01 --end 2025-02-01 --warmup-days 30 --out replay.json
+
+Answers "what would the current code have alerted on last month?" without
+touching production: edit rules_service / predictor / should_alert, replay,
+compare with what production alerted on.
+
+- input: a mongodump .bson file, a mongoexport .json/.jsonl file, or a
+  .parquet export (needs pyarrow or fastparquet); no database needed
+- transactions are replayed in timestamp order; every user's profile is
+  rebuilt in memory from a default profile, exactly as create_transaction
+  would update it (apply_transaction)
+- transactions in the --warmup-days before --start only build profile
+  state and are not counted
+- each counted transaction runs evaluate_rules_for_transaction, the
+  predictor and should_alert
+- the baseline is what production actually did: a txn was alerted if any
+  alert (or incident) in the --alerts dump covers it, so it does not move
+  when the code under test changes; without --alerts there is no baseline
+- labels come from resolved alerts: confirmed_fraud -> 1, false_positive
+  -> 0, for every txn the alert (or incident) covers
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from bson import decode_file_iter, json_util
+
+from backend.app.db.models.transaction import TransactionCreate
+from backend.app.ml.predictor import predict_transaction, score_version
+from backend.app.services.feature_builder import build_features_from_transaction
+from backend.app.services.profile_service import apply_transaction, new_profile
+from backend.app.services.rules_service import evaluate_rules_for_transaction, should_alert
+
+TXN_FIELDS = ("txn_id", "user_id", "amount", "channel", "currency", "merchant_type",
+              "location", "device", "timestamp", "txn_type")
+LABELS = {"confirmed_fraud": 1, "false_positive": 0}
+
+
+# ---------- INPUT ----------
+
+def iter_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Documents from a .bson (mongodump), .json/.jsonl (mongoexport) or .parquet file."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".bson":
+        with open(path, "rb") as f:
+            yield from decode_file_iter(f)
+    elif suffix in (".json", ".jsonl"):
+        with open(path) as f:
+            head = f.read(1)
+            f.seek(0)
+            if head == "[":  # mongoexport --jsonArray
+                yield from json_util.loads(f.read())
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json_util.loads(line)
+    elif suffix == ".parquet":
+        import pandas as pd
+
+        try:
+            df = pd.read_parquet(path)
+        except ImportError as e:
+            raise SystemExit(f"Reading Parquet needs pyarrow or fastparquet: {e}")
+        yield from df.to_dict("records")
+    else:
+        raise SystemExit(f"Unsupported dump format: {path}")
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value)).replace(tzinfo=None)
+    except Exception:
+        return None
+
+
+def load_transactions(path: str, start: Optional[datetime], end: Optional[datetime]) -> List[Tuple[datetime, Dict]]:
+    """(timestamp, doc) for txns before `end`, sorted by timestamp."""
+    rows = []
+    for doc in iter_dump(path):
+        ts = _parse_ts(doc.get("timestamp"))
+        if ts is None or (end is not None and ts >= end):
+            continue
+        rows.append((ts, {k: doc.get(k) for k in TXN_FIELDS}))
+    rows.sort(key=lambda r: r[0])
+    return rows
+
+
+def load_alerts(path: Optional[str]) -> Tuple[Set[str], Dict[str, int]]:
+    """
+    From an alerts dump: every txn_id production alerted on, and
+    txn_id -> 1 (confirmed fraud) / 0 (false positive) for resolved ones.
+    """
+    alerted: Set[str] = set()
+    labels: Dict[str, int] = {}
+    if not path:
+        return alerted, labels
+    for alert in iter_dump(path):
+        txn_ids = [t for t in (list(alert.get("txn_ids") or []) or [alert.get("txn_id")]) if t]
+        alerted.update(txn_ids)
+        label = LABELS.get(alert.get("status"))
+        if label is not None:
+            for txn_id in txn_ids:
+                labels[txn_id] = label
+    return alerted, labels
+
+
+# ---------- REPLAY ----------
+
+def _to_create(doc: Dict[str, Any]) -> TransactionCreate:
+    return TransactionCreate(
+        amount=float(doc.get("amount") or 0.0),
+        channel=doc.get("channel") or "",
+        currency=doc.get("currency") or "INR",
+        merchant_type=doc.get("merchant_type"),
+        location=doc.get("location") or None,
+        device=doc.get("device") or None,
+        timestamp=str(doc["timestamp"]) if doc.get("timestamp") is not None else None,
+        txn_type=doc.get("txn_type") or "WITHDRAW",
+    )
+
+
+def _precision(confusion: Counter) -> Dict[str, Any]:
+    tp, fp, fn = confusion["tp"], confusion["fp"], confusion["fn"]
+    return {
+        "labelled_alerts": tp + fp,
+        "true_positives": tp,
+        "false_positives": fp,
+        "missed_confirmed_fraud": fn,
+        "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+        "recall_of_confirmed_fraud": round(tp / (tp + fn), 4) if tp + fn else None,
+    }
+
+
+def replay(
+    rows: List[Tuple[datetime, Dict]],
+    labels: Dict[str, int],
+    start: Optional[datetime] = None,
+    production_alerts: Optional[Set[str]] = None,
+) -> Dict[str, Any]:
+    """production_alerts: txn_ids alerted in production (None = no baseline)."""
+    profiles: Dict[str, Dict] = {}
+    alerts_by_level: Counter = Counter()
+    alerts_by_day: Counter = Counter()
+    rules_hit: Counter = Counter()
+    replay_conf: Counter = Counter()
+    baseline_conf: Counter = Counter()
+    counted = warmup = baseline_alerts = alerts = 0
+    changed = Counter()
+
+    started = time.perf_counter()
+    for ts, doc in rows:
+        user_id = doc.get("user_id")
+        profile = profiles.get(user_id)
+        if profile is None:
+            profile = profiles[user_id] = new_profile(user_id)
+
+        # ---- same steps as create_transaction ----
+        txn = _to_create(doc)
+        features = build_features_from_transaction(txn)
+        rules_result = evaluate_rules_for_transaction(txn, profile)
+        is_flagged = int(rules_result.get("isFlaggedFraud", 0))
+        features["isFlaggedFraud"] = is_flagged
+        ml_scores = predict_transaction(features, profile)
+        profile.update(apply_transaction(profile, txn.amount, ml_scores["final_risk_score"]))
+
+        if start is not None and ts < start:
+            warmup += 1
+            continue
+        counted += 1
+
+        alerted = should_alert(ml_scores, is_flagged)
+        produced = None if production_alerts is None else doc.get("txn_id") in production_alerts
+        label = labels.get(doc.get("txn_id"))
+        rules_hit.update(rules_result.get("matched_rules", []))
+
+        if alerted:
+            alerts += 1
+            alerts_by_level[ml_scores["risk_level"]] += 1
+            alerts_by_day[ts.strftime("%Y-%m-%d")] += 1
+        if produced:
+            baseline_alerts += 1
+        if produced is not None and produced != alerted:
+            changed["new_alerts" if alerted else "dropped_alerts"] += 1
+
+        if label is not None:
+            for conf, fired in ((replay_conf, alerted), (baseline_conf, produced)):
+                if fired:
+                    conf["tp" if label else "fp"] += 1
+                elif label:
+                    conf["fn"] += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "score_version": score_version(),
+        "transactions": counted,
+        "warmup_transactions": warmup,
+        "users": len(profiles),
+        "alerts": {
+            "replay": alerts,
+            "baseline": baseline_alerts if production_alerts is not None else None,
+            "alert_rate": round(alerts / counted, 6) if counted else None,
+            **{k: changed[k] for k in ("new_alerts", "dropped_alerts")},
+            "by_risk_level": dict(alerts_by_level),
+            "by_day": dict(sorted(alerts_by_day.items())),
+        },
+        "rules_matched": dict(rules_hit.most_common()),
+        "labels": {
+            "replay": _precision(replay_conf),
+            "baseline": _precision(baseline_conf) if production_alerts is not None else None,
+        },
+        "throughput": {
+            "seconds": round(elapsed, 2),
+            "txns_per_second": round((counted + warmup) / elapsed) if elapsed else None,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline replay of rules + scoring")
+    parser.add_argument("--txns", required=True, help="transactions dump (.bson / .json / .jsonl / .parquet)")
+    parser.add_argument("--alerts", default=None, help="alerts dump: production baseline + resolved-alert labels")
+    parser.add_argument("--start", default=None, help="ISO date; earlier txns only warm up profiles")
+    parser.add_argument("--end", default=None, help="ISO date, exclusive")
+    parser.add_argument("--warmup-days", type=int, default=None, help="default: everything before --start")
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) if args.end else None
+
+    t0 = time.perf_counter()
+    rows = load_transactions(args.txns, start, end)
+    if start is not None and args.warmup_days is not None:
+        cutoff = start - timedelta(days=args.warmup_days)
+        rows = [r for r in rows if r[0] >= cutoff]
+    production_alerts, labels = load_alerts(args.alerts)
+    print(f"Loaded {len(rows):,} txns, {len(labels):,} labels in {time.perf_counter() - t0:.1f}s")
+
+    report = replay(rows, labels, start, production_alerts if args.alerts else None)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,190 @@
+# backend/app/services/rescore_service.py
+
+"""
+Bulk re-scoring of stored transactions after predictor.py or the model
+bundle changes, so dashboards stop mixing score versions.
+
+    python -m backend.app.services.rescore_service --workers 8
+    python -m backend.app.services.rescore_service --workers 8 --score-version heuristic-2
+
+create_transaction scores a transaction against the user's profile as it
+was *before* that transaction, and the profile's trust/risk stats depend
+on every earlier score. So re-scoring replays each user's history:
+
+- users are cut into user_id ranges of roughly equal transaction counts;
+  each range is one task on a process pool
+- a range is read with one cursor in (user_id, timestamp) order (the
+  user_ts_id index, walked backwards); every user starts from a default
+  profile that is advanced with apply_transaction after each transaction,
+  exactly as update_profile_with_transaction does live; the stored rules
+  flag is reused (rules only read amount stats, which don't depend on
+  scores)
+- writes are unordered bulk_writes of $set: the new ml_scores fields,
+  score_version and rescored_at; ml_scores.model_version is unset, as
+  only the heuristic predictor produces these scores
+- after each flush the last fully written user goes to
+  rescore_checkpoints; re-running the same score_version skips finished
+  ranges and resumes the others after that user, over the same stored
+  range plan. --restart drops the checkpoints and re-scores everything
+  (documents already at the version included)
+
+Profiles in user_profiles are not rewritten.
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from backend.app.db.mongo import rescore_col, txns_col
+from backend.app.ml.predictor import predict_transaction, score_version
+from backend.app.services.profile_service import apply_transaction, new_profile
+
+SCORE_FIELDS = ("fraud_probability", "anomaly_score", "deviation_score", "trust_score", "final_risk_score")
+
+UserRange = Tuple[Optional[str], Optional[str]]
+
+
+def plan_ranges(n_ranges: int) -> List[UserRange]:
+    """[lo, hi) user_id ranges with ~equal transaction counts; None = unbounded."""
+    counts = list(txns_col.aggregate(
+        [{"$group": {"_id": "$user_id", "n": {"$sum": 1}}}, {"$sort": {"_id": 1}}],
+        allowDiskUse=True,
+    ))
+    if not counts:
+        return []
+    total = sum(c["n"] for c in counts)
+    target = total / max(1, n_ranges)
+    cuts: List[str] = []
+    acc = 0
+    for c in counts:
+        if acc >= target * (len(cuts) + 1) and c["_id"] is not None:
+            cuts.append(c["_id"])
+        acc += c["n"]
+    bounds = [None] + cuts + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def rescore_range(
+    version: str,
+    index: int,
+    lo: Optional[str],
+    hi: Optional[str],
+    batch_size: int,
+) -> int:
+    """Replay + score one user_id range, resuming from its checkpoint. Returns rows written."""
+    key = f"{version}:{index}"
+    checkpoint = rescore_col.find_one({"_id": key}) or {}
+    if checkpoint.get("done"):
+        return 0
+
+    # users are walked in descending order (backwards over user_ts_id)
+    user_filter: Dict[str, Any] = {}
+    if lo is not None:
+        user_filter["$gte"] = lo
+    if checkpoint.get("last_user") is not None:
+        user_filter["$lt"] = checkpoint["last_user"]
+    elif hi is not None:
+        user_filter["$lt"] = hi
+    query = {"user_id": user_filter} if user_filter else {}
+
+    cursor = (
+        txns_col.find(query, {"user_id": 1, "amount": 1, "timestamp": 1, "rules.isFlaggedFraud": 1})
+        .sort([("user_id", -1), ("timestamp", 1), ("_id", 1)])
+        .hint("user_ts_id")
+        .batch_size(batch_size)
+    )
+
+    written = 0
+    ops: List[UpdateOne] = []
+    current_user: Any = object()
+    profile: Dict[str, Any] = {}
+
+    def flush(done_user: Any) -> None:
+        nonlocal written
+        if ops:
+            txns_col.bulk_write(ops, ordered=False)
+            written += len(ops)
+        update: Dict[str, Any] = {"$set": {"version": version, "range": index, "updated_at": datetime.utcnow().isoformat()}}
+        if done_user is not None:
+            update["$set"]["last_user"] = done_user
+        update["$inc"] = {"processed": len(ops)}
+        rescore_col.update_one({"_id": key}, update, upsert=True)
+        ops.clear()
+
+    now = datetime.utcnow().isoformat()
+    for doc in cursor:
+        user_id = doc.get("user_id")
+        if user_id != current_user:
+            # checkpoint only at user boundaries: a resumed range must start
+            # a user from their first transaction
+            if len(ops) >= batch_size:
+                flush(current_user)
+                now = datetime.utcnow().isoformat()
+            current_user = user_id
+            profile = new_profile(user_id or "")
+
+        features = {
+            "step": 1,
+            "amount": float(doc.get("amount") or 0.0),
+            "isFlaggedFraud": int((doc.get("rules") or {}).get("isFlaggedFraud", 0)),
+        }
+        scores = predict_transaction(features, profile)
+        profile.update(apply_transaction(profile, features["amount"], scores["final_risk_score"]))
+
+        update = {f"ml_scores.{f}": scores[f] for f in SCORE_FIELDS}
+        update["ml_scores.risk_level"] = scores["risk_level"]
+        update["score_version"] = version
+        update["rescored_at"] = now
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update, "$unset": {"ml_scores.model_version": ""}}))
+
+    flush(None)
+    rescore_col.update_one({"_id": key}, {"$set": {"done": True}})
+    return written
+
+
+def run(version: str, workers: int, batch_size: int, ranges_per_worker: int = 4) -> int:
+    # the plan is stored so a resumed run sees the same range boundaries
+    plan_key = f"{version}:plan"
+    plan = rescore_col.find_one({"_id": plan_key})
+    if plan:
+        ranges = [tuple(r) for r in plan["ranges"]]
+    else:
+        ranges = plan_ranges(workers * ranges_per_worker)
+        rescore_col.insert_one({"_id": plan_key, "version": version, "ranges": [list(r) for r in ranges]})
+    done = {c["range"] for c in rescore_col.find({"version": version, "done": True}, {"range": 1})}
+    todo = [(i, lo, hi) for i, (lo, hi) in enumerate(ranges) if i not in done]
+    print(f"Rescoring to {version}: {len(ranges)} ranges, {len(done)} already done, {workers} workers")
+
+    total = 0
+    started = time.perf_counter()
+    # spawn: every worker opens its own MongoClient (pymongo is not fork-safe)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(rescore_range, version, i, lo, hi, batch_size)
+            for i, lo, hi in todo
+        ]
+        for n_done, future in enumerate(as_completed(futures), 1):
+            total += future.result()
+            elapsed = time.perf_counter() - started
+            print(f"{n_done}/{len(futures)} ranges, {total:,} txns, {total / max(elapsed, 1e-6):,.0f} txns/s")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore stored transactions")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--score-version", default=None, help="default: the predictor's version")
+    parser.add_argument("--restart", action="store_true", help="drop this version's checkpoints and rescore everything")
+    args = parser.parse_args()
+
+    version = args.score_version or score_version()
+    if args.restart:
+        rescore_col.delete_many({"version": version})
+    run(version, args.workers, args.batch_size)
@@ -2,7 +2,7 @@
 
 from datetime import datetime, timedelta, timezone
 from statistics import mean
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from backend.app.db.mongo import txns_col, profiles_col
 
@@ -23,14 +23,26 @@ def get_risk_trend(user_id: str) -> Dict[str, Any]:
     returns a clean JSON dict the frontend can always parse.
     """
     profile = profiles_col.find_one({"user_id": user_id})
-    if not profile:
-        return {"success": False, "message": "User not found"}
 
     # Pull last ~200 txns, then filter by last 30 days in Python.
     raw_txns = list(
         txns_col.find({"user_id": user_id}).sort("timestamp", 1).limit(200)
     )
 
+    return _build_trend(user_id, profile, raw_txns)
+
+
+def risk_trend_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Same as get_risk_trend, on data from load_user_snapshot (no extra query)."""
+    # snapshot txns are newest-first; the day buckets are sorted anyway
+    txns = [dict(t) for t in snapshot["txns"]]
+    return _build_trend(snapshot["user_id"], snapshot["profile"], txns)
+
+
+def _build_trend(user_id: str, profile: Optional[Dict], raw_txns: List[dict]) -> Dict[str, Any]:
+    if not profile:
+        return {"success": False, "message": "User not found"}
+
     cutoff = _to_utc(datetime.utcnow()) - timedelta(days=30)
     txns: List[dict] = []
 
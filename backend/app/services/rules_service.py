@@ -134,3 +134,21 @@ def evaluate_rules_for_transaction(
         "isFlaggedFraud": is_flagged,
         "matched_rules": matched,
     }
+
+
+def should_alert(ml_scores: Dict[str, Any], is_flagged: int) -> bool:
+    """
+    Alert decision for a scored transaction (tighter than "anything non-low").
+    Shared by create_transaction and the offline replay.
+    """
+    risk_level = ml_scores["risk_level"]
+    final_score = ml_scores["final_risk_score"]
+    fraud_prob = ml_scores["fraud_probability"]
+
+    if risk_level in ("high", "critical"):
+        return True
+    if risk_level == "medium" and (final_score >= 65 or fraud_prob >= 70):
+        return True
+    if is_flagged and final_score >= 55:
+        return True
+    return False
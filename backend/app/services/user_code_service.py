@@ -0,0 +1,75 @@
+# backend/app/services/user_code_service.py
+
+from typing import List
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.app.db.mongo import counters_col, users_col
+
+"""
+User codes like 'PRAT-0001'.
+
+The numeric part comes from a single counter document advanced with an atomic
+$inc, so codes are unique under concurrency and allocation is O(1) — callers
+that create many users reserve a whole block in one round trip.
+"""
+
+USER_CODE_COUNTER = "user_code"
+
+
+def max_existing_code() -> int:
+    """Highest numeric suffix among stored user codes ('PRAT-0042' -> 42), 0 if none."""
+    rows = list(users_col.aggregate([
+        {"$match": {"user_code": {"$type": "string"}}},
+        {"$project": {"_id": 0, "n": {"$convert": {
+            "input": {"$arrayElemAt": [{"$split": ["$user_code", "-"]}, -1]},
+            "to": "long",
+            "onError": 0,
+            "onNull": 0,
+        }}}},
+        {"$group": {"_id": None, "max": {"$max": "$n"}}},
+    ]))
+    return int(rows[0]["max"] or 0) if rows else 0
+
+
+def ensure_user_code_counter() -> None:
+    """
+    Make sure the counter is past every code already handed out. Codes used
+    to be numbered by count_documents (and the counter was first seeded from
+    the user count), so after a deletion the next number could already be
+    taken; seeding from the highest stored code fixes both. $max only ever
+    moves the counter forward, so this is safe on every startup and worker.
+    """
+    try:
+        counters_col.update_one(
+            {"_id": USER_CODE_COUNTER},
+            {"$max": {"seq": max_existing_code()}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass  # concurrent upsert from another worker; its $max did the same
+
+
+def allocate_user_code_block(n: int) -> int:
+    """Reserve n sequence numbers; returns the first one."""
+    counter = counters_col.find_one_and_update(
+        {"_id": USER_CODE_COUNTER},
+        {"$inc": {"seq": n}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter["seq"] - n + 1
+
+
+def format_user_code(name: str, seq: int) -> str:
+    prefix = "".join(c for c in (name or "").upper() if c.isalnum())[:4] or "USER"
+    return f"{prefix}-{seq:04d}"
+
+
+def next_user_codes(names: List[str]) -> List[str]:
+    """One code per name, from a single block reservation."""
+    if not names:
+        return []
+    start = allocate_user_code_block(len(names))
+    return [format_user_code(name, start + i) for i, name in enumerate(names)]
@@ -0,0 +1,256 @@
+# backend/app/services/user_import_service.py
+
+"""
+Bulk user import (partner onboarding).
+
+Input rows: name, email, role (optional), and either password (plaintext,
+bcrypt-hashed here) or password_hash (already bcrypt).
+
+Pipeline:
+1. validate every row, drop in-file and existing-email duplicates
+2. hash plaintext passwords on a process pool (bcrypt is CPU-bound)
+3. reserve all user codes with one atomic counter $inc
+4. insert_many(ordered=False) in chunks
+
+Every rejected row is reported with its 1-based row number and a reason.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from backend.app.core.hashing import MAX_PASSWORD_BYTES, hash_password
+from backend.app.db.models.user import UserCreate
+from backend.app.db.mongo import users_col
+from backend.app.services.user_code_service import next_user_codes
+from backend.app.services.user_search_service import normalize, search_fields
+
+INSERT_CHUNK = 1000
+EMAIL_LOOKUP_CHUNK = 5000
+HASH_CHUNKSIZE = 64
+VALID_ROLES = ("user", "admin")
+
+
+def parse_rows(content: bytes, filename: str = "") -> List[Dict[str, Any]]:
+    """CSV (header row) or JSON (list of objects / JSON lines)."""
+    text = content.decode("utf-8-sig")
+    name = filename.lower()
+
+    if name.endswith(".json") or text.lstrip().startswith("["):
+        return json.loads(text)
+    if name.endswith(".jsonl") or text.lstrip().startswith("{"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def _text(raw: Dict[str, Any], field: str, default: str = "") -> str:
+    """A stripped string field; JSON rows can hold anything, so check the type."""
+    value = raw.get(field)
+    if value is None or value == "":
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value.strip()
+
+
+def _validate(rows: List[Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    valid: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    seen_emails = set()
+
+    for i, raw in enumerate(rows, start=1):
+        if not isinstance(raw, dict):
+            errors.append({"row": i, "error": "Row must be an object"})
+            continue
+        try:
+            password = _text(raw, "password")
+            password_hash = _text(raw, "password_hash")
+            role = _text(raw, "role", "user").lower()
+            name = _text(raw, "name")
+            email = _text(raw, "email")
+        except ValueError as e:
+            errors.append({"row": i, "error": str(e)})
+            continue
+
+        if not password and not password_hash:
+            errors.append({"row": i, "error": "password or password_hash is required"})
+            continue
+        if password and len(password.encode("utf-8")) > MAX_PASSWORD_BYTES:
+            errors.append({"row": i, "error": "Password too long: must be <=72 bytes."})
+            continue
+        if password_hash and not password_hash.startswith("$2"):
+            errors.append({"row": i, "error": "password_hash must be a bcrypt hash"})
+            continue
+        if role not in VALID_ROLES:
+            errors.append({"row": i, "error": f"Invalid role: {role}"})
+            continue
+
+        try:
+            user = UserCreate(
+                name=name,
+                email=email,
+                password=password or "-",
+                role=role,
+            )
+        except ValidationError as e:
+            errors.append({"row": i, "error": e.errors()[0].get("msg", "invalid row")})
+            continue
+
+        email = str(user.email)
+        # the unique email_lc index rejects case-only duplicates too
+        if email.lower() in seen_emails:
+            errors.append({"row": i, "error": f"Duplicate email in file: {email}"})
+            continue
+        seen_emails.add(email.lower())
+
+        valid.append({
+            "row": i,
+            "name": user.name,
+            "email": email,
+            "role": user.role,
+            "password": password,
+            "password_hash": password_hash,
+        })
+
+    return valid, errors
+
+
+def _drop_existing(valid: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # email_lc: "Bob@x.com" is taken if "bob@x.com" exists
+    existing = set()
+    emails = [normalize(r["email"]) for r in valid]
+    for i in range(0, len(emails), EMAIL_LOOKUP_CHUNK):
+        chunk = emails[i:i + EMAIL_LOOKUP_CHUNK]
+        for u in users_col.find({"email_lc": {"$in": chunk}}, {"email_lc": 1, "_id": 0}):
+            existing.add(u["email_lc"])
+
+    kept = []
+    for r in valid:
+        if normalize(r["email"]) in existing:
+            errors.append({"row": r["row"], "error": "Email already registered"})
+        else:
+            kept.append(r)
+    return kept
+
+
+def _hash_all(
+    rows: List[Dict[str, Any]],
+    workers: Optional[int],
+    hash_many: Optional[Callable[[List[str]], List[str]]] = None,
+) -> None:
+    todo = [r for r in rows if not r["password_hash"]]
+    if not todo:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if hash_many is not None:
+        # API path: the shared, bounded password pool
+        hashes = hash_many([r["password"] for r in todo])
+    elif workers == 1 or len(todo) < HASH_CHUNKSIZE:
+        hashes = [hash_password(r["password"]) for r in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hashes = list(
+                pool.map(hash_password, [r["password"] for r in todo], chunksize=HASH_CHUNKSIZE)
+            )
+
+    for r, h in zip(todo, hashes):
+        r["password_hash"] = h
+        r["password"] = None  # don't keep plaintext around longer than needed
+
+
+def count_plaintext(rows: List[Any]) -> int:
+    """Rows that would need bcrypt (plaintext password, no password_hash)."""
+    return sum(
+        1 for r in rows
+        if isinstance(r, dict) and r.get("password") and not r.get("password_hash")
+    )
+
+
+def import_users(
+    rows: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    hash_many: Optional[Callable[[List[str]], List[str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Import rows; returns {"total", "inserted", "failed", "errors": [{row, error}]}.
+
+    Plaintext passwords are hashed with `hash_many` when given (the API passes
+    password_pool.hash_many), otherwise on a process pool of `workers`
+    (default: every core; the CLI only). Hashing happens before any insert,
+    so a hashing failure leaves nothing half-imported.
+    """
+    valid, errors = _validate(rows)
+    valid = _drop_existing(valid, errors)
+
+    _hash_all(valid, workers, hash_many)
+
+    codes = next_user_codes([r["name"] for r in valid])
+    now = datetime.utcnow()
+
+    docs = []
+    for r, code in zip(valid, codes):
+        docs.append({
+            "name": r["name"],
+            "email": r["email"],
+            "password_hash": r["password_hash"],
+            "role": r["role"],
+            "user_code": code,
+            "created_at": now,
+            "status": "active",
+            **search_fields(r["name"], r["email"], code),
+        })
+
+    inserted = 0
+    for start in range(0, len(docs), INSERT_CHUNK):
+        chunk = docs[start:start + INSERT_CHUNK]
+        chunk_rows = valid[start:start + INSERT_CHUNK]
+        try:
+            inserted += len(users_col.insert_many(chunk, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            details = e.details or {}
+            inserted += details.get("nInserted", 0)
+            for w in details.get("writeErrors", []):
+                errors.append({
+                    "row": chunk_rows[w["index"]]["row"],
+                    "error": w.get("errmsg", "insert failed"),
+                })
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "total": len(rows),
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m backend.app.services.user_import_service <users.csv|users.json> [workers]")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    with open(path, "rb") as f:
+        parsed = parse_rows(f.read(), path)
+
+    started = datetime.utcnow()
+    report = import_users(parsed, workers=n_workers)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+
+    print(f"[import] {report['inserted']}/{report['total']} users inserted in {elapsed:.1f}s")
+    for err in report["errors"][:50]:
+        print(f"[import] row {err['row']}: {err['error']}")
+    if report["failed"] > 50:
+        print(f"[import] ... and {report['failed'] - 50} more errors")
@@ -0,0 +1,160 @@
+# backend/app/services/user_search_service.py
+
+"""
+Admin user search.
+
+Each user document carries normalized copies of its searchable fields:
+- email_lc / user_code_lc / name_lc: lowercase, for anchored prefix lookups
+  that resolve to tight index bounds
+- search_grams: lowercase trigrams of all three, for substring matches via a
+  multikey index ($all on the query's trigrams), verified in Python
+
+Raw input is never handed to $regex unescaped.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.app.db.mongo import users_col
+
+NGRAM = 3
+BACKFILL_BATCH = 1000
+
+# lower rank sorts first
+RANK_EXACT = 0
+RANK_CODE_PREFIX = 1
+RANK_EMAIL_PREFIX = 2
+RANK_NAME_PREFIX = 3
+RANK_SUBSTRING = 4
+
+
+def normalize(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+
+def _grams(value: str) -> List[str]:
+    if len(value) < NGRAM:
+        return []
+    return [value[i:i + NGRAM] for i in range(len(value) - NGRAM + 1)]
+
+
+def search_fields(name: Optional[str], email: Optional[str], user_code: Optional[str]) -> Dict[str, Any]:
+    """Fields to $set on every user insert (register, import, seed)."""
+    email_lc = normalize(email)
+    code_lc = normalize(user_code)
+    name_lc = normalize(name)
+
+    grams = set()
+    for v in (email_lc, code_lc, name_lc):
+        grams.update(_grams(v))
+
+    return {
+        "email_lc": email_lc,
+        "user_code_lc": code_lc,
+        "name_lc": name_lc,
+        "search_grams": sorted(grams),
+    }
+
+
+def _rank(user: Dict[str, Any], q: str) -> int:
+    email_lc = user.get("email_lc", "")
+    code_lc = user.get("user_code_lc", "")
+    name_lc = user.get("name_lc", "")
+
+    if q in (email_lc, code_lc):
+        return RANK_EXACT
+    if code_lc.startswith(q):
+        return RANK_CODE_PREFIX
+    if email_lc.startswith(q):
+        return RANK_EMAIL_PREFIX
+    if name_lc.startswith(q):
+        return RANK_NAME_PREFIX
+    return RANK_SUBSTRING
+
+
+def search_users(q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Typeahead search over email / user_code / name.
+    Prefix matches are served first (index range scans), then trigram
+    substring matches fill the remaining slots.
+    """
+    q = normalize(q)
+    if not q:
+        return []
+
+    limit = max(1, min(limit, 100))
+    prefix = {"$regex": "^" + re.escape(q)}
+
+    found: Dict[Any, Dict[str, Any]] = {}
+
+    for field in ("user_code_lc", "email_lc", "name_lc"):
+        for u in users_col.find({field: prefix}).limit(limit):
+            found.setdefault(u["_id"], u)
+
+    grams = _grams(q)
+    if len(found) < limit and grams:
+        # the index narrows candidates to users holding every trigram;
+        # the substring check removes the rare false positive
+        cursor = users_col.find({"search_grams": {"$all": grams}}).limit(limit * 4)
+        for u in cursor:
+            if u["_id"] in found:
+                continue
+            haystacks = (u.get("email_lc", ""), u.get("user_code_lc", ""), u.get("name_lc", ""))
+            if any(q in h for h in haystacks):
+                found[u["_id"]] = u
+            if len(found) >= limit * 2:
+                break
+
+    ranked = sorted(
+        found.values(),
+        key=lambda u: (_rank(u, q), u.get("email_lc", "")),
+    )
+    return ranked[:limit]
+
+
+def backfill_search_fields(batch_size: int = BACKFILL_BATCH) -> int:
+    """
+    Populate search fields on users created before they existed.
+    Idempotent: only touches documents without search_grams.
+    Returns the number of users updated.
+    """
+    updated = 0
+    ops: List[UpdateOne] = []
+
+    cursor: Iterable[Dict[str, Any]] = users_col.find(
+        {"search_grams": {"$exists": False}},
+        {"name": 1, "email": 1, "user_code": 1},
+    )
+    for u in cursor:
+        fields = search_fields(u.get("name"), u.get("email"), u.get("user_code"))
+        ops.append(UpdateOne({"_id": u["_id"]}, {"$set": fields}))
+        if len(ops) >= batch_size:
+            updated += _write_batch(ops)
+            ops = []
+
+    if ops:
+        updated += _write_batch(ops)
+
+    return updated
+
+
+def _write_batch(ops: List[UpdateOne]) -> int:
+    """
+    One unordered batch. A failing user is logged and skipped; the rest of
+    the batch (and the backfill) carries on.
+    """
+    try:
+        return users_col.bulk_write(ops, ordered=False).modified_count
+    except BulkWriteError as e:
+        details = e.details or {}
+        for w in details.get("writeErrors", []):
+            print(f"[users] search fields not backfilled for {w.get('op', {}).get('q', {}).get('_id')}: {w.get('errmsg')}")
+        return details.get("nModified", 0)
+
+
+if __name__ == "__main__":
+    n = backfill_search_fields()
+    print(f"[users] search fields backfilled for {n} users")
@@ -0,0 +1,53 @@
+# backend/app/services/user_snapshot_service.py
+
+from typing import Any, Dict
+
+from backend.app.db.mongo import alerts_col, profiles_col, txns_col
+
+# Enough for every consumer: speculation (20), behaviour (100, 30d),
+# risk trend (30d) and the intel transaction list (20).
+SNAPSHOT_TXN_LIMIT = 200
+SNAPSHOT_ALERT_LIMIT = 20
+
+TXN_PROJECTION = {
+    "_id": 0,
+    "txn_id": 1,
+    "timestamp": 1,
+    "amount": 1,
+    "currency": 1,
+    "channel": 1,
+    "merchant_type": 1,
+    "ml_scores": 1,
+}
+
+
+def load_user_snapshot(user_id: str) -> Dict[str, Any]:
+    """
+    One read of everything the agent services need for a user, so /intel
+    can hand the same data to every section instead of each re-querying.
+
+    Returns:
+    - profile: profile doc or None
+    - txns: most recent SNAPSHOT_TXN_LIMIT txns, newest first
+    - alerts: most recent SNAPSHOT_ALERT_LIMIT alerts, newest first
+    """
+    profile = profiles_col.find_one({"user_id": user_id})
+
+    txns = list(
+        txns_col.find({"user_id": user_id}, TXN_PROJECTION)
+        .sort("timestamp", -1)
+        .limit(SNAPSHOT_TXN_LIMIT)
+    )
+
+    alerts = list(
+        alerts_col.find({"user_id": user_id})
+        .sort("created_at", -1)
+        .limit(SNAPSHOT_ALERT_LIMIT)
+    )
+
+    return {
+        "user_id": user_id,
+        "profile": profile,
+        "txns": txns,
+        "alerts": alerts,
+    }
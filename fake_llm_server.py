@@ -0,0 +1,203 @@
+"""
+Fake OpenAI-compatible chat-completions server for local runs and tests.
+
+Answers POST /v1/chat/completions with a canned JSON object matching the
+agent prompt it receives (speculation / behaviour / case file / combined),
+either in one response or as an SSE token stream when "stream": true.
+--error-rate makes a share of requests fail with --error-status (429 or 5xx)
+to exercise the client's retries, rate limiting and circuit breaker;
+--fail-after N sends an error event after N streamed tokens, the way
+providers report a failure mid-stream.
+
+Usage:
+    python fake_llm_server.py --port 8089 --token-delay 0.02
+    python fake_llm_server.py --error-rate 0.3 --error-status 429
+
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://localhost:8089/v1 \
+        uvicorn backend.app.main:app
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SPECULATION = {
+    "speculation_score": 42,
+    "risk_level": "medium",
+    "explanation": "Fake LLM: moderate risk based on recent transactions.",
+    "indicators": ["fake indicator"],
+}
+BEHAVIOUR = {
+    "verdict": "mildly suspicious",
+    "summary": "Fake LLM: behaviour over the last 30 days is mostly stable.",
+    "key_patterns": ["fake pattern"],
+}
+CASE_FILE = {
+    "executive_summary": "Fake LLM: case file for local testing.",
+    "risk_rating": "medium",
+    "behaviour_findings": ["fake finding"],
+    "anomaly_timeline": ["fake anomaly"],
+    "recommended_action": "Place under monitoring",
+}
+
+
+def canned_answer(prompt: str) -> str:
+    if '"speculation":' in prompt and '"investigation":' in prompt:
+        body = {"speculation": SPECULATION, "behaviour": BEHAVIOUR, "investigation": CASE_FILE}
+    elif "case file" in prompt:
+        body = CASE_FILE
+    elif "behaviour summary" in prompt:
+        body = BEHAVIOUR
+    else:
+        body = SPECULATION
+    return json.dumps(body)
+
+
+def _usage(prompt: str, answer: str) -> dict:
+    return {
+        "prompt_tokens": len(prompt) // 4,
+        "completion_tokens": len(answer) // 4,
+        "total_tokens": (len(prompt) + len(answer)) // 4,
+    }
+
+
+def _tokens(text: str, size: int = 8):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    token_delay = 0.02
+    latency = 0.0
+    error_rate = 0.0
+    error_status = 503
+    fail_after = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):  # keep test output quiet
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self._error()
+            return
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        model = request.get("model", "fake-model")
+        answer = canned_answer(prompt)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if request.get("stream"):
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            self._stream(completion_id, model, prompt, answer, include_usage)
+        else:
+            self._complete(completion_id, model, prompt, answer)
+
+    def _error(self) -> None:
+        body = json.dumps({
+            "error": {"message": "Fake LLM injected error", "type": "fake_error", "code": self.error_status}
+        }).encode()
+        self.send_response(self.error_status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.error_status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _complete(self, completion_id: str, model: str, prompt: str, answer: str) -> None:
+        body = json.dumps({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(prompt, answer),
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, completion_id: str, model: str, prompt: str, answer: str, include_usage: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def write(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        def send(choices, **extra):
+            write({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            })
+
+        def delta(content, finish_reason=None):
+            return [{"index": 0, "delta": content, "finish_reason": finish_reason}]
+
+        send(delta({"role": "assistant", "content": ""}))
+        for i, token in enumerate(_tokens(answer)):
+            if self.fail_after is not None and i >= self.fail_after:
+                write({"error": {"message": "Fake LLM injected mid-stream error", "type": "server_error"}})
+                self.close_connection = True
+                return
+            time.sleep(self.token_delay)
+            send(delta({"content": token}))
+        send(delta({}, finish_reason="stop"))
+        if include_usage:
+            # as the API does: a last chunk with no choices, only usage
+            send([], usage=_usage(prompt, answer))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail (0-1)")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status for failed requests")
+    parser.add_argument("--fail-after", type=int, default=None, help="streamed tokens before a mid-stream error")
+    args = parser.parse_args()
+
+    FakeLLMHandler.token_delay = args.token_delay
+    FakeLLMHandler.latency = args.latency
+    FakeLLMHandler.error_rate = args.error_rate
+    FakeLLMHandler.error_status = args.error_status
+    FakeLLMHandler.fail_after = args.fail_after
+    server = ThreadingHTTPServer((args.host, args.port), FakeLLMHandler)
+    print(f"Fake LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -153,15 +153,15 @@ async function loadPageData(page) {
 // ===== OVERVIEW PAGE =====
 async function loadOverview() {
     try {
-        // Load users count
-        const users = await apiCall('/api/admin/users?limit=1000');
-        document.getElementById('totalUsers').textContent = users.length;
+        // Load users count (server-side, listing is capped per page)
+        const userCount = await apiCall('/api/admin/users/count');
+        document.getElementById('totalUsers').textContent = userCount.total;
 
-        // Load alerts
-        const alerts = await apiCall('/api/admin/alerts');
-        const openAlerts = alerts.filter(a => a.status === 'open');
-        document.getElementById('openAlerts').textContent = openAlerts.length;
-        document.getElementById('alertsBadge').textContent = openAlerts.length;
+        // Load alert counts (server-side, no alert documents fetched)
+        const counts = await apiCall('/api/admin/alerts/counts');
+        const openAlerts = counts.by_status?.open || 0;
+        document.getElementById('openAlerts').textContent = openAlerts;
+        document.getElementById('alertsBadge').textContent = openAlerts;
 
         // Load global risk trend
         const riskData = await apiCall('/api/admin/risk-trend-global?days=30');
@@ -173,32 +173,21 @@ async function loadOverview() {
 
             // Render risk trend chart
             renderRiskTrendChart(riskData.days);
-
-            // Calculate risk distribution
-            const distribution = calculateRiskDistribution(riskData.days);
-            renderRiskDistributionChart(distribution);
         } else {
             document.getElementById('txnsToday').textContent = '0';
             document.getElementById('avgRisk').textContent = '0';
         }
+
+        // Risk distribution (per-transaction counts, single aggregation)
+        const distData = await apiCall('/api/admin/risk-distribution?days=30');
+        if (distData.success) {
+            renderRiskDistributionChart(distData.risk_levels);
+        }
     } catch (error) {
         console.error('Error loading overview:', error);
     }
 }
 
-function calculateRiskDistribution(days) {
-    const distribution = { low: 0, medium: 0, high: 0, critical: 0 };
-    
-    days.forEach(day => {
-        if (day.avg_risk < 40) distribution.low++;
-        else if (day.avg_risk < 65) distribution.medium++;
-        else if (day.avg_risk < 85) distribution.high++;
-        else distribution.critical++;
-    });
-    
-    return distribution;
-}
-
 function renderRiskTrendChart(days) {
     const ctx = document.getElementById('riskTrendChart');
     
@@ -19,21 +19,123 @@ async function resolveUserId(rawInput) {
     return users[0].user_id;
 }
 
+let alertsCache = [];
+let alertStreamStarted = false;
+let lastAlertEventId = null;
+
 async function loadAlerts() {
     try {
-        const alerts = await apiCall('/api/admin/alerts');
         const filter = document.getElementById('alertFilter')?.value || 'all';
-        
-        const filtered = filter === 'all' 
-            ? alerts 
-            : alerts.filter(a => a.status === filter);
-        
-        renderAlertsTable(filtered);
+        const query = filter === 'all' ? '' : `?status=${encodeURIComponent(filter)}`;
+        alertsCache = await apiCall(`/api/admin/alerts${query}`);
+        renderFilteredAlerts();
+        startAlertStream();
     } catch (error) {
         console.error('Error loading alerts:', error);
     }
 }
 
+function renderFilteredAlerts() {
+    renderAlertsTable(alertsCache.filter(alertMatchesFilter));
+}
+
+// ===== LIVE ALERT FEED (SSE over fetch so we can send the bearer token) =====
+function alertMatchesFilter(alert) {
+    const filter = document.getElementById('alertFilter')?.value || 'all';
+    return filter === 'all' || alert.status === filter;
+}
+
+let badgeRefreshTimer = null;
+
+function scheduleBadgeRefresh() {
+    // the cache only holds the filtered page, so count open alerts server-side
+    if (badgeRefreshTimer) return;
+    badgeRefreshTimer = setTimeout(async () => {
+        badgeRefreshTimer = null;
+        try {
+            const counts = await apiCall('/api/admin/alerts/counts');
+            const badge = document.getElementById('alertsBadge');
+            if (badge) badge.textContent = counts.by_status?.open || 0;
+        } catch (error) {
+            console.warn('Could not refresh alert counts:', error);
+        }
+    }, 1000);
+}
+
+function applyAlertEvent(alert) {
+    const idx = alertsCache.findIndex(a => a.alert_id === alert.alert_id);
+    if (alertMatchesFilter(alert)) {
+        if (idx >= 0) {
+            alertsCache[idx] = alert;
+        } else {
+            alertsCache.unshift(alert);
+        }
+    } else if (idx >= 0) {
+        // e.g. resolved while the "open" filter is active
+        alertsCache.splice(idx, 1);
+    }
+
+    scheduleBadgeRefresh();
+
+    if (currentPage === 'alerts') renderFilteredAlerts();
+}
+
+function handleSseMessage(raw) {
+    let id = null;
+    let event = 'message';
+    let data = '';
+
+    raw.split('\n').forEach(line => {
+        if (line.startsWith('id:')) id = line.slice(3).trim();
+        else if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+    });
+
+    if (id) lastAlertEventId = id;
+
+    if (event === 'resync') {
+        loadAlerts();
+    } else if (data) {
+        applyAlertEvent(JSON.parse(data));
+    }
+}
+
+async function startAlertStream() {
+    if (alertStreamStarted) return;
+    alertStreamStarted = true;
+
+    while (true) {
+        try {
+            const headers = { 'Authorization': `Bearer ${token}` };
+            if (lastAlertEventId) headers['Last-Event-ID'] = lastAlertEventId;
+
+            const response = await fetch(`${API_BASE}/api/admin/alerts/stream`, { headers });
+            if (response.status === 401) return;
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+
+                buffer += decoder.decode(value, { stream: true });
+                let sep;
+                while ((sep = buffer.indexOf('\n\n')) >= 0) {
+                    handleSseMessage(buffer.slice(0, sep));
+                    buffer = buffer.slice(sep + 2);
+                }
+            }
+        } catch (error) {
+            console.warn('Alert stream disconnected:', error);
+        }
+
+        // reconnect; Last-Event-ID replays anything we missed
+        await new Promise(resolve => setTimeout(resolve, 3000));
+    }
+}
+
 function renderAlertsTable(alerts) {
     const tbody = document.getElementById('alertsTableBody');
     
@@ -15,7 +15,9 @@ const CONFIG = {
         // Admin
         USERS: '/api/admin/users',
         ALERTS: '/api/admin/alerts',
+        ALERTS_STREAM: '/api/admin/alerts/stream',
         RISK_TREND_GLOBAL: '/api/admin/risk-trend-global',
+        RISK_DISTRIBUTION: '/api/admin/risk-distribution',
         GEO_HOTSPOTS: '/api/admin/geo-hotspots',
         
         // Agent/Intelligence
@@ -23,7 +25,10 @@ const CONFIG = {
         RISK_TREND: '/api/agent/risk-trend',
         SPECULATION: '/api/agent/speculate',
         BEHAVIOR: '/api/agent/behavior-summary',
+        BEHAVIOR_STREAM: '/api/agent/behavior-summary/stream',
         INVESTIGATION: '/api/agent/investigation',
+        INVESTIGATION_STREAM: '/api/agent/investigation/stream',
+        AGENT_JOBS: '/api/agent/jobs',
         
         // User
         TRANSACTION_NEW: '/api/transaction/new',
@@ -1,5 +1,16 @@
+import numpy as np
+
+
 def deviation_score(current, avg, std):
     if std == 0:
         return 0
     score = abs(current - avg) / std
     return min(score, 100)
+
+
+def deviation_scores(current, avg, std):
+    """deviation_score over numpy arrays."""
+    current, avg, std = np.asarray(current), np.asarray(avg), np.asarray(std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.abs(current - avg) / std
+    return np.where(std == 0, 0.0, np.minimum(score, 100))
@@ -1,43 +1,170 @@
+import json
+from pathlib import Path
+
 import joblib
 import numpy as np
-from behavior.deviation import deviation_score
-from behavior.trust import compute_trust
+import pandas as pd
+
+from behavior.deviation import deviation_scores
+from pipeline.chunked_data import COLUMNS_FILE
+
+# Batch scoring with the supervised + anomaly models for offline jobs
+# (evaluation, backfills). One predict_proba / decision_function call per
+# DataFrame, blend done column-wise:
+#
+#   final = 0.45 * fraud_probability + 0.30 * anomaly_score
+#         + 0.20 * deviation + 0.10 * (100 - trust)
+#
+# Nothing is loaded at import; models come from an explicit directory
+# (default: ml_engine/models next to this file, not the cwd) or from a
+# registry bundle dict (backend.app.ml.registry.load_bundle). predict_full
+# uses the registry's active bundle, falling back to ml_engine/models.
+#
+# The models only make sense on the exact scaled columns they were trained
+# on, so the feature columns and the scaler are required: from the bundle
+# manifest, from feature_columns.json next to the models (written by
+# train_out_of_core.py), or passed explicitly. Nothing is guessed.
+
+MODELS_DIR = Path(__file__).resolve().parent / "models"
+
+WEIGHTS = {"fraud_probability": 0.45, "anomaly_score": 0.30, "deviation": 0.20, "distrust": 0.10}
+SCORE_COLUMNS = ["fraud_probability", "anomaly_score", "deviation", "trust_score", "final_risk_score"]
+
+
+class FinalPredictor:
+    def __init__(self, supervised, anomaly, scaler, feature_columns):
+        if scaler is None:
+            raise ValueError("A scaler is required: the models were trained on scaled features")
+        if not feature_columns:
+            raise ValueError("feature_columns are required: the models' training column order")
+        self.supervised = supervised
+        self.anomaly = anomaly
+        self.scaler = scaler
+        self.feature_columns = list(feature_columns)
+
+    @classmethod
+    def from_dir(cls, models_dir=MODELS_DIR, feature_columns=None):
+        """feature_columns: default is models_dir/feature_columns.json."""
+        models_dir = Path(models_dir)
+        scaler_path = models_dir / "scaler.pkl"
+        if not scaler_path.exists():
+            raise FileNotFoundError(f"No scaler.pkl in {models_dir}; refusing to score unscaled features")
+        if feature_columns is None:
+            columns_path = models_dir / COLUMNS_FILE
+            if not columns_path.exists():
+                raise FileNotFoundError(
+                    f"No {COLUMNS_FILE} in {models_dir}; pass feature_columns or load a registry bundle"
+                )
+            with open(columns_path) as f:
+                feature_columns = json.load(f)["feature_columns"]
+        return cls(
+            supervised=joblib.load(models_dir / "supervised_xgb.pkl"),
+            anomaly=joblib.load(models_dir / "anomaly_iforest.pkl"),
+            scaler=joblib.load(scaler_path),
+            feature_columns=feature_columns,
+        )
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        return cls(
+            supervised=bundle["supervised_model"],
+            anomaly=bundle["anomaly_model"],
+            scaler=bundle["scaler"],
+            feature_columns=bundle["manifest"]["feature_columns"],
+        )
+
+    @classmethod
+    def default(cls):
+        """
+        The registry's active bundle (what the API serves; every training
+        script publishes there), else MODELS_DIR if it holds a complete set.
+        """
+        from pipeline.publish import load_active_bundle
+
+        bundle = load_active_bundle()
+        if bundle is not None:
+            return cls.from_bundle(bundle)
+        try:
+            return cls.from_dir()
+        except FileNotFoundError as e:
+            raise FileNotFoundError(
+                f"No active registry bundle and {e}; train and publish with --activate first"
+            ) from e
+
+    def _matrix(self, df):
+        missing = [c for c in self.feature_columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+        return self.scaler.transform(df[self.feature_columns].to_numpy(dtype=np.float32))
+
+    def predict(
+        self,
+        df,
+        amount_col="amount",
+        avg_col="avg_amount",
+        std_col="std_amount",
+        trust_col="trust",
+    ):
+        """
+        df: one row per transaction with the model features and the aligned
+        profile columns (avg_amount / std_amount / trust; amount is usually
+        also a feature). Only feature_columns are fed to the models, in that
+        order; other columns are ignored.
+        Returns a copy of df with SCORE_COLUMNS added.
+        """
+        X = self._matrix(df)
+
+        # 1. Fraud probability
+        fraud_prob = self.supervised.predict_proba(X)[:, 1] * 100
+
+        # 2. Anomaly score
+        anomaly_score = np.abs(self.anomaly.decision_function(X)) * 100
+
+        # 3. Behaviour deviation
+        deviation = deviation_scores(
+            df[amount_col].to_numpy(dtype=np.float64),
+            df[avg_col].to_numpy(dtype=np.float64),
+            df[std_col].to_numpy(dtype=np.float64),
+        )
+
+        # 4. Trust score
+        trust = df[trust_col].to_numpy(dtype=np.float64)
+
+        # 5. Combined scam probability
+        final = (
+            WEIGHTS["fraud_probability"] * fraud_prob
+            + WEIGHTS["anomaly_score"] * anomaly_score
+            + WEIGHTS["deviation"] * deviation
+            + WEIGHTS["distrust"] * (100 - trust)
+        )
+
+        scored = df.copy()
+        scored["fraud_probability"] = fraud_prob
+        scored["anomaly_score"] = anomaly_score
+        scored["deviation"] = deviation
+        scored["trust_score"] = trust
+        scored["final_risk_score"] = final
+        return scored
+
+
+_default = None
 
-# Load models
-supervised = joblib.load("models/supervised_xgb.pkl")
-iso = joblib.load("models/anomaly_iforest.pkl")
 
 def predict_full(features, user_profile):
+    """
+    Single transaction, scored with FinalPredictor.default(). features: dict
+    with every feature column of those models (incl. amount); user_profile:
+    {"avg_amount", "std_amount", "trust"}.
+    """
+    global _default
+    if _default is None:
+        _default = FinalPredictor.default()
 
-    # 1. Fraud Probability
-    fraud_prob = supervised.predict_proba([features])[0][1] * 100
-
-    # 2. Anomaly Score
-    anomaly_raw = iso.decision_function([features])[0]
-    anomaly_score = abs(anomaly_raw) * 100
-
-    # 3. Behavior Deviation
-    deviation = deviation_score(
-        features["amount"],
-        user_profile["avg_amount"],
-        user_profile["std_amount"]
-    )
-
-    # 4. Trust Score
-    trust = user_profile["trust"]
-
-    # 5. Combined Scam Probability
-    final = (
-        0.45 * fraud_prob +
-        0.30 * anomaly_score +
-        0.20 * deviation +
-        0.10 * (100 - trust)
-    )
-
-    return {
-        "fraud_probability": fraud_prob,
-        "anomaly_score": anomaly_score,
-        "deviation": deviation,
-        "trust_score": trust,
-        "final_risk_score": final
-    }
+    row = pd.DataFrame([{
+        **features,
+        "avg_amount": user_profile["avg_amount"],
+        "std_amount": user_profile["std_amount"],
+        "trust": user_profile["trust"],
+    }])
+    scored = _default.predict(row)
+    return {col: float(scored[col].iloc[0]) for col in SCORE_COLUMNS}
@@ -0,0 +1,173 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+# Out-of-core version of DataCleaner for datasets larger than RAM.
+#
+# Pass 1 reads the CSV in chunks and plans the columns: numeric -> float32,
+# text -> a fixed category -> code mapping (high-cardinality id columns such
+# as account names are dropped), timestamp -> hour.
+# Pass 2 reads it again in chunks with those dtypes, applies the same
+# cleaning as DataCleaner.clean (dropna, hour, category codes), appends the
+# rows to a float32 memmap on disk and fits the StandardScaler incrementally.
+#
+# Only one chunk is ever in memory; the feature matrix is ~4 bytes/cell
+# instead of 8 (float64) + Python objects.
+
+FEATURES_FILE = "features.f32"
+LABELS_FILE = "labels.f32"
+META_FILE = "meta.json"
+# written next to trained models: their column order + the encoding plan
+COLUMNS_FILE = "feature_columns.json"
+# keys of plan_columns' result, i.e. everything needed to encode a raw row
+PLAN_KEYS = ("label", "numeric", "categories", "has_timestamp", "dropped", "columns")
+
+
+def plan_columns(csv_path, label, chunksize=500_000, max_categories=1000):
+    """First pass: dtype per column and the category mapping for text columns."""
+    header = pd.read_csv(csv_path, nrows=1000)
+    text_cols = [
+        c for c in header.columns
+        if c != label and not pd.api.types.is_numeric_dtype(header[c])
+    ]
+    numeric_cols = [c for c in header.columns if c not in text_cols and c != label]
+
+    categories = {c: set() for c in text_cols if c != "timestamp"}
+    if categories:
+        reader = pd.read_csv(csv_path, usecols=list(categories), dtype=str, chunksize=chunksize)
+        for chunk in reader:
+            for col in list(categories):
+                categories[col].update(chunk[col].dropna().unique())
+                if len(categories[col]) > max_categories:
+                    # ids, not categories: codes would be meaningless
+                    del categories[col]
+
+    dropped = [c for c in text_cols if c != "timestamp" and c not in categories]
+    columns = [c for c in header.columns if c != label and c not in dropped]
+    if "timestamp" in columns:
+        columns.append("hour")
+
+    return {
+        "label": label,
+        "numeric": numeric_cols,
+        "categories": {c: sorted(v) for c, v in categories.items()},
+        "has_timestamp": "timestamp" in text_cols,
+        "dropped": dropped,
+        # final feature order, same as DataCleaner (original order, hour last)
+        "columns": [c for c in columns if c != "timestamp"],
+    }
+
+
+def _read_dtypes(plan):
+    dtypes = {c: np.float32 for c in plan["numeric"]}
+    dtypes.update({c: pd.CategoricalDtype(v) for c, v in plan["categories"].items()})
+    dtypes[plan["label"]] = np.float32
+    if plan["has_timestamp"]:
+        dtypes["timestamp"] = str
+    return dtypes
+
+
+def _chunk_to_features(chunk, plan):
+    chunk = chunk.dropna()
+    if plan["has_timestamp"]:
+        chunk = chunk.assign(hour=pd.to_datetime(chunk["timestamp"]).dt.hour.astype(np.float32))
+    for col in plan["categories"]:
+        chunk[col] = chunk[col].cat.codes.astype(np.float32)
+    X = chunk[plan["columns"]].to_numpy(dtype=np.float32)
+    y = chunk[plan["label"]].to_numpy(dtype=np.float32)
+    return X, y
+
+
+def build_feature_matrix(csv_path, out_dir, label="is_fraud", chunksize=500_000, max_categories=1000):
+    """
+    Convert the CSV once into out_dir/{features,labels}.f32 + meta.json and
+    return (FeatureMatrix, fitted StandardScaler).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    plan = plan_columns(csv_path, label, chunksize, max_categories)
+    usecols = plan["numeric"] + list(plan["categories"]) + [label]
+    if plan["has_timestamp"]:
+        usecols.append("timestamp")
+
+    scaler = StandardScaler()
+    n_rows = 0
+    n_pos = 0
+    with open(os.path.join(out_dir, FEATURES_FILE), "wb") as xf, \
+            open(os.path.join(out_dir, LABELS_FILE), "wb") as yf:
+        reader = pd.read_csv(csv_path, usecols=usecols, dtype=_read_dtypes(plan), chunksize=chunksize)
+        for chunk in reader:
+            X, y = _chunk_to_features(chunk, plan)
+            if not len(X):
+                continue
+            scaler.partial_fit(X)
+            X.tofile(xf)
+            y.tofile(yf)
+            n_rows += len(X)
+            n_pos += int(y.sum())
+
+    meta = {**plan, "n_rows": n_rows, "n_positive": n_pos, "dtype": "float32"}
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    return FeatureMatrix(out_dir), scaler
+
+
+class FeatureMatrix:
+    """Read-only memmap view of a matrix written by build_feature_matrix."""
+
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.columns = self.meta["columns"]
+        n, d = self.meta["n_rows"], len(self.columns)
+        self.X = np.memmap(os.path.join(out_dir, FEATURES_FILE), dtype=np.float32, mode="r", shape=(n, d))
+        self.y = np.memmap(os.path.join(out_dir, LABELS_FILE), dtype=np.float32, mode="r", shape=(n,))
+
+    def __len__(self):
+        return self.meta["n_rows"]
+
+    def split_mask(self, test_size=0.2, seed=42):
+        """Boolean mask, True = test row. 1 byte per row."""
+        rng = np.random.default_rng(seed)
+        return rng.random(len(self)) < test_size
+
+    def batches(self, batch_rows, mask=None, scaler=None):
+        """Yield (X, y) blocks in file order; rows where mask is False only."""
+        for start in range(0, len(self), batch_rows):
+            stop = min(start + batch_rows, len(self))
+            X = np.asarray(self.X[start:stop])
+            y = np.asarray(self.y[start:stop])
+            if mask is not None:
+                keep = ~mask[start:stop]
+                X, y = X[keep], y[keep]
+            if not len(X):
+                continue
+            if scaler is not None:
+                X = scaler.transform(X).astype(np.float32, copy=False)
+            yield X, y
+
+    def sample(self, n, where=None, seed=42, batch_rows=1_000_000):
+        """
+        Uniform sample of up to n rows (optionally only rows where y == where).
+        One Bernoulli pass at p = n / eligible keeps memory at ~n rows; when it
+        overshoots, the n kept are a random subset, not the earliest rows.
+        """
+        rng = np.random.default_rng(seed)
+        eligible = len(self) if where is None else int(np.sum(self.y == where))
+        p = min(1.0, n / max(1, eligible))
+        picked = []
+        for start in range(0, len(self), batch_rows):
+            stop = min(start + batch_rows, len(self))
+            sel = rng.random(stop - start) < p
+            if where is not None:
+                sel &= np.asarray(self.y[start:stop]) == where
+            picked.append(np.asarray(self.X[start:stop][sel]))
+        if not picked:
+            return np.empty((0, len(self.columns)), np.float32)
+        sample = np.concatenate(picked)
+        if len(sample) > n:
+            sample = sample[np.sort(rng.choice(len(sample), n, replace=False))]
+        return sample
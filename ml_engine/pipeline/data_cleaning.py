@@ -4,6 +4,8 @@ from sklearn.preprocessing import StandardScaler
 class DataCleaner:
     def __init__(self):
         self.scaler = StandardScaler()
+        # column -> categories in code order, filled by clean()
+        self.categories = {}
 
     def clean(self, df):
         # Drop columns you don’t need
@@ -15,7 +17,9 @@ class DataCleaner:
 
         # Fix category values
         for col in df.select_dtypes(include=['object']).columns:
-            df[col] = df[col].astype('category').cat.codes
+            cat = df[col].astype('category')
+            self.categories[col] = [str(c) for c in cat.cat.categories]
+            df[col] = cat.cat.codes
 
         return df
 
@@ -0,0 +1,45 @@
+import resource
+import sys
+import time
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class StageTimer:
+    """Wall time per stage + process peak RSS, printed as each stage ends."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def summary(self):
+        total = time.perf_counter() - self.started
+        lines = [f"{name:<28} {secs:8.1f}s   peak RSS {rss:8.1f} MB" for name, secs, rss in self.stages]
+        lines.append(f"{'total':<28} {total:8.1f}s   peak RSS {peak_rss_mb():8.1f} MB")
+        return "\n".join(lines)
+
+
+class _Stage:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        secs = time.perf_counter() - self.started
+        rss = peak_rss_mb()
+        self.timer.stages.append((self.name, secs, rss))
+        print(f"[{self.name}] {secs:.1f}s, peak RSS {rss:.1f} MB")
+        return False
@@ -0,0 +1,29 @@
+import os
+import sys
+
+# Training scripts run from ml_engine/; the registry lives in the backend
+# package at the repo root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.app.ml.registry import load_bundle, publish_bundle, read_active  # noqa: E402
+
+
+def publish(supervised_model, anomaly_model, scaler, feature_columns, preprocessing, metrics=None, activate=False):
+    """Publish a training run as a registry bundle and print its version."""
+    version = publish_bundle(
+        supervised_model,
+        anomaly_model,
+        scaler,
+        feature_columns,
+        metrics=metrics,
+        preprocessing=preprocessing,
+        activate=activate,
+    )
+    print(f"Published model bundle {version}" + (" (active)" if activate else ""))
+    return version
+
+
+def load_active_bundle():
+    """The registry's active bundle (load_bundle dict), or None if nothing is active."""
+    version = read_active()["active"]
+    return load_bundle(version) if version else None
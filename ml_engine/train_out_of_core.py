@@ -0,0 +1,172 @@
+"""
+Out-of-core training for the supervised (XGBoost) and anomaly (IsolationForest)
+models, for datasets that don't fit in RAM.
+
+    cd ml_engine
+    python train_out_of_core.py --csv data/Fraud_dataset.csv --workdir data/features
+    python train_out_of_core.py --csv data/Fraud_dataset.csv --external-memory
+
+1. CSV -> float32 memmap feature matrix, in chunks (pipeline/chunked_data.py),
+   scaler fitted incrementally. Skipped if --workdir already holds one
+   (use --rebuild to force).
+2. XGBoost trains from a DataIter over memmap batches: QuantileDMatrix
+   (compressed histogram bins in RAM, no float64 copy) or, with
+   --external-memory, a DMatrix paged to disk.
+3. IsolationForest fits on a bounded sample of non-fraud rows; it only looks
+   at max_samples rows per tree anyway.
+
+Models go to --models-dir (default models/out_of_core, apart from the
+models/ files train_supervised.py's feature layout uses) together with
+feature_columns.json: the column order and encoding plan they expect.
+
+Wall time and peak RSS are printed per stage. With --registry the three
+models are also published as a versioned bundle (backend/app/ml/registry.py)
+that the API can hot-reload; add --activate to make it the live one.
+"""
+
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import IsolationForest
+from sklearn.metrics import average_precision_score, classification_report
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+from pipeline.chunked_data import COLUMNS_FILE, META_FILE, PLAN_KEYS, FeatureMatrix, build_feature_matrix
+from pipeline.profiling import StageTimer
+
+# same hyperparameters as train_supervised.py
+XGB_PARAMS = {
+    "objective": "binary:logistic",
+    "max_depth": 6,
+    "eta": 0.1,
+    "scale_pos_weight": 10,
+    "tree_method": "hist",
+    "eval_metric": "aucpr",
+}
+NUM_BOOST_ROUND = 300
+
+
+class MemmapIter(xgb.DataIter):
+    """Feeds XGBoost one memmap batch at a time."""
+
+    def __init__(self, matrix, batch_rows, mask, scaler, cache_prefix=None):
+        self.matrix = matrix
+        self.batch_rows = batch_rows
+        self.mask = mask
+        self.scaler = scaler
+        self._it = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._it is None:
+            self._it = self.matrix.batches(self.batch_rows, self.mask, self.scaler)
+        try:
+            X, y = next(self._it)
+        except StopIteration:
+            return 0
+        input_data(data=X, label=y)
+        return 1
+
+    def reset(self):
+        self._it = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, out-of-core model training")
+    parser.add_argument("--csv", default="data/Fraud_dataset.csv")
+    parser.add_argument("--label", default="is_fraud")
+    parser.add_argument("--workdir", default="data/features")
+    parser.add_argument("--models-dir", default="models/out_of_core")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="CSV rows per chunk")
+    parser.add_argument("--batch-rows", type=int, default=1_000_000, help="rows per XGBoost batch")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--anomaly-sample", type=int, default=200_000)
+    parser.add_argument("--external-memory", action="store_true", help="page the DMatrix to disk")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the feature matrix")
+    parser.add_argument("--registry", action="store_true", help="publish a versioned bundle to the model registry")
+    parser.add_argument("--activate", action="store_true", help="with --registry: make the bundle live")
+    args = parser.parse_args()
+
+    timer = StageTimer()
+    os.makedirs(args.models_dir, exist_ok=True)
+
+    # 1. Feature matrix
+    with timer.stage("build feature matrix"):
+        if args.rebuild or not os.path.exists(os.path.join(args.workdir, META_FILE)):
+            matrix, scaler = build_feature_matrix(args.csv, args.workdir, args.label, args.chunksize)
+        else:
+            matrix = FeatureMatrix(args.workdir)
+            scaler = None
+    if scaler is None:
+        with timer.stage("fit scaler"):
+            scaler = StandardScaler()
+            for X, _ in matrix.batches(args.batch_rows):
+                scaler.partial_fit(X)
+
+    print(f"{len(matrix):,} rows x {len(matrix.columns)} features "
+          f"({matrix.meta['n_positive']:,} positive); dropped columns: {matrix.meta['dropped']}")
+    test_mask = matrix.split_mask(args.test_size)
+
+    # 2. Supervised model
+    with timer.stage("build DMatrix"):
+        cache_prefix = os.path.join(args.workdir, "xgb_cache") if args.external_memory else None
+        train_iter = MemmapIter(matrix, args.batch_rows, test_mask, scaler, cache_prefix)
+        if args.external_memory:
+            dtrain = xgb.DMatrix(train_iter)
+        else:
+            dtrain = xgb.QuantileDMatrix(train_iter)
+
+    with timer.stage("train xgboost"):
+        booster = xgb.train(XGB_PARAMS, dtrain, num_boost_round=NUM_BOOST_ROUND)
+    del dtrain
+
+    with timer.stage("evaluate"):
+        probs, labels = [], []
+        for X, y in matrix.batches(args.batch_rows, ~test_mask, scaler):
+            probs.append(booster.inplace_predict(X))
+            labels.append(y.astype(np.uint8))
+        probs, labels = np.concatenate(probs), np.concatenate(labels)
+        print(classification_report(labels, (probs >= 0.5).astype(np.uint8)))
+        pr_auc = float(average_precision_score(labels, probs))
+        print(f"PR-AUC: {pr_auc:.4f}")
+
+    # serving loads an XGBClassifier with joblib, like train_supervised.py writes
+    booster_path = os.path.join(args.workdir, "supervised_xgb.json")
+    booster.save_model(booster_path)
+    model = XGBClassifier()
+    model.load_model(booster_path)
+    joblib.dump(model, os.path.join(args.models_dir, "supervised_xgb.pkl"))
+    joblib.dump(scaler, os.path.join(args.models_dir, "scaler.pkl"))
+
+    # 3. Anomaly model, on non-fraud rows only (as train_anomaly.py)
+    with timer.stage("train isolation forest"):
+        sample = scaler.transform(matrix.sample(args.anomaly_sample, where=0))
+        iso = IsolationForest(contamination=0.01)
+        iso.fit(sample)
+    joblib.dump(iso, os.path.join(args.models_dir, "anomaly_iforest.pkl"))
+
+    # the plan from pass 1: category -> code mappings, dropped columns
+    plan = {k: matrix.meta[k] for k in PLAN_KEYS}
+    with open(os.path.join(args.models_dir, COLUMNS_FILE), "w") as f:
+        json.dump({"feature_columns": matrix.columns, "preprocessing": plan}, f, indent=2)
+
+    if args.registry:
+        from pipeline.publish import publish
+
+        publish(
+            model, iso, scaler, matrix.columns,
+            preprocessing=plan,
+            metrics={"pr_auc": pr_auc, "n_rows": len(matrix), "n_positive": matrix.meta["n_positive"]},
+            activate=args.activate,
+        )
+
+    print(timer.summary())
+
+
+if __name__ == "__main__":
+    main()
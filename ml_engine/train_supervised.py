@@ -1,9 +1,11 @@
+import sys
 import pandas as pd
 from xgboost import XGBClassifier
+from sklearn.ensemble import IsolationForest
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-import joblib
+from sklearn.metrics import average_precision_score, classification_report
 from pipeline.data_cleaning import DataCleaner
+from pipeline.publish import publish
 
 cleaner = DataCleaner()
 
@@ -16,6 +18,7 @@ X = df.drop(['is_fraud'], axis=1)
 
 # 3. Clean & scale
 X = cleaner.clean(X)
+y = y.loc[X.index]  # clean() drops rows with NaNs
 X_scaled = cleaner.scale(X)
 
 # 4. Train-test split
@@ -38,5 +41,18 @@ model.fit(X_train, y_train)
 preds = model.predict(X_test)
 print(classification_report(y_test, preds))
 
-# 7. Save model
-joblib.dump(model, "models/supervised_xgb.pkl")
+pr_auc = float(average_precision_score(y_test, model.predict_proba(X_test)[:, 1]))
+print(f"PR-AUC: {pr_auc:.4f}")
+
+# 7. Anomaly model on the same features, non-fraud rows only (as train_anomaly.py)
+iso = IsolationForest(contamination=0.01)
+iso.fit(X_scaled[(y == 0).to_numpy()])
+
+# 8. Publish a versioned bundle: models + the scaler they were trained with
+#    + the feature layout, so serving never mixes them up
+publish(
+    model, iso, cleaner.scaler, list(X.columns),
+    preprocessing={"label": "is_fraud", "categories": cleaner.categories},
+    metrics={"pr_auc": pr_auc, "n_rows": len(X), "n_positive": int(y.sum())},
+    activate="--activate" in sys.argv,
+)
@@ -0,0 +1,217 @@
+"""
+Hyperparameter search for the supervised (XGBoost) model.
+
+    cd ml_engine
+    python tune_supervised.py --csv data/Fraud_dataset.csv --workers 4
+    python tune_supervised.py --csv data/Fraud_dataset.csv --sample 2000000 --save --activate
+
+Every (candidate, fold) pair is one task on a process pool. Inside a task
+the fold's training part is split again into train/validation, XGBoost
+(hist tree method) stops early on validation aucpr, and the held-out fold
+gives the PR-AUC. Each task also times predict_proba on single rows, the
+way the API scores one transaction per request.
+
+Candidates are ranked by mean PR-AUC, then by single-row latency. --save
+refits the best one on all rows (n_estimators = its mean early-stopping
+round), fits an IsolationForest on the same features and publishes the pair
+as a registry bundle (backend/app/ml/registry.py) with the feature columns,
+the category codes and the CV metrics; --activate makes it live.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.metrics import average_precision_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from xgboost import XGBClassifier
+
+from pipeline.data_cleaning import DataCleaner
+
+SEARCH_SPACE = {
+    "max_depth": [4, 6, 8],
+    "learning_rate": [0.05, 0.1, 0.2],
+    "n_estimators": [300, 800],  # upper bound, early stopping picks the round
+    "scale_pos_weight": [1, 10, "balanced"],  # "balanced" = negatives / positives
+}
+EARLY_STOPPING_ROUNDS = 30
+VALIDATION_SIZE = 0.15
+LATENCY_CALLS = 200
+
+# filled once per worker process by _init_worker
+_X = None
+_y = None
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def candidates(n_candidates=None, seed=42):
+    grid = [dict(zip(SEARCH_SPACE, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    if n_candidates and n_candidates < len(grid):
+        rng = np.random.default_rng(seed)
+        grid = [grid[i] for i in sorted(rng.choice(len(grid), n_candidates, replace=False))]
+    return grid
+
+
+def _resolve(params, y):
+    params = dict(params)
+    if params["scale_pos_weight"] == "balanced":
+        pos = max(1, int(y.sum()))
+        params["scale_pos_weight"] = (len(y) - pos) / pos
+    return params
+
+
+def single_row_latency_us(model, X, calls=LATENCY_CALLS):
+    """Median predict_proba wall time for one row, in microseconds."""
+    rows = X[np.linspace(0, len(X) - 1, calls).astype(int)]
+    timings = []
+    for i in range(calls):
+        started = time.perf_counter()
+        model.predict_proba(rows[i:i + 1])
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings) * 1e6)
+
+
+def run_fold(candidate_id, params, train_idx, test_idx, threads, seed):
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        _X[train_idx], _y[train_idx],
+        test_size=VALIDATION_SIZE, stratify=_y[train_idx], random_state=seed,
+    )
+    model = XGBClassifier(
+        **_resolve(params, y_fit),
+        tree_method="hist",
+        eval_metric="aucpr",
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        n_jobs=threads,
+        random_state=seed,
+    )
+    started = time.perf_counter()
+    model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    fit_seconds = time.perf_counter() - started
+
+    probs = model.predict_proba(_X[test_idx])[:, 1]
+    return {
+        "candidate": candidate_id,
+        "pr_auc": float(average_precision_score(_y[test_idx], probs)),
+        "best_iteration": int(model.best_iteration),
+        "fit_seconds": fit_seconds,
+        "latency_us": single_row_latency_us(model, _X[test_idx]),
+    }
+
+
+def summarize(grid, fold_results):
+    rows = []
+    for candidate_id, params in enumerate(grid):
+        folds = [r for r in fold_results if r["candidate"] == candidate_id]
+        if not folds:
+            continue
+        pr = np.array([r["pr_auc"] for r in folds])
+        rows.append({
+            **params,
+            "pr_auc_mean": float(pr.mean()),
+            "pr_auc_std": float(pr.std()),
+            "best_iteration": int(np.mean([r["best_iteration"] for r in folds])),
+            "latency_us": float(np.median([r["latency_us"] for r in folds])),
+            "fit_seconds": float(np.mean([r["fit_seconds"] for r in folds])),
+        })
+    table = pd.DataFrame(rows)
+    # PR-AUC first (rounded so noise doesn't decide), then cheaper to serve
+    table["_rank_pr"] = table["pr_auc_mean"].round(3)
+    table = table.sort_values(["_rank_pr", "latency_us"], ascending=[False, True]).drop(columns="_rank_pr")
+    return table.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel XGBoost hyperparameter search")
+    parser.add_argument("--csv", default="data/Fraud_dataset.csv")
+    parser.add_argument("--label", default="is_fraud")
+    parser.add_argument("--sample", type=int, default=None, help="stratified row sample to tune on")
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=None, help="random subset of the grid")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=1, help="XGBoost threads per worker")
+    parser.add_argument("--out", default="models/tuning_results.csv")
+    parser.add_argument("--save", action="store_true", help="refit the best candidate and publish a bundle")
+    parser.add_argument("--activate", action="store_true", help="with --save: make the bundle live")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    if args.sample and args.sample < len(df):
+        df, _ = train_test_split(df, train_size=args.sample, stratify=df[args.label], random_state=args.seed)
+
+    cleaner = DataCleaner()
+    y = df[args.label].to_numpy(dtype=np.int8)
+    X = cleaner.clean(df.drop([args.label], axis=1))
+    y = y[df.index.get_indexer(X.index)]  # clean() drops rows with NaNs
+    feature_columns = list(X.columns)
+    X = cleaner.scale(X).astype(np.float32)
+
+    grid = candidates(args.candidates, args.seed)
+    folds = list(StratifiedKFold(args.folds, shuffle=True, random_state=args.seed).split(X, y))
+    print(f"{len(X):,} rows ({int(y.sum()):,} positive), {len(grid)} candidates x {len(folds)} folds "
+          f"on {args.workers} workers")
+
+    results = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(X, y)) as pool:
+        futures = [
+            pool.submit(run_fold, cid, params, train_idx, test_idx, args.threads, args.seed)
+            for cid, params in enumerate(grid)
+            for train_idx, test_idx in folds
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            results.append(future.result())
+            print(f"\r{i}/{len(futures)} fits done", end="", flush=True)
+    print(f"\nSearch took {time.perf_counter() - started:.1f}s")
+
+    table = summarize(grid, results)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    table.to_csv(args.out, index=False)
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(table.head(15).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"Full ranking written to {args.out}")
+
+    if args.save:
+        best = table.iloc[0]
+        params = {k: best[k] for k in SEARCH_SPACE}
+        params["n_estimators"] = max(1, int(best["best_iteration"]) + 1)
+        params = _resolve(params, y)
+        params["max_depth"] = int(params["max_depth"])
+        model = XGBClassifier(**params, tree_method="hist", n_jobs=args.threads, random_state=args.seed)
+        print(f"Refitting best candidate on all rows: {json.dumps(params, default=float)}")
+        model.fit(X, y)
+
+        # anomaly model on the same features, non-fraud rows only (as train_anomaly.py)
+        iso = IsolationForest(contamination=0.01, random_state=args.seed)
+        iso.fit(X[y == 0])
+
+        from pipeline.publish import publish
+
+        publish(
+            model, iso, cleaner.scaler, feature_columns,
+            preprocessing={"label": args.label, "categories": cleaner.categories},
+            metrics={
+                "pr_auc": float(best["pr_auc_mean"]),
+                "pr_auc_std": float(best["pr_auc_std"]),
+                "cv_folds": args.folds,
+                "latency_us": float(best["latency_us"]),
+                "params": json.loads(json.dumps(params, default=float)),
+                "n_rows": len(X),
+                "n_positive": int(y.sum()),
+            },
+            activate=args.activate,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from typing import List
 
 # --- Import your backend internals ---
 from backend.app.db.mongo import users_col, txns_col, alerts_col, profiles_col
+from backend.app.services.user_search_service import search_fields
 from backend.app.core.security import get_password_hash  # password hashing :contentReference[oaicite:1]{index=1}
 from backend.app.db.models.transaction import TransactionCreate, Location, Device
 from backend.app.services.feature_builder import build_features_from_transaction
@@ -46,6 +47,7 @@ def create_user(name: str, email: str, password: str, role: str, user_code: str)
         "user_code": user_code,
         "created_at": datetime.utcnow(),
         "status": "active",
+        **search_fields(name, email, user_code),
     }
 
     result = users_col.insert_one(doc)
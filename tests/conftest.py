@@ -0,0 +1,101 @@
+# tests/conftest.py
+
+"""
+Shared fixtures. The LLM tests run against fake_llm_server.py in a
+subprocess; Mongo-backed pieces (LLM cache, telemetry, profiles) are
+replaced with in-memory fakes, so no database is needed.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.app.services import llm_client  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_listening(port: int, proc: subprocess.Popen, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"fake_llm_server.py exited with {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("fake_llm_server.py did not start")
+
+
+@pytest.fixture
+def fake_llm_server():
+    """start(*args) -> base URL of a fake_llm_server.py started with those options."""
+    procs = []
+
+    def start(*args: str) -> str:
+        port = _free_port()
+        proc = subprocess.Popen(
+            [sys.executable, str(ROOT / "fake_llm_server.py"), "--port", str(port), "--token-delay", "0", *args],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        procs.append(proc)
+        _wait_listening(port, proc)
+        return f"http://127.0.0.1:{port}/v1"
+
+    yield start
+    for proc in procs:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+@pytest.fixture
+def llm_cache_store(monkeypatch):
+    """In-memory stand-in for the Mongo-backed LLM cache."""
+    store = {}
+    monkeypatch.setattr(llm_client.llm_cache, "get", store.get)
+    monkeypatch.setattr(
+        llm_client.llm_cache, "put",
+        lambda key, response, model, user_id, data_version: store.__setitem__(key, response),
+    )
+    return store
+
+
+@pytest.fixture
+def telemetry_records(monkeypatch):
+    """Every telemetry.record call, as kwargs dicts."""
+    records = []
+
+    def record(agent, model, user_id, latency_ms, cache_hit, **kwargs):
+        records.append({"agent": agent, "cache_hit": cache_hit, **kwargs})
+
+    monkeypatch.setattr(llm_client.telemetry, "record", record)
+    return records
+
+
+@pytest.fixture
+def make_llm(monkeypatch, llm_cache_store, telemetry_records):
+    """make_llm(base_url) -> an LLMClient talking to the fake server."""
+    # fail fast instead of backing off for seconds in the error tests
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 0)
+
+    def make(base_url: str) -> llm_client.LLMClient:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+        monkeypatch.setenv("OPENAI_MODEL", "fake-model")
+        return llm_client.LLMClient()
+
+    return make
@@ -0,0 +1,85 @@
+# tests/test_agent_stream_api.py
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api.agent_behavior import router as behavior_router
+from backend.app.api.agent_investigation import router as investigation_router
+from backend.app.core.security import get_current_admin
+from backend.app.services import behavior_summary_service, investigation_service
+
+
+def _events(body: str):
+    """[(event, data)] from an SSE response body, comments skipped."""
+    events = []
+    for block in body.split("\n\n"):
+        lines = [line for line in block.splitlines() if line and not line.startswith(":")]
+        if not lines:
+            continue
+        fields = dict(line.split(": ", 1) for line in lines)
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def api(monkeypatch, fake_llm_server, make_llm):
+    """api(*server_args) -> TestClient whose agent services use the fake LLM."""
+
+    def build(*server_args):
+        client = make_llm(fake_llm_server(*server_args))
+        profile = {"user_id": "u1", "data_version": 1}
+        # no Mongo: the prompt builders get their data from here
+        monkeypatch.setattr(investigation_service, "llm", client)
+        monkeypatch.setattr(behavior_summary_service, "llm", client)
+        monkeypatch.setattr(
+            investigation_service, "profiles_col",
+            type("Profiles", (), {"find_one": staticmethod(lambda query: profile)}),
+        )
+        monkeypatch.setattr(
+            investigation_service, "_case_file_prompt",
+            lambda user_id, profile: ("Generate a full fraud investigation case file.", None),
+        )
+        monkeypatch.setattr(behavior_summary_service, "_load", lambda user_id: (profile, []))
+        monkeypatch.setattr(
+            behavior_summary_service, "_summary_prompt",
+            lambda user_id, profile, txns: ("Write a behaviour summary.", None),
+        )
+
+        app = FastAPI()
+        app.include_router(investigation_router, prefix="/api/agent")
+        app.include_router(behavior_router, prefix="/api/agent")
+        app.dependency_overrides[get_current_admin] = lambda: {"role": "admin"}
+        return TestClient(app)
+
+    return build
+
+
+@pytest.mark.parametrize("path, key, field", [
+    ("/api/agent/investigation/stream", "case_file", "risk_rating"),
+    ("/api/agent/behavior-summary/stream", "summary", "verdict"),
+])
+def test_stream_endpoint_tokens_then_done(api, path, key, field):
+    response = api().post(path, json={"user_id": "u1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    *tokens, (last, done) = events
+    assert tokens and all(event == "token" for event, _ in tokens)
+    assert last == "done"
+    assert done["success"] is True and done["valid"] is True
+    assert field in done[key]
+    # the done body is exactly what the tokens spelled out
+    assert json.loads("".join(data["text"] for _, data in tokens)) == done[key]
+
+
+def test_stream_endpoint_reports_mid_stream_failure(api):
+    response = api("--fail-after", "2").post("/api/agent/investigation/stream", json={"user_id": "u1"})
+
+    events = _events(response.text)
+    assert [event for event, _ in events] == ["token", "token", "error"]
+    assert events[-1][1]["success"] is False
+    assert "temporarily unavailable" in events[-1][1]["message"]
@@ -0,0 +1,82 @@
+# tests/test_llm_stream.py
+
+import json
+
+import pytest
+
+from backend.app.services.llm_client import LLMError, LLMUnavailable
+from backend.app.services.llm_schemas import InvestigationSection, parse_llm_json
+
+PROMPT = "Generate a full fraud investigation case file."
+
+
+def _is_case_file(text: str) -> bool:
+    return parse_llm_json(text, InvestigationSection) is not None
+
+
+def test_stream_yields_tokens_and_records_usage(fake_llm_server, make_llm, llm_cache_store, telemetry_records):
+    client = make_llm(fake_llm_server())
+
+    chunks = list(client.generate_stream(PROMPT, user_id="u1", validate=_is_case_file, agent="investigation"))
+
+    # the opening role-only chunk carries no text and is not yielded
+    assert len(chunks) > 1
+    assert all(chunks)
+    text = "".join(chunks)
+    assert json.loads(text)["risk_rating"] == "medium"
+
+    # usage comes from the provider's final chunk (include_usage), not estimates
+    [record] = telemetry_records
+    assert record["streamed"] is True
+    assert record.get("error") is None
+    assert record["completion_tokens"] == len(text) // 4
+    assert record["prompt_tokens"] == len(PROMPT) // 4
+
+    # the validated completion was cached, once
+    assert list(llm_cache_store.values()) == [text]
+
+
+def test_stream_cache_hit_is_a_single_chunk(fake_llm_server, make_llm, telemetry_records):
+    client = make_llm(fake_llm_server())
+    first = "".join(client.generate_stream(PROMPT, user_id="u1", validate=_is_case_file))
+
+    again = list(client.generate_stream(PROMPT, user_id="u1", validate=_is_case_file))
+
+    assert again == [first]
+    assert telemetry_records[-1]["cache_hit"] is True
+
+
+def test_stream_does_not_cache_invalid_output(fake_llm_server, make_llm, llm_cache_store):
+    client = make_llm(fake_llm_server())
+
+    list(client.generate_stream(PROMPT, user_id="u1", validate=lambda text: False))
+
+    assert llm_cache_store == {}
+
+
+def test_mid_stream_failure_raises_after_partial_output(fake_llm_server, make_llm, llm_cache_store, telemetry_records):
+    client = make_llm(fake_llm_server("--fail-after", "3"))
+
+    received = []
+    with pytest.raises(LLMUnavailable) as exc:
+        for chunk in client.generate_stream(PROMPT, user_id="u1", validate=_is_case_file):
+            received.append(chunk)
+
+    assert len(received) == 3
+    assert "temporarily unavailable" in exc.value.fallback_text
+    assert llm_cache_store == {}
+    assert telemetry_records[-1]["error"] == "APIError"
+    assert client.metrics()["failures"] == 1
+    # the concurrency slot was released despite the failure
+    assert client._slots.acquire(blocking=False)
+    client._slots.release()
+
+
+def test_error_status_before_first_token(fake_llm_server, make_llm, telemetry_records):
+    client = make_llm(fake_llm_server("--error-rate", "1", "--error-status", "503"))
+
+    with pytest.raises(LLMError):
+        list(client.generate_stream(PROMPT, user_id="u1"))
+
+    assert telemetry_records[-1]["error"] is not None
+    assert client.metrics()["failures"] == 1